@@ -0,0 +1,219 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+import anomalias
+import categorias
+import correlacion
+import data
+import pruebas
+import remuestreo
+import tendencias
+
+# Núcleo de análisis sin interfaz: la página de Streamlit y el modo por lotes
+# llaman a estas funciones y solo se encargan de mostrar o guardar los resultados
+#
+# Uso por lotes (sin servidor web), con un proceso por núcleo:
+#   python analisis.py --directorio . --salida reporte --formato parquet json
+
+# Variables climáticas: nombre en la página y columna de los datos
+VARIABLES = {'Temperatura promedio del aire a 2 metros (°C)': 'Temperatura (°C)',
+             'Humedad relativa promedio a 2 metros (%)': 'Humedad relativa (%)',
+             'Velocidad del viento a 2 metros (m/s)': 'Viento (m/s)',
+             'Precipitación total corregida (mm/día)': 'Precipitación (mm)',
+             'Radiación solar total en la superficie (kWh/m²/día)': 'Radiación solar (kWh/m²/día)'}
+
+# Métodos de detección de anomalías: nombre en la página y método
+METODOS_ANOMALIA = {'Rango intercuartílico (IQR)': 'iqr',
+                    'Rango intercuartílico por mes': 'iqr_estacional',
+                    'Puntaje z respecto a la climatología diaria': 'zscore_climatologia',
+                    'Mediana y MAD móviles (Hampel)': 'mad_movil'}
+
+# Nombre de cada prueba de comparación y de su estadístico
+NOMBRES_PRUEBAS = {'t': ('prueba t de Student', 't'),
+                   'anova': ('prueba ANOVA', 'F'),
+                   'mann_whitney': ('prueba U de Mann-Whitney', 'U'),
+                   'kruskal': ('prueba Kruskal-Wallis', 'H')}
+
+# Parejas de variables categóricas que se comparan con chi-cuadrado
+PAREJAS = [('Temperatura', 'Radiación', 'la temperatura', 'la radiación'),
+           ('Temperatura', 'Viento', 'la temperatura', 'el viento'),
+           ('Humedad', 'Precipitación', 'la humedad', 'la precipitación'),
+           ('Humedad', 'Radiación', 'la humedad', 'la radiación'),
+           ('Viento', 'Precipitación', 'el viento', 'la precipitación')]
+
+# Archivos de resultados del modo por lotes
+TABLAS = ['tendencias', 'pruebas', 'anomalias', 'categorias', 'correlacion']
+
+# Función para analizar la tendencia de una variable. Además de las pruebas de
+# tendencias.analizar devuelve su dirección: 'creciente', 'decreciente' o None
+# si no es significativa
+def tendencia(datos, columna, clave=None, columna_fecha='Fecha del registro'):
+    resultado = dict(tendencias.analizar(datos[columna_fecha], datos[columna], clave=clave))
+    resultado['direccion'] = None
+    if resultado['p'] < pruebas.ALFA:
+        resultado['direccion'] = 'creciente' if resultado['tau'] > 0 else 'decreciente'
+    return resultado
+
+# Función para comparar varios meses de un año o varios años con el motor de
+# pruebas; añade el nombre de la prueba, del estadístico y si la diferencia es significativa
+def comparacion(motor, estacion, columna, escala, grupos, anio=None):
+    return _describir(motor.resultado(estacion, columna, escala, grupos, anio))
+
+# Igual que comparacion, pero calculada directamente sobre una consulta de fechas
+def comparacion_consulta(consulta, columna, escala, grupos, anio=None):
+    return _describir(pruebas.comparar(consulta, columna, escala, grupos, anio))
+
+# Función para añadir a una comparación los nombres y si es significativa
+def _describir(resultado):
+    nombre, simbolo = NOMBRES_PRUEBAS.get(resultado['prueba'], (None, None))
+    resultado['nombre'] = nombre
+    resultado['simbolo'] = simbolo
+    resultado['significativo'] = bool(resultado['p'] < pruebas.ALFA)
+    return resultado
+
+# Función para separar los datos de una variable en normales y anómalos.
+# Devuelve (normales, anomalías) con la fecha y la variable
+def anomalias_variable(datos, columna, metodo='iqr', clave=None, columna_fecha='Fecha del registro'):
+    es_anomalia = anomalias.mascara(datos, metodo, clave=clave, columna_fecha=columna_fecha)[columna]
+    normales = datos.loc[~es_anomalia & datos[columna].notna(), [columna_fecha, columna]]
+    return normales, datos.loc[es_anomalia, [columna_fecha, columna]]
+
+# Función para obtener las tablas de contingencia y el chi-cuadrado de las
+# parejas de variables categóricas. Devuelve una lista de diccionarios
+def contingencias(datos, clave=None, parejas=PAREJAS):
+    resultado = categorias.analizar(datos, clave=clave)
+    filas = []
+    for a, b, texto_a, texto_b in parejas:
+        pareja = categorias.pareja(resultado, a, b)
+        filas.append({'a': a, 'b': b, 'texto_a': texto_a, 'texto_b': texto_b,
+                      'tabla': pareja['tabla'], 'chi2': pareja['chi2'], 'p': pareja['p'],
+                      'significativo': bool(pareja['p'] < pruebas.ALFA)})
+    return filas
+
+# Función para comparar varios grupos por remuestreo: pruebas de permutación
+# de medias y medianas e intervalos bootstrap de la media. Sin n el número de
+# remuestreos depende del tamaño de los grupos (remuestreo.remuestreos_para).
+# Con una clave (estación, versión de los datos, variable y grupos) el
+# resultado se memoriza
+def comparacion_remuestreo(valores, nombres, semilla=0, n=None, clave=None):
+    return remuestreo.comparar(valores, nombres, n=n, semilla=semilla, clave=clave)
+
+# Función para calcular las tablas de resultados de una estación. Con una
+# variable se calculan sus tendencias, pruebas de comparación y anomalías; sin
+# variable, las tablas de la estación completa (chi-cuadrado y correlaciones)
+def reporte(estacion, datos, variable=None, metodos=anomalias.METODOS, version=None,
+            columna_fecha='Fecha del registro'):
+    tablas = {}
+    if variable is None:
+        filas = []
+        for fila in contingencias(datos):
+            filas.append({'estacion': estacion, 'a': fila['a'], 'b': fila['b'],
+                          'chi2': fila['chi2'], 'p': fila['p'], 'significativo': fila['significativo']})
+        tablas['categorias'] = pd.DataFrame(filas)
+
+        matriz = correlacion.construir(datos).correlacion()
+        matriz = matriz.rename_axis(index='variable_a', columns='variable_b').stack().rename('correlacion')
+        tablas['correlacion'] = matriz.reset_index().assign(estacion=estacion)
+        return tablas
+
+    seleccion = datos[[columna_fecha, variable]]
+    tablas['tendencias'] = tendencias.tendencias_lote(seleccion, estacion, version=version)
+
+    tablas['pruebas'] = pd.DataFrame(pruebas.pruebas_variable(estacion, variable, seleccion),
+                                     columns=['estacion', 'variable', 'escala', 'anio', 'grupos',
+                                              'prueba', 'estadistico', 'p'])
+    tablas['pruebas']['grupos'] = tablas['pruebas']['grupos'].map(list)
+
+    filas = []
+    for metodo in metodos:
+        _, encontradas = anomalias_variable(seleccion, variable, metodo, columna_fecha=columna_fecha)
+        filas.append(pd.DataFrame({'estacion': estacion, 'variable': variable, 'metodo': metodo,
+                                   'fecha': encontradas[columna_fecha].to_numpy(),
+                                   'valor': encontradas[variable].to_numpy()}))
+    tablas['anomalias'] = pd.concat(filas, ignore_index=True)
+    return tablas
+
+# Función que se ejecuta en cada proceso: lee la estación desde su caché (ya
+# escrita por el proceso principal) y calcula sus tablas
+def _reporte_en_proceso(estacion, ruta, variable, estrategia):
+    return reporte(estacion, data.importar_datos(ruta, estrategia=estrategia), variable,
+                   version=data.version_archivo(ruta))
+
+# Función para analizar todas las estaciones de un directorio en un grupo de
+# procesos. Cada tarea es una variable de una estación (o las tablas de la
+# estación completa). Devuelve un diccionario {tabla: DataFrame}
+def reporte_estaciones(directorio='.', variables=None, procesos=None, estrategia='semanal'):
+    # Se limpian primero los archivos sin caché, también en paralelo
+    catalogo, estaciones = data.importar_estaciones(directorio, procesos, estrategia)
+    tareas = []
+    for estacion, datos_i in estaciones.items():
+        columnas = variables or datos_i.drop(columns='Fecha del registro').select_dtypes('number').columns
+        tareas.append((estacion, None))
+        tareas.extend((estacion, variable) for variable in columnas if variable in datos_i.columns)
+
+    partes = {tabla: [] for tabla in TABLAS}
+    with data.crear_procesos(procesos) as ejecutor:
+        futuros = {ejecutor.submit(_reporte_en_proceso, estacion, catalogo.loc[estacion, 'archivo'],
+                                   variable, estrategia): (estacion, variable)
+                   for estacion, variable in tareas}
+        for futuro, (estacion, variable) in futuros.items():
+            try:
+                tablas = futuro.result()
+            except Exception as e:
+                print(f"Error al analizar {estacion} {variable or ''}: {e}")
+                continue
+            for tabla, valores in tablas.items():
+                partes[tabla].append(valores)
+
+    return {tabla: pd.concat(valores, ignore_index=True) if valores else pd.DataFrame()
+            for tabla, valores in partes.items()}
+
+# Función para guardar las tablas en un directorio en los formatos pedidos
+# ('parquet' y/o 'json'). Devuelve las rutas escritas
+def guardar(tablas, directorio, formatos=('parquet',)):
+    os.makedirs(directorio, exist_ok=True)
+    rutas = []
+    for tabla, valores in tablas.items():
+        for formato in formatos:
+            ruta = os.path.join(directorio, f'{tabla}.{formato}')
+            try:
+                if formato == 'parquet':
+                    valores.to_parquet(ruta, index=False)
+                else:
+                    valores.to_json(ruta, orient='records', date_format='iso', force_ascii=False, indent=1)
+            except Exception as e:
+                print(f"No se pudo guardar {ruta}: {e}")
+                continue
+            rutas.append(ruta)
+    return rutas
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Análisis por lotes de las estaciones de POWER')
+    parser.add_argument('--directorio', default='.', help='directorio con los archivos POWER_Point_*.csv')
+    parser.add_argument('--salida', default='reporte', help='directorio donde se guardan las tablas')
+    parser.add_argument('--formato', nargs='+', choices=['parquet', 'json'], default=['parquet'])
+    parser.add_argument('--variables', nargs='+', help='columnas a analizar (por defecto todas)')
+    parser.add_argument('--procesos', type=int, help='número de procesos (por defecto uno por núcleo)')
+    parser.add_argument('--estrategia', default='semanal', help='estrategia de imputación')
+    argumentos = parser.parse_args()
+
+    # Los procesos del grupo no ejecutan este archivo (ver data.crear_procesos),
+    # así que las tareas se toman del módulo importado y no de __main__
+    import analisis
+    inicio = time.perf_counter()
+    resultados = analisis.reporte_estaciones(argumentos.directorio, argumentos.variables, argumentos.procesos,
+                                    argumentos.estrategia)
+    rutas = guardar(resultados, argumentos.salida, argumentos.formato)
+    for ruta in rutas:
+        print(ruta)
+    print(f"Tiempo total: {time.perf_counter() - inicio:.1f} s")
+
+    # Si alguna tabla no se pudo guardar el proceso termina con error
+    faltantes = len(resultados) * len(argumentos.formato) - len(rutas)
+    if faltantes:
+        print(f"No se guardaron {faltantes} archivos")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import climatologia
+import instrumentacion
+import memoria
+
+# Métodos de detección disponibles
+METODOS = ['iqr', 'iqr_estacional', 'zscore_climatologia', 'mad_movil']
+
+# Máscaras memorizadas por (clave, método, parámetros)
+MAXIMO_MEMORIA = 128
+_memoria = memoria.Memoria(MAXIMO_MEMORIA)
+
+# Límites inferior y superior por rango intercuartílico de todas las columnas a la vez
+def limites_iqr(valores, factor=1.5):
+    q1, q3 = np.nanquantile(valores, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return q1 - factor * iqr, q3 + factor * iqr
+
+# Anomalías por IQR sobre toda la serie
+def _iqr(valores, fechas, factor=1.5):
+    lim_inf, lim_sup = limites_iqr(valores, factor)
+    return (valores < lim_inf) | (valores > lim_sup)
+
+# Anomalías por IQR calculado por separado para cada mes del año
+def _iqr_estacional(valores, fechas, factor=1.5):
+    meses = pd.DatetimeIndex(fechas).month.to_numpy()
+    cuartiles = pd.DataFrame(valores).groupby(meses).quantile([0.25, 0.75])
+    q1 = cuartiles.xs(0.25, level=1).reindex(range(1, 13)).to_numpy()
+    q3 = cuartiles.xs(0.75, level=1).reindex(range(1, 13)).to_numpy()
+    iqr = q3 - q1
+    lim_inf, lim_sup = (q1 - factor * iqr)[meses - 1], (q3 + factor * iqr)[meses - 1]
+    return (valores < lim_inf) | (valores > lim_sup)
+
+# Anomalías por puntaje z respecto a la climatología diaria (normales armónicas)
+def _zscore_climatologia(valores, fechas, umbral=3.0, n_armonicos=3):
+    normales = climatologia.Climatologia(range(valores.shape[1]), n_armonicos).actualizar(fechas, valores)
+    with np.errstate(invalid='ignore'):
+        return np.abs(normales.anomalias(fechas, valores)) > umbral
+
+# Anomalías por filtro de Hampel: distancia a la mediana móvil mayor que k veces la MAD móvil
+def _mad_movil(valores, fechas, ventana=31, k=3.0):
+    mitad = ventana // 2
+    relleno = np.pad(valores, ((mitad, mitad), (0, 0)), constant_values=np.nan)
+    ventanas = sliding_window_view(relleno, ventana, axis=0)
+    # Las ventanas sin ningún dato válido producen NaN y no se marcan como anomalías
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mediana = np.nanmedian(ventanas, axis=2)
+        mad = np.nanmedian(np.abs(ventanas - mediana[:, :, None]), axis=2) * 1.4826
+    return np.abs(valores - mediana) > k * mad
+
+_DETECTORES = {
+    'iqr': _iqr,
+    'iqr_estacional': _iqr_estacional,
+    'zscore_climatologia': _zscore_climatologia,
+    'mad_movil': _mad_movil,
+}
+
+# Función para detectar anomalías en todas las variables numéricas a la vez.
+# Devuelve un DataFrame booleano (filas x variables). Si se da una clave (p. ej.
+# estación y versión de los datos) la máscara se memoriza y cambiar de variable
+# o de método es solo una consulta
+@instrumentacion.cronometrar()
+def mascara(datos, metodo='iqr', clave=None, columna_fecha='Fecha del registro', **parametros):
+    if metodo not in _DETECTORES:
+        raise ValueError(f"Método de detección desconocido: {metodo}")
+
+    clave_memoria = None if clave is None else (clave, metodo, tuple(sorted(parametros.items())))
+    return _memoria.obtener(clave_memoria, lambda: _mascara(datos, metodo, columna_fecha, parametros))
+
+# Cálculo de mascara() sin pasar por la memoria
+def _mascara(datos, metodo, columna_fecha, parametros):
+    variables = datos.drop(columns=columna_fecha).select_dtypes('number').columns
+    valores = datos[variables].to_numpy(dtype='float64')
+    resultado = pd.DataFrame(_DETECTORES[metodo](valores, datos[columna_fecha].to_numpy(), **parametros),
+                             columns=variables, index=datos.index)
+    return resultado
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Tiempo de importación en frío de la página: cada medición se hace en un
+# intérprete nuevo, con streamlit ya importado (como en el servidor), para la
+# parte común de pagina_web.py y para cada página por separado.
+#
+# Uso:
+#   python benchmarks/arranque.py --repeticiones 5 --salida arranque.json
+
+# Los módulos de la página están en el directorio superior
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que importa pagina_web.py antes de mostrar el menú
+COMUNES = ['pandas', 'streamlit_option_menu', 'consultas', 'data', 'instrumentacion', 'paginas.comun']
+
+# Código que se ejecuta en cada intérprete: importa primero `previos` y mide
+# solo la importación de `modulos`; imprime los milisegundos
+_CODIGO = '''
+import time
+import streamlit
+{previos}
+inicio = time.perf_counter()
+{modulos}
+print((time.perf_counter() - inicio) * 1000)
+'''
+
+# Función para medir la importación de unos módulos en un intérprete nuevo
+def _medir(modulos, previos=()):
+    codigo = _CODIGO.format(previos='\n'.join(f'import {m}' for m in previos),
+                            modulos='\n'.join(f'import {m}' for m in modulos))
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return float(salida.stdout.strip().splitlines()[-1])
+
+# Función para medir la parte común y cada página; devuelve el informe con el
+# mínimo y la mediana en milisegundos
+def ejecutar(repeticiones=5):
+    sys.path.insert(0, RAIZ)
+    import paginas
+
+    pruebas = {'comun': (COMUNES, ())}
+    for nombre, (modulo, _) in paginas.PAGINAS.items():
+        pruebas[nombre] = ([f'paginas.{modulo}'], COMUNES)
+
+    informe = {}
+    for nombre, (modulos, previos) in pruebas.items():
+        tiempos = [_medir(modulos, previos) for _ in range(repeticiones)]
+        informe[nombre] = {'min_ms': float(np.min(tiempos)), 'mediana_ms': float(np.median(tiempos))}
+    return informe
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tiempo de importación en frío de la página')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--salida', help='archivo JSON donde se guarda el informe')
+    argumentos = parser.parse_args()
+
+    informe = ejecutar(argumentos.repeticiones)
+    for nombre, tiempos in informe.items():
+        print(f"{nombre:<34} min={tiempos['min_ms']:8.1f} ms  mediana={tiempos['mediana_ms']:8.1f} ms")
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
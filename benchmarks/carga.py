@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+# Prueba de carga de servidor.py: abre varias conexiones HTTP/1.1 persistentes
+# y envía peticiones de una mezcla de rutas. Muestra las peticiones por segundo
+# y los percentiles de latencia, en total y por ruta.
+#
+# Uso (con el servidor ya iniciado):
+#   python benchmarks/carga.py --url http://127.0.0.1:8000 --conexiones 200 --peticiones 5000
+
+# Función para leer una respuesta HTTP; devuelve (estado, cuerpo)
+async def _leer_respuesta(lector):
+    encabezado = await lector.readuntil(b'\r\n\r\n')
+    lineas = encabezado.decode('latin-1').split('\r\n')
+    estado = int(lineas[0].split(' ', 2)[1])
+    longitud = 0
+    for linea in lineas[1:]:
+        nombre, _, valor = linea.partition(':')
+        if nombre.strip().lower() == 'content-length':
+            longitud = int(valor.strip())
+    return estado, await lector.readexactly(longitud)
+
+# Función para obtener una ruta una sola vez (para conocer las estaciones y variables)
+async def _obtener(host, puerto, ruta):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    await escritor.drain()
+    estado, cuerpo = await _leer_respuesta(lector)
+    escritor.close()
+    return estado, json.loads(cuerpo)
+
+# Función para construir la mezcla de rutas. `distintas` limita el número de
+# consultas diferentes, y por lo tanto la tasa de aciertos de la caché
+def rutas_prueba(estaciones, distintas=50, semilla=0):
+    rng = random.Random(semilla)
+    rutas = []
+    for _ in range(distintas):
+        estacion = rng.choice(estaciones)
+        nombre = quote(estacion['estacion'])
+        variable = quote(rng.choice(estacion['variables']))
+        inicio, fin = estacion['fecha_inicio'][:4], estacion['fecha_fin'][:4]
+        anio = rng.randint(int(inicio), int(fin))
+        tipo = rng.choice(['rango', 'agregados', 'tendencia', 'comparacion', 'anomalias'])
+        if tipo == 'rango':
+            ruta = f"/rango?estacion={nombre}&inicio={anio}-01-01&fin={anio}-03-31&variables={variable}"
+        elif tipo == 'agregados':
+            ruta = f"/agregados?estacion={nombre}&variable={variable}&escala=mensual&anio={anio}"
+        elif tipo == 'tendencia':
+            ruta = f"/tendencia?estacion={nombre}&variable={variable}&inicio={anio}-01-01"
+        elif tipo == 'comparacion':
+            meses = sorted(rng.sample(range(1, 13), rng.choice([2, 3])))
+            ruta = (f"/comparacion?estacion={nombre}&variable={variable}&escala=mensual"
+                    f"&anio={int(fin) - 1}&grupos={','.join(map(str, meses))}")
+        else:
+            metodo = rng.choice(['iqr', 'iqr_estacional', 'zscore_climatologia', 'mad_movil'])
+            ruta = f"/anomalias?estacion={nombre}&variable={variable}&metodo={metodo}"
+        rutas.append((tipo, ruta))
+    return rutas
+
+# Función que ejecuta una conexión: envía peticiones hasta agotar la cola
+async def _cliente(host, puerto, cola, resultados):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while True:
+            try:
+                tipo, ruta = cola.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            inicio = time.perf_counter()
+            escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+            await escritor.drain()
+            estado, _ = await _leer_respuesta(lector)
+            resultados.append((tipo, estado, time.perf_counter() - inicio))
+    finally:
+        escritor.close()
+
+# Percentiles de latencia en milisegundos
+def _resumen(latencias):
+    latencias = np.asarray(latencias) * 1000
+    return {'peticiones': len(latencias), 'p50_ms': float(np.percentile(latencias, 50)),
+            'p95_ms': float(np.percentile(latencias, 95)), 'p99_ms': float(np.percentile(latencias, 99)),
+            'maximo_ms': float(latencias.max())}
+
+# Función para ejecutar la prueba de carga y devolver el informe
+async def ejecutar(host='127.0.0.1', puerto=8000, conexiones=100, peticiones=2000, distintas=50, semilla=0):
+    _, estaciones = await _obtener(host, puerto, '/estaciones')
+    for estacion in estaciones:
+        _, datos = await _obtener(host, puerto, f"/rango?estacion={quote(estacion['estacion'])}"
+                                                f"&inicio={estacion['fecha_fin'][:10]}")
+        estacion['variables'] = [c for c in datos['datos']['columns'] if c != 'Fecha del registro']
+
+    rutas = rutas_prueba(estaciones, distintas, semilla)
+    rng = random.Random(semilla)
+    cola = asyncio.Queue()
+    for _ in range(peticiones):
+        cola.put_nowait(rng.choice(rutas))
+
+    resultados = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*[_cliente(host, puerto, cola, resultados) for _ in range(conexiones)])
+    duracion = time.perf_counter() - inicio
+
+    errores = sum(1 for _, estado, _ in resultados if estado != 200)
+    informe = {'conexiones': conexiones, 'distintas': distintas, 'duracion_s': duracion,
+               'por_segundo': len(resultados) / duracion, 'errores': errores,
+               'total': _resumen([latencia for _, _, latencia in resultados]), 'rutas': {}}
+    for tipo in sorted({tipo for tipo, _, _ in resultados}):
+        informe['rutas'][tipo] = _resumen([latencia for t, _, latencia in resultados if t == tipo])
+    _, informe['servidor'] = await _obtener(host, puerto, '/salud')
+    return informe
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API JSON')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--conexiones', type=int, default=100)
+    parser.add_argument('--peticiones', type=int, default=2000)
+    parser.add_argument('--distintas', type=int, default=50, help='número de consultas diferentes')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help='archivo JSON donde se guarda el informe')
+    argumentos = parser.parse_args()
+
+    informe = asyncio.run(ejecutar(argumentos.host, argumentos.puerto, argumentos.conexiones,
+                                   argumentos.peticiones, argumentos.distintas, argumentos.semilla))
+    print(f"{informe['por_segundo']:.0f} peticiones/s, {informe['errores']} errores, "
+          f"{informe['conexiones']} conexiones")
+    for nombre, resumen in [('total', informe['total'])] + list(informe['rutas'].items()):
+        print(f"{nombre:<12} n={resumen['peticiones']:<6} p50={resumen['p50_ms']:8.1f} ms  "
+              f"p95={resumen['p95_ms']:8.1f} ms  p99={resumen['p99_ms']:8.1f} ms  "
+              f"max={resumen['maximo_ms']:8.1f} ms")
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Los módulos de la página están en el directorio superior
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import plotly.express as px  # noqa: E402
+
+import anomalias  # noqa: E402
+import categorias  # noqa: E402
+import consultas  # noqa: E402
+import correlacion  # noqa: E402
+import cubo  # noqa: E402
+import data  # noqa: E402
+import generador  # noqa: E402
+import horario  # noqa: E402
+import muestreo  # noqa: E402
+import pruebas  # noqa: E402
+import tendencias  # noqa: E402
+
+# Uso:
+#   python benchmarks/ejecutar.py --estaciones 4 --anios 20 --salida resultados.json
+#   python benchmarks/ejecutar.py --comparar antes.json despues.json
+# Cada prueba se repite varias veces y se guardan el mínimo, la mediana y el
+# promedio en segundos, junto con la escala y las versiones de las librerías
+
+# Función para medir una función varias veces; devuelve el resultado de la última llamada
+def _medir(resultados, nombre, funcion, repeticiones, preparar=None):
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        salida = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    resultados.append({
+        'nombre': nombre,
+        'repeticiones': repeticiones,
+        'minimo_s': min(tiempos),
+        'mediana_s': float(np.median(tiempos)),
+        'promedio_s': float(np.mean(tiempos)),
+    })
+    print(f"{nombre:<45} {min(tiempos) * 1000:10.2f} ms")
+    return salida
+
+# Función para borrar la caché columnar de las pruebas en frío
+def _borrar_cache():
+    shutil.rmtree(data.DIRECTORIO_CACHE, ignore_errors=True)
+
+# Función para ejecutar todas las pruebas sobre datos sintéticos de la escala pedida
+def ejecutar(estaciones=4, anios=5, repeticiones=5, horarias=1, semilla=0):
+    resultados = []
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        # La caché columnar se escribe en el directorio temporal
+        os.chdir(directorio)
+        try:
+            inicio = time.perf_counter()
+            rutas = generador.generar('.', estaciones, anios, semilla=semilla)
+            print(f"{'generación de datos':<45} {(time.perf_counter() - inicio) * 1000:10.2f} ms")
+            ruta = rutas[0]
+
+            # Lectura: CSV sin caché, escritura de la caché y lectura mapeada
+            _medir(resultados, 'importar_datos sin caché',
+                   lambda: data.importar_datos(ruta, usar_cache=False), repeticiones)
+            _medir(resultados, 'importar_datos caché fría',
+                   lambda: data.importar_datos(ruta), repeticiones, preparar=_borrar_cache)
+            datos = _medir(resultados, 'importar_datos caché caliente',
+                           lambda: data.importar_datos(ruta), repeticiones)
+            _medir(resultados, 'importar_estaciones caché fría',
+                   lambda: data.importar_estaciones('.'), max(1, repeticiones // 2), preparar=_borrar_cache)
+            _, todas = _medir(resultados, 'importar_estaciones caché caliente',
+                              lambda: data.importar_estaciones('.'), repeticiones)
+
+            # Selección de rangos de fechas con el índice ordenado
+            consulta = consultas.ConsultaFechas(datos)
+            rng = np.random.default_rng(semilla)
+            fechas = datos['Fecha del registro'].to_numpy()
+            limites = np.sort(rng.choice(fechas, (200, 2)), axis=1)
+            _medir(resultados, 'consulta.rango x200',
+                   lambda: [consulta.rango(a, b) for a, b in limites], repeticiones)
+            _medir(resultados, 'filtro con máscara booleana x200',
+                   lambda: [datos[(datos['Fecha del registro'] >= a) & (datos['Fecha del registro'] <= b)]
+                            for a, b in limites], repeticiones)
+
+            # Estadísticas de comparación mensual y anual
+            cubo_mensual = _medir(resultados, 'construir_cubo',
+                                  lambda: cubo.construir_cubo(datos, 'x'), repeticiones)
+            _medir(resultados, 'cubo anual', lambda: cubo.anual(cubo_mensual), repeticiones)
+            anio = int(consulta.anios()[-1])
+            _medir(resultados, 'prueba t desde el cubo',
+                   lambda: cubo.prueba_t(cubo.celdas_mensuales(cubo_mensual, 'x', 'Temperatura (°C)', anio, [1, 8])),
+                   repeticiones)
+            _medir(resultados, 'pruebas_variable (todas las pruebas)',
+                   lambda: pruebas.pruebas_variable('x', 'Precipitación (mm)',
+                                                    datos[['Fecha del registro', 'Precipitación (mm)']]),
+                   max(1, repeticiones // 2))
+            _medir(resultados, 'tendencias.analizar',
+                   lambda: tendencias.analizar(datos['Fecha del registro'], datos['Temperatura (°C)']),
+                   repeticiones)
+
+            # Detección de anomalías con cada método
+            for metodo in anomalias.METODOS:
+                _medir(resultados, f'anomalías {metodo}', lambda: anomalias.mascara(datos, metodo), repeticiones)
+
+            # Correlaciones y chi-cuadrado
+            _medir(resultados, 'co-momentos', lambda: correlacion.construir(datos), repeticiones)
+            _medir(resultados, 'DataFrame.corr', lambda: datos.select_dtypes('number').corr(), repeticiones)
+            _medir(resultados, 'correlación desfasada',
+                   lambda: correlacion.correlacion_desfasada(datos['Radiación solar (kWh/m²/día)'],
+                                                            datos['Temperatura (°C)'], 30), repeticiones)
+            _medir(resultados, 'correlación móvil',
+                   lambda: correlacion.correlacion_movil(datos['Radiación solar (kWh/m²/día)'],
+                                                        datos['Temperatura (°C)'], 90), repeticiones)
+            _medir(resultados, 'combinar co-momentos de estaciones',
+                   lambda: correlacion.combinar(correlacion.construir(d) for d in todas.values()), repeticiones)
+            _medir(resultados, 'categorías y chi-cuadrado', lambda: categorias.analizar(datos), repeticiones)
+
+            # Construcción de figuras (incluye la serialización a JSON que hace Streamlit)
+            # La primera llamada a plotly carga sus plantillas y validadores; se
+            # hace una sin medir para que ese costo no caiga en la primera figura
+            puntos = muestreo.presupuesto_puntos(ancho_px=1000)
+            px.line(datos.head(10), x='Fecha del registro', y='Temperatura (°C)').to_json()
+            _medir(resultados, 'figura de líneas reducida',
+                   lambda: px.line(muestreo.reducir(datos, 'Fecha del registro', 'Temperatura (°C)', puntos),
+                                   x='Fecha del registro', y='Temperatura (°C)').to_json(), repeticiones)
+            _medir(resultados, 'figura de líneas completa',
+                   lambda: px.line(datos, x='Fecha del registro', y='Temperatura (°C)').to_json(), repeticiones)
+            _medir(resultados, 'mapa de calor',
+                   lambda: px.imshow(correlacion.construir(datos).correlacion(), text_auto=True).to_json(),
+                   repeticiones)
+
+            # Lectura de datos horarios
+            if horarias:
+                rutas_horarias = generador.generar('horarias', horarias, min(anios, 5), 'hourly', semilla=semilla)
+                ruta_horaria = rutas_horarias[0]
+                _medir(resultados, 'importar_horario en frío', lambda: horario.importar_horario(ruta_horaria),
+                       max(1, repeticiones // 2),
+                       preparar=lambda: shutil.rmtree(horario.ruta_cache(ruta_horaria), ignore_errors=True))
+                _, resumen = _medir(resultados, 'importar_horario con caché',
+                                    lambda: horario.importar_horario(ruta_horaria), repeticiones)
+                _medir(resultados, 'resumen horario a diario', lambda: horario.diario(resumen), repeticiones)
+        finally:
+            os.chdir(directorio_original)
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {'estaciones': estaciones, 'anios': anios, 'repeticiones': repeticiones,
+                       'horarias': horarias, 'semilla': semilla, 'filas': len(datos)},
+        'entorno': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                    'numpy': np.__version__, 'pandas': pd.__version__},
+        'resultados': resultados,
+    }
+
+# Función para comparar dos archivos de resultados: tiempo mínimo antes,
+# después y la razón después / antes de cada prueba
+def comparar(ruta_antes, ruta_despues):
+    with open(ruta_antes, encoding='utf-8') as f:
+        antes = {r['nombre']: r for r in json.load(f)['resultados']}
+    with open(ruta_despues, encoding='utf-8') as f:
+        despues = {r['nombre']: r for r in json.load(f)['resultados']}
+
+    filas = []
+    for nombre in list(antes) + [n for n in despues if n not in antes]:
+        a = antes.get(nombre, {}).get('minimo_s', np.nan)
+        d = despues.get(nombre, {}).get('minimo_s', np.nan)
+        filas.append({'prueba': nombre, 'antes_ms': a * 1000, 'despues_ms': d * 1000, 'razon': d / a})
+    return pd.DataFrame(filas).set_index('prueba')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pruebas de rendimiento con datos sintéticos de POWER')
+    parser.add_argument('--estaciones', type=int, default=4)
+    parser.add_argument('--anios', type=int, default=5)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--horarias', type=int, default=1, help='estaciones horarias (0 para omitirlas)')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help='archivo JSON donde se guardan los resultados')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DESPUES'),
+                        help='compara dos archivos de resultados en lugar de ejecutar las pruebas')
+    argumentos = parser.parse_args()
+
+    if argumentos.comparar:
+        with pd.option_context('display.float_format', '{:.2f}'.format, 'display.width', 120):
+            print(comparar(*argumentos.comparar))
+    else:
+        informe = ejecutar(argumentos.estaciones, argumentos.anios, argumentos.repeticiones,
+                           argumentos.horarias, argumentos.semilla)
+        if argumentos.salida:
+            with open(argumentos.salida, 'w', encoding='utf-8') as f:
+                json.dump(informe, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import signal
+
+# Parámetros de POWER que se generan, con su descripción en el encabezado
+PARAMETROS = {
+    'daily': [
+        ('T2M', 'MERRA-2 Temperature at 2 Meters (C)'),
+        ('RH2M', 'MERRA-2 Relative Humidity at 2 Meters (%)'),
+        ('WS2M', 'MERRA-2 Wind Speed at 2 Meters (m/s)'),
+        ('PRECTOTCORR', 'MERRA-2 Precipitation Corrected (mm/day)'),
+        ('ALLSKY_SFC_SW_DWN', 'CERES SYN1deg All Sky Surface Shortwave Downward Irradiance (MJ/m^2/day)'),
+    ],
+    'hourly': [
+        ('T2M', 'MERRA-2 Temperature at 2 Meters (C)'),
+        ('RH2M', 'MERRA-2 Relative Humidity at 2 Meters (%)'),
+        ('WS2M', 'MERRA-2 Wind Speed at 2 Meters (m/s)'),
+        ('PRECTOTCORR', 'MERRA-2 Precipitation Corrected (mm/hour)'),
+        ('ALLSKY_SFC_SW_DWN', 'CERES SYN1deg All Sky Surface Shortwave Downward Irradiance (Wh/m^2)'),
+    ],
+}
+
+VALOR_FALTANTE = -999
+
+# Función para formatear una coordenada como en los nombres de archivo de POWER (p. ej. 002d92S)
+def _coordenada(valor, positivo, negativo, digitos=3):
+    sufijo = positivo if valor >= 0 else negativo
+    entero, decimales = divmod(round(abs(valor) * 100), 100)
+    return f'{entero:0{digitos}d}d{decimales:02d}{sufijo}'
+
+# Función para generar una serie AR(1) de ruido con desviación estándar `desviacion`
+def _ruido(rng, n, desviacion, persistencia=0.7):
+    ruido = rng.normal(0, desviacion * np.sqrt(1 - persistencia ** 2), n)
+    return signal.lfilter([1.0], [1.0, -persistencia], ruido)
+
+# Función para generar los valores de una estación con estacionalidad anual
+# (y ciclo diario en los datos horarios)
+def _valores(fechas, resolucion, rng, latitud):
+    n = len(fechas)
+    fase = 2 * np.pi * (fechas.dayofyear.to_numpy() - 1) / 365.25
+    base_temperatura = 14 + 0.2 * abs(latitud) + rng.normal(0, 1)
+
+    temperatura = base_temperatura + 1.5 * np.sin(fase) + _ruido(rng, n, 1.0)
+    humedad = 80 - 6 * np.sin(fase) + _ruido(rng, n, 4.0)
+    viento = np.clip(1.5 + 0.5 * np.cos(fase) + _ruido(rng, n, 0.4), 0, None)
+
+    # Días lluviosos con probabilidad estacional y cantidad con distribución gamma
+    probabilidad = 0.45 + 0.25 * np.cos(fase - 1.0)
+    lluvia = rng.random(n) < probabilidad
+    precipitacion = np.where(lluvia, rng.gamma(0.8, 6.0, n), 0.0)
+    radiacion = 16 + 3 * np.cos(fase) - 4 * lluvia + _ruido(rng, n, 1.5)
+
+    if resolucion == 'hourly':
+        hora = fechas.hour.to_numpy()
+        diurno = np.sin(np.pi * (hora - 6) / 12)
+        temperatura = temperatura + 5 * diurno
+        humedad = humedad - 15 * diurno
+        precipitacion = precipitacion / 24
+        # La energía diaria (MJ/m²) se reparte en las horas de sol (Wh/m² por hora)
+        radiacion = np.where(diurno > 0, radiacion * 1e6 / 3600 * diurno * np.pi / 24, 0.0)
+
+    humedad = np.clip(humedad, 20, 100)
+    radiacion = np.clip(radiacion, 0, None)
+    return np.column_stack((temperatura, humedad, viento, precipitacion, radiacion))
+
+# Función para escribir un archivo sintético con el formato de POWER: el mismo
+# encabezado, nombres de columnas, valor faltante -999 y nombre de archivo.
+# `faltantes` es la fracción de celdas faltantes sueltas; además se agrega un
+# tramo de `hueco` pasos seguidos sin datos en todas las variables
+def generar_estacion(directorio, latitud, longitud, inicio='2000-01-01', fin='2024-12-31',
+                     resolucion='daily', faltantes=0.01, hueco=10, semilla=None):
+    rng = np.random.default_rng(semilla)
+    frecuencia = 'h' if resolucion == 'hourly' else 'D'
+    fechas = pd.date_range(inicio, pd.Timestamp(fin) + pd.Timedelta(hours=23) if frecuencia == 'h' else fin,
+                           freq=frecuencia)
+    valores = np.round(_valores(fechas, resolucion, rng, latitud), 2)
+
+    # Faltantes sueltos y un tramo seguido sin datos
+    valores[rng.random(valores.shape) < faltantes] = VALOR_FALTANTE
+    if hueco and len(valores) > 2 * hueco:
+        posicion = rng.integers(hueco, len(valores) - hueco)
+        valores[posicion:posicion + hueco] = VALOR_FALTANTE
+
+    parametros = PARAMETROS[resolucion]
+    columnas = 1 + len(parametros) if resolucion == 'daily' else 4 + len(parametros)
+    relleno = ',' * (columnas - 1)
+    producto = ('NASA/POWER Source Native Resolution Daily Data' if resolucion == 'daily'
+                else 'NASA/POWER CERES/MERRA2 Native Resolution Hourly Data')
+    inicio, fin = fechas[0], fechas[-1]
+    encabezado = [
+        '-BEGIN HEADER-',
+        f'{producto} ',
+        f'Dates (month/day/year): {inicio:%m/%d/%Y} through {fin:%m/%d/%Y} in LST',
+        f'Location: latitude  {latitud:.4f}   longitude {longitud:.4f} ',
+        f'elevation from MERRA-2: Average for 0.5 x 0.625 degree lat/lon region = {rng.uniform(0, 3500):.1f} meters',
+        f'The value for missing source data that cannot be computed or is outside of the sources '
+        f'availability range: {VALOR_FALTANTE} ',
+        'parameter(s): ',
+    ] + [f'{codigo:<22}{descripcion} ' for codigo, descripcion in parametros] + ['-END HEADER-']
+
+    if resolucion == 'daily':
+        cuerpo = pd.DataFrame(valores, columns=[codigo for codigo, _ in parametros])
+        cuerpo.insert(0, 'DATE', fechas.strftime('%Y-%m-%d'))
+    else:
+        cuerpo = pd.DataFrame(valores, columns=[codigo for codigo, _ in parametros])
+        for posicion, (nombre, parte) in enumerate([('YEAR', fechas.year), ('MO', fechas.month),
+                                                     ('DY', fechas.day), ('HR', fechas.hour)]):
+            cuerpo.insert(posicion, nombre, parte)
+
+    nombre = (f"POWER_Point_{resolucion.capitalize()}_{inicio:%Y%m%d}_{fin:%Y%m%d}_"
+              f"{_coordenada(latitud, 'N', 'S')}_{_coordenada(longitud, 'E', 'W')}_LST.csv")
+    ruta = os.path.join(directorio, nombre)
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        f.write(''.join(linea + relleno + '\n' for linea in encabezado))
+        cuerpo.to_csv(f, index=False, float_format='%.2f', lineterminator='\n')
+    return ruta
+
+# Función para generar varias estaciones de `anios` años cada una, repartidas
+# alrededor de Cuenca. Devuelve las rutas de los archivos
+def generar(directorio, estaciones=4, anios=5, resolucion='daily', faltantes=0.01, semilla=0):
+    os.makedirs(directorio, exist_ok=True)
+    rng = np.random.default_rng(semilla)
+    fin = pd.Timestamp('2024-12-31')
+    inicio = fin - pd.DateOffset(years=anios) + pd.Timedelta(days=1)
+    rutas = []
+    for i in range(estaciones):
+        latitud = -2.92 - 0.5 * (i % 10)
+        longitud = -79.0 - 0.625 * (i // 10)
+        rutas.append(generar_estacion(directorio, latitud, longitud, inicio, fin, resolucion,
+                                      faltantes, semilla=int(rng.integers(2 ** 31))))
+    return rutas
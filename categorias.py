@@ -0,0 +1,89 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import instrumentacion
+import memoria
+
+# Categorías de cada variable: nombre corto, límites internos y etiquetas.
+# Los intervalos son cerrados por la derecha, igual que pd.cut
+CATEGORIAS = {
+    'Temperatura (°C)': ('Temperatura', [10, 12, 14, 16],
+                         ['Muy baja', 'Baja', 'Moderada', 'Alta', 'Muy alta']),
+    'Humedad relativa (%)': ('Humedad', [65, 75, 85, 90],
+                             ['Muy seca', 'Seca', 'Moderada', 'Húmeda', 'Muy húmeda']),
+    'Radiación solar (kWh/m²/día)': ('Radiación', [5, 10, 15, 20],
+                                     ['Muy baja', 'Baja', 'Moderada', 'Alta', 'Muy alta']),
+    'Viento (m/s)': ('Viento', [1, 2, 3, 4],
+                     ['Muy débil', 'Débil', 'Moderado', 'Fuerte', 'Muy fuerte']),
+    'Precipitación (mm)': ('Precipitación', [0.01, 5, 15, 30],
+                           ['Sin lluvia', 'Lluvia ligera', 'Lluvia moderada', 'Lluvia fuerte', 'Lluvia muy fuerte']),
+}
+
+# Resultados memorizados por estación y versión de los datos
+MAXIMO_MEMORIA = 64
+_memoria = memoria.Memoria(MAXIMO_MEMORIA)
+
+# Función para codificar las variables en categorías enteras (int8) con np.digitize.
+# Devuelve un diccionario {nombre corto: códigos}; los faltantes quedan con -1
+def codificar(datos, categorias=CATEGORIAS):
+    codigos = {}
+    for columna, (nombre, limites, _) in categorias.items():
+        if columna not in datos.columns:
+            continue
+        valores = datos[columna].to_numpy(dtype='float64')
+        codigo = np.digitize(valores, limites, right=True).astype('int8')
+        codigo[np.isnan(valores)] = -1
+        codigos[nombre] = codigo
+    return codigos
+
+# Función para construir las tablas de contingencia de todas las parejas de
+# variables con un único bincount sobre los códigos combinados
+def contingencia(codigos, categorias=CATEGORIAS):
+    etiquetas = {nombre: lista for nombre, _, lista in categorias.values()}
+    parejas = list(combinations(codigos, 2))
+    k = max(len(lista) for lista in etiquetas.values())
+
+    # Índice combinado (pareja, categoría a, categoría b) de todas las filas válidas
+    indices = []
+    for p, (a, b) in enumerate(parejas):
+        validos = (codigos[a] >= 0) & (codigos[b] >= 0)
+        indices.append(p * k * k + codigos[a][validos].astype('int64') * k + codigos[b][validos])
+    conteos = np.bincount(np.concatenate(indices), minlength=len(parejas) * k * k).reshape(len(parejas), k, k)
+
+    tablas = {}
+    for p, (a, b) in enumerate(parejas):
+        tabla = pd.DataFrame(conteos[p, :len(etiquetas[a]), :len(etiquetas[b])],
+                             index=pd.Index(etiquetas[a], name=f'Categoría {a}'),
+                             columns=pd.Index(etiquetas[b], name=f'Categoría {b}'))
+
+        # Como pd.crosstab, se omiten las categorías sin ninguna observación
+        tablas[(a, b)] = tabla.loc[tabla.sum(axis=1) > 0, tabla.sum(axis=0) > 0]
+    return tablas
+
+# Función para obtener las tablas de contingencia y la prueba de chi-cuadrado de
+# todas las parejas. Con una clave (estación y versión de los datos) el
+# resultado se memoriza y la página solo hace una consulta
+def analizar(datos, clave=None, categorias=CATEGORIAS):
+    return _memoria.obtener(clave, lambda: _analizar(datos, categorias))
+
+# Cálculo de analizar() sin pasar por la memoria
+def _analizar(datos, categorias):
+    resultado = {}
+    for pareja, tabla in contingencia(codificar(datos, categorias), categorias).items():
+        if tabla.shape[0] > 1 and tabla.shape[1] > 1:
+            with instrumentacion.medir('categorias.chi2_contingency'):
+                estadistico, p, _, _ = stats.chi2_contingency(tabla)
+        else:
+            estadistico, p = np.nan, np.nan
+        resultado[pareja] = {'tabla': tabla, 'chi2': estadistico, 'p': p}
+    return resultado
+
+# Función para buscar una pareja sin importar el orden en que se pida
+def pareja(resultado, a, b):
+    if (a, b) in resultado:
+        return resultado[(a, b)]
+    invertido = resultado[(b, a)]
+    return {'tabla': invertido['tabla'].T, 'chi2': invertido['chi2'], 'p': invertido['p']}
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# Duración media del año en días, usada como periodo de los armónicos
+DIAS_ANIO = 365.2425
+
+# Función para construir la matriz de armónicos (1, cos, sen, ...) de cada fecha
+def _armonicos(dias, n_armonicos):
+    fase = 2 * np.pi * np.asarray(dias, dtype='float64') / DIAS_ANIO
+    columnas = [np.ones_like(fase)]
+    for k in range(1, n_armonicos + 1):
+        columnas.append(np.cos(k * fase))
+        columnas.append(np.sin(k * fase))
+    return np.column_stack(columnas)
+
+# Climatología diaria ajustada con armónicos anuales. Solo guarda las sumas
+# X'X, X'y y X'y² del ajuste por mínimos cuadrados, así que al añadir días
+# nuevos basta con sumar su aporte, sin volver a recorrer la serie completa
+class Climatologia:
+
+    def __init__(self, variables, n_armonicos=3):
+        self.variables = list(variables)
+        self.n_armonicos = n_armonicos
+        p = 2 * n_armonicos + 1
+        n_var = len(self.variables)
+
+        # Una matriz X'X por variable porque cada una tiene sus propios faltantes
+        self._xtx = np.zeros((n_var, p, p))
+        self._xty = np.zeros((n_var, p))
+        self._xty2 = np.zeros((n_var, p))
+        self.n = np.zeros(n_var, dtype='int64')
+        self._normales = None
+
+    # Función para sumar (signo=1) o restar (signo=-1) el aporte de unos días
+    def _acumular(self, fechas, valores, signo):
+        dias = np.asarray(fechas, dtype='datetime64[D]').astype('int64')
+        valores = np.asarray(valores, dtype='float64').reshape(len(dias), -1)
+        x = _armonicos(dias, self.n_armonicos)
+
+        validos = ~np.isnan(valores)
+        limpios = np.where(validos, valores, 0.0)
+        pesos = validos.astype('float64')
+
+        # Aportes de todas las variables a la vez
+        self._xtx += signo * np.einsum('ni,nj,nv->vij', x, x, pesos)
+        self._xty += signo * (limpios.T @ x)
+        self._xty2 += signo * ((limpios ** 2).T @ x)
+        self.n += signo * validos.sum(axis=0)
+        self._normales = None
+        return self
+
+    # Función para añadir días a la climatología
+    def actualizar(self, fechas, valores):
+        return self._acumular(fechas, valores, 1)
+
+    # Función para quitar días ya añadidos (por ejemplo, antes de volver a
+    # añadirlos con otros valores imputados)
+    def retirar(self, fechas, valores):
+        return self._acumular(fechas, valores, -1)
+
+    # Coeficientes del promedio y del segundo momento de cada variable
+    def coeficientes(self):
+        media = np.empty_like(self._xty)
+        momento = np.empty_like(self._xty)
+        for v in range(len(self.variables)):
+            media[v] = np.linalg.lstsq(self._xtx[v], self._xty[v], rcond=None)[0]
+            momento[v] = np.linalg.lstsq(self._xtx[v], self._xty2[v], rcond=None)[0]
+        return media, momento
+
+    # Promedio y desviación estándar para un conjunto de fechas (filas x variables)
+    def evaluar(self, fechas):
+        dias = np.asarray(fechas, dtype='datetime64[D]').astype('int64')
+        x = _armonicos(dias, self.n_armonicos)
+        media, momento = self.coeficientes()
+        promedio = x @ media.T
+        varianza = x @ momento.T - promedio ** 2
+        return promedio, np.sqrt(np.clip(varianza, 0, None))
+
+    # Normales de los 366 días del año en un arreglo compacto float32
+    # de forma (366, variables, 2): promedio y desviación estándar
+    def normales(self):
+        if self._normales is None:
+            fechas = np.arange(np.datetime64('2000-01-01'), np.datetime64('2001-01-01'))
+            promedio, desviacion = self.evaluar(fechas)
+            self._normales = np.stack((promedio, desviacion), axis=2).astype('float32')
+        return self._normales
+
+    # Serie de anomalías estandarizadas (valor - normal) / desviación
+    def anomalias(self, fechas, valores):
+        fechas = pd.DatetimeIndex(fechas)
+        normales = self.normales()
+        dia = fechas.dayofyear.to_numpy() - 1
+
+        # En los años no bisiestos los días después de febrero se desplazan uno
+        # para usar la misma fecha del calendario del año 2000
+        dia = dia + ((~fechas.is_leap_year) & (dia >= 59))
+        valores = np.asarray(valores, dtype='float64').reshape(len(fechas), -1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (valores - normales[dia, :, 0]) / normales[dia, :, 1]
+
+# Función para construir la climatología de un DataFrame de POWER
+def construir(datos, n_armonicos=3, columna_fecha='Fecha del registro'):
+    variables = datos.drop(columns=columna_fecha).select_dtypes('number').columns
+    climatologia = Climatologia(variables, n_armonicos)
+    return climatologia.actualizar(datos[columna_fecha].to_numpy(), datos[variables].to_numpy())
+
+# Función para obtener las anomalías estandarizadas de todas las variables como DataFrame
+def anomalias_estandarizadas(datos, climatologia, columna_fecha='Fecha del registro'):
+    z = climatologia.anomalias(datos[columna_fecha], datos[climatologia.variables].to_numpy())
+    resultado = pd.DataFrame(z, columns=climatologia.variables, index=datos.index)
+    resultado.insert(0, columna_fecha, datos[columna_fecha])
+    return resultado
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# Época de los desplazamientos de fecha
+EPOCA = np.datetime64('1970-01-01', 'D')
+
+# Tipo entero y escala de las variables acotadas. El valor guardado es
+# round(valor / escala); POWER publica dos decimales, así que con escala 0.01
+# los datos originales se guardan sin pérdida. Las celdas imputadas son
+# promedios con más decimales y se redondean a la escala, con un error de
+# hasta media escala (0.005 con escala 0.01). Las variables que no están aquí,
+# o cuyo rango no cabe en el tipo entero, se guardan en float32
+ESCALAS = {
+    'Temperatura (°C)': ('int16', 0.01),
+    'Humedad relativa (%)': ('int16', 0.01),
+    'Viento (m/s)': ('int16', 0.01),
+    'Precipitación (mm)': ('uint16', 0.01),
+    'Radiación solar (kWh/m²/día)': ('int16', 0.001),
+}
+
+# Almacén compacto de una estación: fechas como desplazamientos int32 desde la
+# época, variables en enteros escalados o float32 y una máscara de bits con
+# las celdas válidas en lugar de NaN. Los datos se convierten a float64 al
+# leerlos, así que las estadísticas siguen calculándose en doble precisión
+class AlmacenCompacto:
+
+    def __init__(self, desplazamientos, unidad, variables, columnas, escalas, validez, imputados=None,
+                 columna_fecha='Fecha del registro'):
+        self.desplazamientos = desplazamientos
+        self.unidad = unidad
+        self.variables = list(variables)
+        self.columnas = columnas
+        self.escalas = escalas
+        self.validez = validez
+        self.imputados = imputados
+        self.columna_fecha = columna_fecha
+        self.attrs = {}
+
+    def __len__(self):
+        return len(self.desplazamientos)
+
+    # Fechas como datetime64[ns]
+    def fechas(self):
+        return (self.desplazamientos.astype('int64') * np.timedelta64(1, self.unidad)
+                + EPOCA).astype('datetime64[ns]')
+
+    # Máscara booleana de las celdas válidas de una variable
+    def validos(self, variable):
+        return np.unpackbits(self.validez[self.variables.index(variable)], count=len(self)).astype(bool)
+
+    # Máscara booleana de las celdas imputadas de una variable
+    def imputado(self, variable):
+        if self.imputados is None:
+            return np.zeros(len(self), dtype=bool)
+        return np.unpackbits(self.imputados[self.variables.index(variable)], count=len(self)).astype(bool)
+
+    # Valores de una variable en float64, con NaN en las celdas no válidas.
+    # Con inicio y fin solo se decodifican las filas [inicio, fin)
+    def valores(self, variable, inicio=0, fin=None):
+        valores = self.columnas[variable][inicio:fin].astype('float64')
+        escala = self.escalas[variable]
+        if escala is not None:
+            valores *= escala
+        valores[~self.validos(variable)[inicio:fin]] = np.nan
+        return valores
+
+    # Función para reconstruir el DataFrame en float64 de las variables y las
+    # filas [inicio, fin) pedidas
+    def a_dataframe(self, variables=None, inicio=0, fin=None):
+        variables = self.variables if variables is None else list(variables)
+        datos_i = pd.DataFrame({variable: self.valores(variable, inicio, fin) for variable in variables})
+        datos_i.insert(0, self.columna_fecha, self.fechas()[inicio:fin])
+        if inicio:
+            datos_i.index += inicio
+        datos_i.attrs = dict(self.attrs)
+        return datos_i
+
+    # Memoria ocupada por los arreglos, en bytes
+    def nbytes(self):
+        total = self.desplazamientos.nbytes + self.validez.nbytes
+        total += sum(columna.nbytes for columna in self.columnas.values())
+        if self.imputados is not None:
+            total += self.imputados.nbytes
+        return total
+
+# Función para codificar una variable: devuelve el arreglo y la escala usada
+# (None si quedó en float32)
+def _codificar(valores, validos, tipo, escala):
+    if tipo is not None:
+        info = np.iinfo(tipo)
+        escalados = np.rint(np.where(validos, valores, 0.0) / escala)
+        if not validos.any() or (escalados.min() >= info.min and escalados.max() <= info.max):
+            return escalados.astype(tipo), escala
+    return np.where(validos, valores, 0.0).astype('float32'), None
+
+# Función para construir el almacén compacto de un DataFrame de POWER. Con
+# banderas (filas x variables) también se guarda la máscara de celdas imputadas
+def compactar(datos, banderas=None, escalas=ESCALAS, unidad='D', columna_fecha='Fecha del registro'):
+    variables = [col for col in datos.columns if col != columna_fecha]
+    fechas = datos[columna_fecha].to_numpy(dtype='datetime64[ns]')
+    desplazamientos = ((fechas - EPOCA) // np.timedelta64(1, unidad)).astype('int32')
+
+    columnas, escalas_usadas, validos = {}, {}, []
+    for variable in variables:
+        valores = datos[variable].to_numpy(dtype='float64')
+        valido = ~np.isnan(valores)
+        tipo, escala = escalas.get(variable, (None, None))
+        columnas[variable], escalas_usadas[variable] = _codificar(valores, valido, tipo, escala)
+        validos.append(valido)
+
+    validez = np.packbits(np.array(validos, dtype=bool).reshape(len(variables), -1), axis=1)
+    imputados = None
+    if banderas is not None:
+        imputados = np.packbits(np.asarray(banderas, dtype=bool).T, axis=1)
+
+    almacen = AlmacenCompacto(desplazamientos, unidad, variables, columnas, escalas_usadas, validez,
+                              imputados, columna_fecha)
+    almacen.attrs = dict(datos.attrs)
+    return almacen
+
+# Memoria ocupada por un DataFrame, en bytes
+def memoria(datos):
+    return int(datos.memory_usage(index=False, deep=True).sum())
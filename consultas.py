@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+import compacto
+
+# Índice de fechas ordenado para seleccionar rangos, años y meses con búsqueda
+# binaria en lugar de recorrer todo el DataFrame con máscaras booleanas. Los
+# datos pueden ser un DataFrame o un compacto.AlmacenCompacto; con el almacén
+# solo se decodifican las filas y variables de cada consulta
+class ConsultaFechas:
+
+    def __init__(self, datos, columna_fecha='Fecha del registro'):
+        self.columna_fecha = columna_fecha
+        if isinstance(datos, compacto.AlmacenCompacto):
+            # El almacén se construye desde los datos ya ordenados de la caché
+            self._almacen = datos
+            self._datos = None
+            self.columnas = [columna_fecha] + datos.variables
+            self.fechas = datos.fechas()
+        else:
+            # Se ordena una sola vez si las fechas no vienen ordenadas
+            if not datos[columna_fecha].is_monotonic_increasing:
+                datos = datos.sort_values(columna_fecha, kind='stable').reset_index(drop=True)
+            self._almacen = None
+            self._datos = datos
+            self.columnas = list(datos.columns)
+            self.fechas = datos[columna_fecha].to_numpy(dtype='datetime64[ns]')
+
+        # Tablas de desplazamientos: posición donde empieza cada mes y cada año.
+        # Como las fechas están ordenadas basta con buscar los cambios de valor
+        meses = self.fechas.astype('datetime64[M]')
+        cambios = np.flatnonzero(meses[1:] != meses[:-1]) + 1
+        inicios = np.concatenate(([0], cambios)) if len(meses) else np.array([], dtype='int64')
+        self._meses = meses[inicios]
+        self._limites_mes = np.append(inicios, len(meses))
+
+        anios = self._meses.astype('datetime64[Y]')
+        cambios = np.flatnonzero(anios[1:] != anios[:-1]) + 1
+        inicios_anio = np.concatenate(([0], cambios)) if len(anios) else np.array([], dtype='int64')
+        self._anios = anios[inicios_anio]
+        self._limites_anio = np.append(self._limites_mes[inicios_anio], len(meses))
+
+    # DataFrame completo; con un almacén compacto se decodifica en cada llamada
+    @property
+    def datos(self):
+        if self._almacen is not None:
+            return self._almacen.a_dataframe()
+        return self._datos
+
+    # Función para devolver las filas [i, j) con las variables pedidas
+    def _vista(self, i, j, variables=None):
+        if self._almacen is not None:
+            if isinstance(variables, str):
+                variables = [variables]
+            variables = [v for v in variables or self._almacen.variables if v != self.columna_fecha]
+            return self._almacen.a_dataframe(variables, i, j)
+        if variables is None:
+            return self.datos.iloc[i:j]
+        if isinstance(variables, str):
+            variables = [variables]
+        columnas = [self.columna_fecha] + [v for v in variables if v != self.columna_fecha]
+        return self.datos.iloc[i:j][columnas]
+
+    # Posiciones [i, j) de las filas entre inicio y fin (ambos incluidos)
+    def posiciones(self, inicio, fin):
+        i = np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(inicio), 'ns'), side='left')
+        j = np.searchsorted(self.fechas, np.datetime64(pd.Timestamp(fin), 'ns'), side='right')
+        return int(i), int(max(i, j))
+
+    # Función para seleccionar las filas entre dos fechas (ambas incluidas)
+    def rango(self, inicio, fin, variables=None):
+        i, j = self.posiciones(inicio, fin)
+        return self._vista(i, j, variables)
+
+    # Función para seleccionar un mes de un año
+    def mes(self, anio, mes, variables=None):
+        clave = np.datetime64(f'{int(anio):04d}-{int(mes):02d}', 'M')
+        k = np.searchsorted(self._meses, clave)
+        if k == len(self._meses) or self._meses[k] != clave:
+            return self._vista(0, 0, variables)
+        return self._vista(self._limites_mes[k], self._limites_mes[k + 1], variables)
+
+    # Función para seleccionar varios meses de un año, en el orden indicado
+    def anio_mes(self, anio, meses, variables=None):
+        if isinstance(meses, (int, np.integer)):
+            return self.mes(anio, meses, variables)
+        partes = [self.mes(anio, mes, variables) for mes in meses]
+        if not partes:
+            return self._vista(0, 0, variables)
+        return pd.concat(partes)
+
+    # Función para seleccionar un año completo
+    def anio(self, anio, variables=None):
+        clave = np.datetime64(f'{int(anio):04d}', 'Y')
+        k = np.searchsorted(self._anios, clave)
+        if k == len(self._anios) or self._anios[k] != clave:
+            return self._vista(0, 0, variables)
+        return self._vista(self._limites_anio[k], self._limites_anio[k + 1], variables)
+
+    # Años disponibles en los datos
+    def anios(self):
+        return self._anios.astype('int64') + 1970
+
+    # Meses (1-12) disponibles en un año
+    def meses(self, anio):
+        clave = np.datetime64(f'{int(anio):04d}', 'Y')
+        meses = self._meses[self._meses.astype('datetime64[Y]') == clave]
+        return meses.astype('int64') % 12 + 1
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# Co-momentos de varias variables acumulados por bloques (fórmulas de Welford y
+# Chan). Para cada pareja de variables se guardan el número de observaciones
+# válidas de ambas, los promedios y las sumas de productos de desviaciones, así
+# que añadir días o combinar estaciones no obliga a recorrer de nuevo la serie.
+# Los faltantes se excluyen por parejas, igual que DataFrame.corr
+class Comomentos:
+
+    def __init__(self, variables):
+        self.variables = list(variables)
+        n_var = len(self.variables)
+
+        # En la posición [i, j] están los valores de la variable i sobre las
+        # filas en que i y j son válidas
+        self.n = np.zeros((n_var, n_var))
+        self.media = np.zeros((n_var, n_var))
+        self.m2 = np.zeros((n_var, n_var))
+        self.comomento = np.zeros((n_var, n_var))
+
+    # Función para combinar con los co-momentos de otro bloque (fórmula de Chan)
+    def _combinar(self, n, media, m2, comomento):
+        total = self.n + n
+        delta = media - self.media
+        with np.errstate(invalid='ignore', divide='ignore'):
+            proporcion = np.where(total > 0, n / total, 0.0)
+        factor = self.n * proporcion
+        self.media = self.media + delta * proporcion
+        self.m2 += m2 + delta ** 2 * factor
+        self.comomento += comomento + delta * delta.T * factor
+        self.n = total
+        return self
+
+    # Función para añadir un bloque de filas (filas x variables)
+    def actualizar(self, valores):
+        valores = np.asarray(valores, dtype='float64').reshape(-1, len(self.variables))
+        validos = ~np.isnan(valores)
+        pesos = validos.astype('float64')
+
+        # Se centra con el promedio del bloque para reducir la cancelación numérica
+        with np.errstate(invalid='ignore'):
+            centro = np.nanmean(valores, axis=0) if len(valores) else np.zeros(len(self.variables))
+        centro = np.nan_to_num(centro)
+        limpios = np.where(validos, valores - centro, 0.0)
+
+        n = pesos.T @ pesos
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(n > 0, (limpios.T @ pesos) / n, 0.0)
+        m2 = (limpios ** 2).T @ pesos - n * media ** 2
+        comomento = limpios.T @ limpios - n * media * media.T
+        return self._combinar(n, media + centro[:, None], m2, comomento)
+
+    # Función para quitar un bloque de filas ya añadido; es la fórmula de Chan
+    # despejada para la parte que queda
+    def retirar(self, valores):
+        parte = Comomentos(self.variables).actualizar(valores)
+        resto = self.n - parte.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(resto > 0, (self.n * self.media - parte.n * parte.media) / resto, 0.0)
+            factor = np.where(resto > 0, resto * parte.n / self.n, 0.0)
+        delta = parte.media - media
+        self.m2 = np.where(resto > 0, self.m2 - parte.m2 - delta ** 2 * factor, 0.0)
+        self.comomento = np.where(resto > 0, self.comomento - parte.comomento - delta * delta.T * factor, 0.0)
+        self.media = media
+        self.n = resto
+        return self
+
+    # Función para combinar con otra instancia (por ejemplo, otra estación)
+    def combinar(self, otro):
+        if otro.variables != self.variables:
+            raise ValueError("Las variables de los co-momentos no coinciden")
+        return self._combinar(otro.n, otro.media, otro.m2, otro.comomento)
+
+    # Matriz de covarianzas muestrales como DataFrame
+    def covarianza(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matriz = np.where(self.n > 1, self.comomento / (self.n - 1), np.nan)
+        return pd.DataFrame(matriz, index=self.variables, columns=self.variables)
+
+    # Matriz de correlaciones de Pearson como DataFrame
+    def correlacion(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matriz = self.comomento / np.sqrt(self.m2 * self.m2.T)
+        matriz = np.where(self.n > 1, np.clip(matriz, -1, 1), np.nan)
+        np.fill_diagonal(matriz, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        return pd.DataFrame(matriz, index=self.variables, columns=self.variables)
+
+# Función para construir los co-momentos de un DataFrame de POWER
+def construir(datos, columna_fecha='Fecha del registro'):
+    variables = datos.drop(columns=columna_fecha).select_dtypes('number').columns
+    return Comomentos(variables).actualizar(datos[variables].to_numpy())
+
+# Función para combinar los co-momentos de varias estaciones
+def combinar(comomentos):
+    comomentos = list(comomentos)
+    total = Comomentos(comomentos[0].variables)
+    for parcial in comomentos:
+        total.combinar(parcial)
+    return total
+
+# Correlación cruzada de dos series (a, b) de todos los pares desplazados a la
+# vez con la FFT
+def _correlacion_cruzada(a, b, tamano):
+    return np.fft.irfft(np.conj(np.fft.rfft(a, tamano)) * np.fft.rfft(b, tamano), tamano)
+
+# Correlación de Pearson entre x(t) e y(t + k) para k = 0..desfase_maximo, con
+# los faltantes excluidos por parejas. Un valor alto en k > 0 indica que x se
+# adelanta a y. Todas las sumas por desfase se calculan con la FFT
+def correlacion_desfasada(x, y, desfase_maximo=30):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    desfase_maximo = min(desfase_maximo, n - 1)
+    tamano = 1 << int(np.ceil(np.log2(2 * n)))
+
+    wx, wy = (~np.isnan(x)).astype('float64'), (~np.isnan(y)).astype('float64')
+    x0 = np.where(wx > 0, x - np.nanmean(x), 0.0)
+    y0 = np.where(wy > 0, y - np.nanmean(y), 0.0)
+
+    k = slice(0, desfase_maximo + 1)
+    conteo = np.rint(_correlacion_cruzada(wx, wy, tamano)[k])
+    sx = _correlacion_cruzada(x0, wy, tamano)[k]
+    sy = _correlacion_cruzada(wx, y0, tamano)[k]
+    sxx = _correlacion_cruzada(x0 ** 2, wy, tamano)[k]
+    syy = _correlacion_cruzada(wx, y0 ** 2, tamano)[k]
+    sxy = _correlacion_cruzada(x0, y0, tamano)[k]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covarianza = sxy - sx * sy / conteo
+        r = covarianza / np.sqrt((sxx - sx ** 2 / conteo) * (syy - sy ** 2 / conteo))
+    r = np.where(conteo > 1, np.clip(r, -1, 1), np.nan)
+    return pd.Series(r, index=pd.RangeIndex(desfase_maximo + 1, name='desfase'), name='correlacion')
+
+# Correlación de Pearson en ventanas móviles de `ventana` filas, calculada con
+# sumas acumuladas. Una ventana necesita al menos `minimo` pares válidos
+def correlacion_movil(x, y, ventana=90, minimo=None):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    minimo = ventana if minimo is None else minimo
+
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x0 = np.where(validos, x - np.nanmean(x[validos]) if validos.any() else 0.0, 0.0)
+    y0 = np.where(validos, y - np.nanmean(y[validos]) if validos.any() else 0.0, 0.0)
+
+    # Sumas de cada ventana como diferencias de sumas acumuladas; las primeras
+    # ventanas están incompletas, como en DataFrame.rolling
+    acumulados = np.cumsum(np.column_stack((validos, x0, y0, x0 ** 2, y0 ** 2, x0 * y0)), axis=0)
+    sumas = acumulados.copy()
+    sumas[ventana:] -= acumulados[:-ventana]
+    conteo, sx, sy, sxx, syy, sxy = sumas.T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covarianza = sxy - sx * sy / conteo
+        r = covarianza / np.sqrt((sxx - sx ** 2 / conteo) * (syy - sy ** 2 / conteo))
+    return np.where(conteo >= max(minimo, 2), np.clip(r, -1, 1), np.nan)
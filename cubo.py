@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Estadísticos que se guardan en cada celda (estación, año, mes, variable).
+# Los cuantiles solo existen a nivel mensual: no se pueden combinar exactamente
+# al agregar varios meses
+ESTADISTICOS = ['conteo', 'suma', 'suma_cuadrados', 'minimo', 'maximo', 'q25', 'mediana', 'q75']
+INDICE = ['estacion', 'anio', 'mes', 'variable']
+
+# Función para construir el cubo año x mes x variable de una estación
+def construir_cubo(datos, estacion=None, columna_fecha='Fecha del registro'):
+    fechas = pd.DatetimeIndex(datos[columna_fecha])
+    valores = datos.drop(columns=columna_fecha).select_dtypes('number')
+    claves = [fechas.year.rename('anio'), fechas.month.rename('mes')]
+
+    # Cada estadístico se calcula para todas las variables en una sola agrupación
+    grupos = valores.groupby(claves)
+    partes = {
+        'conteo': grupos.count(),
+        'suma': grupos.sum(),
+        'suma_cuadrados': (valores ** 2).groupby(claves).sum(),
+        'minimo': grupos.min(),
+        'maximo': grupos.max(),
+    }
+    cuantiles = grupos.quantile([0.25, 0.5, 0.75])
+    for nombre, q in zip(['q25', 'mediana', 'q75'], [0.25, 0.5, 0.75]):
+        partes[nombre] = cuantiles.xs(q, level=-1)
+
+    cubo = pd.concat({nombre: parte.stack(future_stack=True) for nombre, parte in partes.items()}, axis=1)
+    cubo.index = cubo.index.set_names(['anio', 'mes', 'variable'])
+    cubo['conteo'] = cubo['conteo'].astype('int64')
+    cubo = pd.concat({estacion: cubo}, names=['estacion'])
+    return resumir(cubo)
+
+# Función para actualizar el cubo cuando cambian las filas desde la posición
+# `inicio` (por ejemplo, al anexar días nuevos): solo se recalculan las celdas
+# de los meses desde el de esa fila
+def actualizar_cubo(cubo, datos, estacion=None, inicio=0, columna_fecha='Fecha del registro'):
+    if inicio >= len(datos):
+        return cubo
+    fechas = datos[columna_fecha].to_numpy(dtype='datetime64[ns]')
+    primer_mes = fechas[inicio].astype('datetime64[M]')
+    desde = int(np.searchsorted(fechas, primer_mes))
+    nuevas = construir_cubo(datos.iloc[desde:], estacion, columna_fecha)
+
+    anio, mes = int(str(primer_mes)[:4]), int(str(primer_mes)[5:7])
+    anios = cubo.index.get_level_values('anio')
+    meses = cubo.index.get_level_values('mes')
+    anteriores = cubo[(anios < anio) | ((anios == anio) & (meses < mes))]
+    return pd.concat([anteriores, nuevas])
+
+# Función para añadir el promedio y la desviación estándar a partir de las sumas
+def resumir(cubo):
+    n = cubo['conteo'].astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cubo['promedio'] = (cubo['suma'] / n).where(n > 0)
+        varianza = (cubo['suma_cuadrados'] - cubo['suma'] ** 2 / n) / (n - 1)
+    cubo['desviacion'] = np.sqrt(varianza.clip(lower=0)).where(n > 1)
+    return cubo
+
+# Función para combinar celdas mensuales en agregados mayores sin volver a los datos diarios
+def _combinar(cubo, niveles):
+    grupos = cubo.groupby(level=niveles, sort=True)
+    combinado = pd.DataFrame({
+        'conteo': grupos['conteo'].sum(),
+        'suma': grupos['suma'].sum(),
+        'suma_cuadrados': grupos['suma_cuadrados'].sum(),
+        'minimo': grupos['minimo'].min(),
+        'maximo': grupos['maximo'].max(),
+    })
+    return resumir(combinado)
+
+# Agregado anual por (estación, año, variable)
+def anual(cubo):
+    return _combinar(cubo, ['estacion', 'anio', 'variable'])
+
+# Agregado de un conjunto de meses (p. ej. una temporada) por (estación, año, variable)
+def por_meses(cubo, meses):
+    return anual(cubo[cubo.index.get_level_values('mes').isin(meses)])
+
+# Función para obtener las celdas mensuales de una variable, en el orden de los meses pedidos
+def celdas_mensuales(cubo, estacion, variable, anio, meses):
+    claves = pd.MultiIndex.from_tuples([(estacion, anio, mes, variable) for mes in meses], names=INDICE)
+    return cubo.reindex(claves)
+
+# Función para obtener las celdas anuales de una variable, en el orden de los años pedidos
+def celdas_anuales(cubo_anual, estacion, variable, anios):
+    claves = pd.MultiIndex.from_tuples([(estacion, anio, variable) for anio in anios],
+                                       names=['estacion', 'anio', 'variable'])
+    return cubo_anual.reindex(claves)
+
+# Prueba t de Student entre dos celdas, calculada solo con sus estadísticos
+def prueba_t(celdas):
+    a, b = celdas.iloc[0], celdas.iloc[1]
+    return stats.ttest_ind_from_stats(a['promedio'], a['desviacion'], a['conteo'],
+                                      b['promedio'], b['desviacion'], b['conteo'])
+
+# ANOVA de una vía entre varias celdas, calculada solo con sus estadísticos
+def anova(celdas):
+    n = celdas['conteo'].to_numpy(dtype='float64')
+    suma = celdas['suma'].to_numpy(dtype='float64')
+    suma_cuadrados = celdas['suma_cuadrados'].to_numpy(dtype='float64')
+    k, total = len(n), n.sum()
+
+    # Sumas de cuadrados entre grupos y dentro de los grupos
+    media_total = suma.sum() / total
+    ss_entre = (suma ** 2 / n).sum() - total * media_total ** 2
+    ss_dentro = suma_cuadrados.sum() - (suma ** 2 / n).sum()
+
+    f = (ss_entre / (k - 1)) / (ss_dentro / (total - k))
+    return f, stats.f.sf(f, k - 1, total - k)
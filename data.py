@@ -1,38 +1,606 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import multiprocessing.context
+import os
+import re
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def importar_datos():
+import compacto
+import imputacion
+import instrumentacion
+
+# Archivo de datos por defecto y directorio donde se guarda la caché columnar
+ARCHIVO = "POWER_Point_Daily_20200101_20250531_002d92S_079d00W_LST.csv"
+DIRECTORIO_CACHE = ".cache"
+
+# Versión del formato de la caché; cambiarla invalida las cachés anteriores
+VERSION_CACHE = 5
+
+# Función para calcular el hash del contenido de un archivo por bloques
+def hash_archivo(ruta, bloque=1 << 20):
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for parte in iter(lambda: f.read(bloque), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+# Función para obtener el directorio de caché de un archivo de origen
+def ruta_cache(ruta, directorio_cache=DIRECTORIO_CACHE):
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(directorio_cache, nombre)
+
+# Función para comprobar que el archivo de origen no cambió desde que se
+# escribió la caché. Se compara primero el tamaño y la fecha de modificación;
+# el hash solo se calcula si la fecha cambió pero el tamaño es el mismo
+def origen_sin_cambios(ruta, meta, ruta_meta):
+    info = os.stat(ruta)
+    if info.st_size != meta['tamano']:
+        return False
+    if info.st_mtime_ns != meta['mtime']:
+        if hash_archivo(ruta) != meta['hash']:
+            return False
+        meta['mtime'] = info.st_mtime_ns
+        with open(ruta_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    return True
+
+# Función para leer la caché si sigue siendo válida para el archivo de origen
+def _leer_cache(ruta, carpeta, estrategia):
+    ruta_meta = os.path.join(carpeta, 'meta.json')
+    if not os.path.exists(ruta_meta):
+        return None
+
+    with open(ruta_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('version') != VERSION_CACHE or meta.get('imputacion') != estrategia:
+        return None
+    if not origen_sin_cambios(ruta, meta, ruta_meta):
+        return None
+
+    # Los arreglos se mapean en memoria en lugar de leerse completos. Solo se
+    # toman las filas registradas en los metadatos: las cachés escritas por
+    # versiones anteriores tienen espacio reservado al final
+    filas = meta['filas']
+    fechas = np.load(os.path.join(carpeta, 'fechas.npy'), mmap_mode='r')[:filas]
+    valores = np.load(os.path.join(carpeta, 'valores.npy'), mmap_mode='r')[:, :filas]
+    banderas = np.load(os.path.join(carpeta, 'imputados.npy'), mmap_mode='r')[:, :filas]
+
+    datos_i = pd.DataFrame(valores.T, columns=meta['columnas'], copy=False)
+    datos_i.insert(0, 'Fecha del registro', pd.DatetimeIndex(fechas.view('datetime64[ns]')))
+    datos_i.attrs['encabezado'] = meta.get('encabezado')
+    datos_i.attrs['anexos'] = meta.get('anexos', [])
+    return datos_i, banderas.T
+
+# Función para guardar un arreglo de la caché. Se escribe en un archivo
+# temporal y luego se reemplaza, para no alterar los arreglos que otros
+# procesos tengan mapeados: siguen viendo el archivo anterior
+def _guardar_arreglo(ruta, arreglo):
+    temporal = ruta[:-len('.npy')] + '.tmp.npy'
+    np.save(temporal, arreglo)
+    os.replace(temporal, ruta)
+
+# Función para escribir los metadatos de la caché; su presencia marca la caché como válida
+def guardar_meta(carpeta, meta):
+    ruta_meta = os.path.join(carpeta, 'meta.json')
+    with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(ruta_meta + '.tmp', ruta_meta)
+
+# Función para escribir la caché columnar de los datos ya limpios
+def _escribir_cache(ruta, carpeta, datos_i, banderas, estrategia):
+    os.makedirs(carpeta, exist_ok=True)
+    columnas = [col for col in datos_i.columns if col != 'Fecha del registro']
+
+    # Los valores se guardan como una matriz (variables x días) para que cada
+    # columna quede contigua en disco
+    fechas = datos_i['Fecha del registro'].to_numpy(dtype='datetime64[ns]').view('int64')
+    valores = datos_i[columnas].to_numpy(dtype='float64').T
+    _guardar_arreglo(os.path.join(carpeta, 'fechas.npy'), fechas)
+    _guardar_arreglo(os.path.join(carpeta, 'valores.npy'), valores)
+    _guardar_arreglo(os.path.join(carpeta, 'imputados.npy'), banderas.T)
+
+    # El archivo de metadatos se escribe al final
+    info = os.stat(ruta)
+    meta = {
+        'version': VERSION_CACHE,
+        'origen': os.path.basename(ruta),
+        'tamano': info.st_size,
+        'mtime': info.st_mtime_ns,
+        'hash': hash_archivo(ruta),
+        'columnas': columnas,
+        'imputacion': estrategia,
+        'encabezado': datos_i.attrs.get('encabezado'),
+        'filas': len(datos_i),
+        'anexos': [],
+    }
+    guardar_meta(carpeta, meta)
+
+# Nombres en español de los parámetros de POWER usados en la página web;
+# los parámetros que no estén en este diccionario conservan su código
+NOMBRES = {
+    'T2M': 'Temperatura (°C)',
+    'RH2M': 'Humedad relativa (%)',
+    'PRECTOTCORR': 'Precipitación (mm)',
+    'WS2M': 'Viento (m/s)',
+    'ALLSKY_SFC_SW_DWN': 'Radiación solar (kWh/m²/día)'
+}
+
+# Columnas de fecha que pueden aparecer en los distintos productos de POWER
+COLUMNAS_FECHA = ['DATE', 'YEAR', 'MO', 'DY', 'HR', 'DOY', 'PARAMETER']
+MESES = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+# Función para leer el bloque -BEGIN HEADER- / -END HEADER- de un archivo de POWER
+def leer_encabezado(ruta):
+    encabezado = {
+        'producto': None,
+        'resolucion': None,
+        'latitud': None,
+        'longitud': None,
+        'elevacion': None,
+        'fecha_inicio': None,
+        'fecha_fin': None,
+        'valor_faltante': -999.0,
+        'parametros': [],
+        'filas': 0,
+    }
+
+    with open(ruta, encoding='utf-8-sig') as f:
+        primera = f.readline().strip().strip(',').strip()
+        if primera != '-BEGIN HEADER-':
+            # Archivo sin encabezado: la primera fila ya son los nombres de las columnas
+            return encabezado
+
+        en_parametros = False
+        filas = 1
+        for linea in f:
+            filas += 1
+            linea = linea.strip().rstrip(',').strip()
+
+            if linea == '-END HEADER-':
+                break
 
+            if encabezado['producto'] is None:
+                encabezado['producto'] = linea
+                for resolucion in ['Hourly', 'Daily', 'Monthly', 'Climatology']:
+                    if resolucion.lower() in linea.lower():
+                        encabezado['resolucion'] = resolucion.lower()
+                        break
+                continue
+
+            periodo = re.search(r'(\d{2}/\d{2}/\d{4})\s+through\s+(\d{2}/\d{2}/\d{4})', linea)
+            if periodo:
+                encabezado['fecha_inicio'] = str(pd.to_datetime(periodo.group(1), format='%m/%d/%Y').date())
+                encabezado['fecha_fin'] = str(pd.to_datetime(periodo.group(2), format='%m/%d/%Y').date())
+                continue
+
+            ubicacion = re.search(r'latitude\s+(-?[\d.]+)\s+longitude\s+(-?[\d.]+)', linea)
+            if ubicacion:
+                encabezado['latitud'] = float(ubicacion.group(1))
+                encabezado['longitud'] = float(ubicacion.group(2))
+                continue
+
+            if linea.lower().startswith('elevation'):
+                elevacion = re.search(r'=\s*(-?[\d.]+)\s*meters', linea)
+                if elevacion:
+                    encabezado['elevacion'] = float(elevacion.group(1))
+                continue
+
+            if 'missing' in linea.lower():
+                faltante = re.search(r':\s*(-?[\d.]+)\s*$', linea)
+                if faltante:
+                    encabezado['valor_faltante'] = float(faltante.group(1))
+                continue
+
+            if linea.lower().startswith('parameter'):
+                en_parametros = True
+                continue
+
+            if en_parametros and linea:
+                # Cada parámetro tiene la forma "CODIGO   Descripción (unidad)"
+                partes = linea.split(None, 1)
+                descripcion = partes[1].strip() if len(partes) > 1 else ''
+                unidad = re.search(r'\(([^()]*)\)\s*$', descripcion)
+                encabezado['parametros'].append({
+                    'codigo': partes[0],
+                    'descripcion': descripcion,
+                    'unidad': unidad.group(1) if unidad else None,
+                })
+        else:
+            raise ValueError(f"No se encontró el fin del encabezado en {ruta}")
+
+    encabezado['filas'] = filas
+    return encabezado
+
+# Función para elegir el motor de lectura más rápido disponible
+def _motor_lectura():
     try:
-        # Leer el CSV, saltando las 13 filas iniciales
-        datos_i = pd.read_csv("POWER_Point_Daily_20200101_20250531_002d92S_079d00W_LST.csv", skiprows=13)
-        
-        # Renombrar columnas para facilitar su uso
-        datos_i = datos_i.rename(columns={
-            'DATE': 'Fecha del registro', 
-            'T2M': 'Temperatura (°C)', 
-            'RH2M': 'Humedad relativa (%)', 
-            'PRECTOTCORR': 'Precipitación (mm)', 
-            'WS2M': 'Viento (m/s)',
-            'ALLSKY_SFC_SW_DWN': 'Radiación solar (kWh/m²/día)'
-        })
-        
-        # Convertir la columna de fecha a tipo datetime
-        datos_i['Fecha del registro'] = pd.to_datetime(datos_i['Fecha del registro'])
-
-        # Reemplazar valores -999 (faltantes) con NaN
-        datos_i = datos_i.replace(-999, pd.NA)
-        
-        # Convertir columnas a tipo numérico donde sea posible
-        for col in datos_i.columns:
-            if col != 'Fecha del registro':
-                datos_i[col] = pd.to_numeric(datos_i[col], errors='coerce')
-
-        # Imputar valores faltantes con el promedio semanal
-        datos_i.set_index('Fecha del registro', inplace=True)
-        datos_i = datos_i.groupby(datos_i.index.to_period('W')).transform(lambda x: x.fillna(x.mean()))
-        datos_i = datos_i.reset_index()
-        
-        return datos_i
+        import pyarrow  # noqa: F401
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
+# Función para construir la columna de fecha según el producto de POWER
+def construir_fechas(datos_i):
+    if 'DATE' in datos_i.columns:
+        return pd.to_datetime(datos_i['DATE'].astype(str))
+    if 'DOY' in datos_i.columns:
+        return (pd.to_datetime(datos_i['YEAR'].astype(str), format='%Y')
+                + pd.to_timedelta(datos_i['DOY'] - 1, unit='D'))
+    partes = {'year': datos_i['YEAR'], 'month': datos_i['MO'], 'day': datos_i['DY']}
+    if 'HR' in datos_i.columns:
+        partes['hour'] = datos_i['HR']
+    return pd.to_datetime(pd.DataFrame(partes))
+
+# Función para leer el CSV original de POWER, sin imputar los faltantes
+def _leer_csv(ruta):
+    encabezado = leer_encabezado(ruta)
+    codigos = [p['codigo'] for p in encabezado['parametros']]
+
+    # El valor faltante se convierte a NaN durante la lectura y no con un replace posterior
+    faltante = encabezado['valor_faltante']
+    nulos = [f'{faltante:g}', f'{faltante:.1f}', f'{faltante:.2f}']
+
+    # Leer el CSV en una sola pasada con tipos declarados
+    datos_i = pd.read_csv(
+        ruta,
+        header=encabezado['filas'],
+        na_values=nulos,
+        dtype={codigo: 'float64' for codigo in codigos + MESES + ['ANN']},
+        engine=_motor_lectura(),
+    )
+
+    # Los productos mensuales traen una fila por parámetro y año; se llevan al formato de una fila por fecha
+    if 'PARAMETER' in datos_i.columns:
+        datos_i = datos_i.melt(id_vars=['PARAMETER', 'YEAR'], value_vars=MESES, var_name='MO')
+        datos_i['MO'] = datos_i['MO'].map({mes: i + 1 for i, mes in enumerate(MESES)})
+        datos_i['DY'] = 1
+        datos_i = datos_i.pivot_table(index=['YEAR', 'MO', 'DY'], columns='PARAMETER',
+                                      values='value', dropna=False).reset_index()
+        datos_i.columns.name = None
+
+    # Convertir la columna de fecha a tipo datetime
+    fechas = construir_fechas(datos_i)
+
+    # Las variables conservan el orden en que aparecen en el encabezado
+    variables = [col for col in datos_i.columns if col not in COLUMNAS_FECHA]
+    variables.sort(key=lambda col: codigos.index(col) if col in codigos else len(codigos))
+    datos_i = datos_i[variables].astype('float64')
+    datos_i.insert(0, 'Fecha del registro', fechas)
+
+    # Renombrar columnas para facilitar su uso
+    datos_i = datos_i.rename(columns=NOMBRES)
+    datos_i.attrs['encabezado'] = encabezado
+    return datos_i
+
+# Función para leer y limpiar el CSV original de POWER
+def _procesar_csv(ruta, estrategia='semanal'):
+    datos_i = _leer_csv(ruta)
+
+    # Imputar valores faltantes (por defecto con el promedio semanal)
+    return imputacion.imputar(datos_i, estrategia)
+
+# Función para importar los datos limpios de un archivo de POWER. Con
+# con_banderas=True también devuelve la matriz de celdas imputadas
+@instrumentacion.cronometrar()
+def importar_datos(ruta=ARCHIVO, usar_cache=True, estrategia='semanal', con_banderas=False):
+
+    try:
+        carpeta = ruta_cache(ruta)
+
+        # Si existe una caché válida se mapea directamente sin volver a leer el CSV
+        if usar_cache:
+            try:
+                cache = _leer_cache(ruta, carpeta, estrategia)
+                if cache is not None:
+                    return cache if con_banderas else cache[0]
+            except Exception as e:
+                print(f"Caché inválida, se vuelve a leer el CSV: {e}")
+
+        datos_i, banderas = _procesar_csv(ruta, estrategia)
+
+        # Guardar la caché para las siguientes ejecuciones
+        if usar_cache:
+            try:
+                _escribir_cache(ruta, carpeta, datos_i, banderas, estrategia)
+            except Exception as e:
+                print(f"No se pudo escribir la caché: {e}")
+
+        return (datos_i, banderas) if con_banderas else datos_i
     except Exception as e:
         print(f"Error al importar datos: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# Función para obtener la primera fila de la caché cuya imputación depende de
+# los días que se van a anexar. Con la estrategia semanal es el lunes de la
+# semana del primer día nuevo; con interpolación, la última observación real
+# de cada variable; con la climatología (promedios por día del año de toda la
+# serie) hay que volver a imputar todo
+def _inicio_reimputacion(datos_i, banderas, primera_fecha, estrategia):
+    fechas = datos_i['Fecha del registro'].to_numpy(dtype='datetime64[ns]')
+    n = len(fechas)
+
+    if estrategia == 'semanal':
+        semana = imputacion.codigos_semana([primera_fecha])[0]
+        lunes = np.datetime64(int(semana * 7 + imputacion.DESFASE_LUNES), 'D')
+        return int(np.searchsorted(fechas, lunes))
+
+    if estrategia == 'interpolacion':
+        # Se busca hacia atrás en tramos cada vez más largos hasta encontrar una
+        # observación real de cada variable
+        ventana = 64
+        while True:
+            inicio = max(n - ventana, 0)
+            valores = datos_i.iloc[inicio:, 1:].to_numpy(dtype='float64')
+            validos = ~banderas[inicio:] & ~np.isnan(valores)
+            if validos.any(axis=0).all() or inicio == 0:
+                break
+            ventana *= 2
+        ultimas = [inicio + np.flatnonzero(columna)[-1] if columna.any() else 0 for columna in validos.T]
+        return int(min(ultimas)) if ultimas else n
+
+    return 0
+
+# Función para escribir en la caché las filas desde `inicio`. Las sesiones y
+# los procesos que ya mapearon la caché no deben ver cambiar sus valores, así
+# que cada arreglo se escribe completo en un archivo nuevo que reemplaza al
+# anterior; los metadatos, que cambian la versión de los datos, se escriben
+# después del reemplazo
+def _escribir_filas(carpeta, inicio, datos_i, banderas, columnas):
+    arreglos = {
+        'fechas.npy': datos_i['Fecha del registro'].to_numpy(dtype='datetime64[ns]').view('int64'),
+        'valores.npy': datos_i[columnas].to_numpy(dtype='float64').T,
+        'imputados.npy': banderas.T,
+    }
+    for nombre, arreglo in arreglos.items():
+        ruta_arreglo = os.path.join(carpeta, nombre)
+        anterior = np.load(ruta_arreglo, mmap_mode='r')
+        completo = np.concatenate((anterior[..., :inicio], arreglo), axis=-1)
+        del anterior
+        _guardar_arreglo(ruta_arreglo, completo)
+
+# Función para anexar a la caché de un archivo de POWER los días de una
+# exportación más reciente (completa o solo con los días nuevos). Solo se
+# añaden las fechas posteriores a las ya guardadas y solo se vuelven a imputar
+# las filas que dependen de ellas, así que el costo depende de los días nuevos
+# y no de toda la serie. Devuelve los datos actualizados y la posición de la
+# primera fila que cambió (None si no hubo días nuevos)
+def anexar_datos(ruta, ruta_nueva, estrategia='semanal'):
+
+    try:
+        carpeta = ruta_cache(ruta)
+        cache = _leer_cache(ruta, carpeta, estrategia)
+        if cache is None:
+            if importar_datos(ruta, estrategia=estrategia) is None:
+                return None, None
+            cache = _leer_cache(ruta, carpeta, estrategia)
+            if cache is None:
+                raise ValueError(f"No existe una caché para {ruta}")
+        datos_i, banderas = cache
+
+        with open(os.path.join(carpeta, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        columnas = meta['columnas']
+
+        # Días de la exportación nueva posteriores al último día guardado
+        nuevos = _leer_csv(ruta_nueva)
+        if len(datos_i):
+            nuevos = nuevos[nuevos['Fecha del registro'] > datos_i['Fecha del registro'].iloc[-1]]
+        if nuevos.empty:
+            return datos_i, None
+        nuevos = nuevos.reindex(columns=['Fecha del registro'] + columnas).reset_index(drop=True)
+
+        # Las filas que se vuelven a imputar recuperan sus faltantes originales
+        inicio = _inicio_reimputacion(datos_i, banderas, nuevos['Fecha del registro'].iloc[0], estrategia)
+        cola = pd.DataFrame(np.where(banderas[inicio:], np.nan, datos_i.iloc[inicio:][columnas].to_numpy()),
+                            columns=columnas)
+        cola.insert(0, 'Fecha del registro', datos_i['Fecha del registro'].iloc[inicio:].to_numpy())
+        cola = pd.concat([cola, nuevos], ignore_index=True)
+        cola, banderas_cola = imputacion.imputar(cola, estrategia)
+
+        _escribir_filas(carpeta, inicio, cola, banderas_cola, columnas)
+
+        # Los metadatos registran cada anexo con la primera fila que cambió
+        meta['filas'] = inicio + len(cola)
+        meta['anexos'].append({
+            'origen': os.path.basename(ruta_nueva),
+            'hash': hash_archivo(ruta_nueva),
+            'previas': len(datos_i),
+            'filas': meta['filas'],
+            'desde': inicio,
+        })
+        if meta.get('encabezado'):
+            meta['encabezado']['fecha_fin'] = str(cola['Fecha del registro'].iloc[-1].date())
+        guardar_meta(carpeta, meta)
+
+        return _leer_cache(ruta, carpeta, estrategia)[0], inicio
+    except Exception as e:
+        print(f"Error al anexar datos: {e}")
+        return None, None
+
+# Función para obtener, a partir de los anexos registrados en la caché, la
+# primera fila que cambió desde que los datos tenían `filas` filas. Devuelve
+# None si no hay un registro que lo indique (por ejemplo, tras una recarga completa)
+def primera_fila_modificada(datos_i, filas):
+    if len(datos_i) == filas:
+        return filas
+    anexos = datos_i.attrs.get('anexos', [])
+    previas = [anexo['previas'] for anexo in anexos]
+    if filas not in previas:
+        return None
+    return min(anexo['desde'] for anexo in anexos[previas.index(filas):])
+
+# Patrón de los archivos de POWER que se buscan en un directorio
+PATRON_ARCHIVOS = 'POWER_Point_*.csv'
+
+# Función para obtener el identificador de una estación a partir del nombre
+# del archivo (p. ej. 002d92S_079d00W) o, si no lo tiene, de sus coordenadas
+def _id_estacion(ruta, encabezado):
+    coordenadas = re.search(r'(\d{3}d\d{2}[NS]_\d{3}d\d{2}[EW])', os.path.basename(ruta))
+    if coordenadas:
+        return coordenadas.group(1)
+    if encabezado['latitud'] is not None:
+        return f"{encabezado['latitud']:.4f}_{encabezado['longitud']:.4f}"
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+# Función para construir el catálogo de estaciones de un directorio a partir
+# de los encabezados de los archivos de POWER. Solo se incluyen los archivos
+# con la resolución indicada (o sin encabezado, que se tratan como diarios):
+# los horarios comparten el identificador del archivo diario del mismo punto y
+# se leen con el módulo horario
+def catalogo_estaciones(directorio='.', resolucion='daily'):
+    filas = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, PATRON_ARCHIVOS))):
+        try:
+            encabezado = leer_encabezado(ruta)
+        except Exception as e:
+            print(f"No se pudo leer el encabezado de {ruta}: {e}")
+            continue
+        if (encabezado['resolucion'] or 'daily') != resolucion:
+            continue
+        filas.append({
+            'estacion': _id_estacion(ruta, encabezado),
+            'archivo': ruta,
+            'latitud': encabezado['latitud'],
+            'longitud': encabezado['longitud'],
+            'elevacion': encabezado['elevacion'],
+            'resolucion': encabezado['resolucion'],
+            'fecha_inicio': encabezado['fecha_inicio'],
+            'fecha_fin': encabezado['fecha_fin'],
+            'parametros': [p['codigo'] for p in encabezado['parametros']],
+        })
+
+    columnas = ['estacion', 'archivo', 'latitud', 'longitud', 'elevacion',
+                'resolucion', 'fecha_inicio', 'fecha_fin', 'parametros']
+    catalogo = pd.DataFrame(filas, columns=columnas).set_index('estacion')
+
+    # Dos archivos del mismo punto y resolución harían que una estación reemplace a la otra
+    repetidas = catalogo.index[catalogo.index.duplicated()].unique()
+    if len(repetidas):
+        archivos = catalogo.loc[repetidas, 'archivo'].tolist()
+        raise ValueError(f"Hay varios archivos para las estaciones {list(repetidas)}: {archivos}")
+    return catalogo
+
+# Los procesos de trabajo se crean siempre con 'spawn': los grupos de procesos
+# se crean dentro del servidor de Streamlit, que ya tiene varios hilos, y un
+# proceso creado con 'fork' podría quedar bloqueado en un bloqueo heredado de
+# otro hilo. Al crear cada proceso 'spawn' vuelve a ejecutar el archivo del
+# módulo __main__, que en Streamlit es la página completa; por eso mientras se
+# crea el proceso se oculta __main__ y el proceso nuevo solo importa los
+# módulos de sus tareas. Las tareas y los inicializadores deben estar en
+# módulos importables, no en el script que se ejecuta
+_bloqueo_principal = threading.Lock()
+
+class _ProcesoSinPrincipal(multiprocessing.context.SpawnProcess):
+
+    @staticmethod
+    def _Popen(proceso):
+        with _bloqueo_principal:
+            principal = sys.modules['__main__']
+            sys.modules['__main__'] = types.ModuleType('__main__')
+            try:
+                return multiprocessing.context.SpawnProcess._Popen(proceso)
+            finally:
+                sys.modules['__main__'] = principal
+
+class _ContextoSinPrincipal(multiprocessing.context.SpawnContext):
+    Process = _ProcesoSinPrincipal
+
+# Función para crear un grupo de procesos de trabajo; todos los grupos de
+# procesos del proyecto se crean con esta función
+def crear_procesos(procesos=None, **opciones):
+    return ProcessPoolExecutor(max_workers=procesos, mp_context=_ContextoSinPrincipal(), **opciones)
+
+# Función que se ejecuta en cada proceso: limpia el archivo y escribe su caché.
+# Si la caché quedó escrita se devuelve None para no serializar el DataFrame
+# de vuelta; el proceso principal la mapea directamente
+def _cargar_en_proceso(ruta, estrategia):
+    datos_i = importar_datos(ruta, estrategia=estrategia)
+    if os.path.exists(os.path.join(ruta_cache(ruta), 'meta.json')):
+        return None
+    return datos_i
+
+# Función para dejar los valores de un DataFrame en un arreglo de solo lectura,
+# igual que los que se mapean desde la caché
+def _solo_lectura(datos_i, columna_fecha='Fecha del registro'):
+    columnas = [col for col in datos_i.columns if col != columna_fecha]
+    valores = np.ascontiguousarray(datos_i[columnas].to_numpy(dtype='float64').T)
+    valores.flags.writeable = False
+    resultado = pd.DataFrame(valores.T, columns=columnas, copy=False)
+    resultado.insert(0, columna_fecha, datos_i[columna_fecha].to_numpy())
+    resultado.attrs = dict(datos_i.attrs)
+    return resultado
+
+# Función para obtener una firma del estado de un archivo de POWER y de su
+# caché, solo con llamadas a stat. Cambia cuando se reemplaza el archivo o
+# cuando se anexan días a la caché
+def version_archivo(ruta):
+    info = os.stat(ruta)
+    ruta_meta = os.path.join(ruta_cache(ruta), 'meta.json')
+    meta = os.stat(ruta_meta).st_mtime_ns if os.path.exists(ruta_meta) else None
+    return (ruta, info.st_size, info.st_mtime_ns, meta)
+
+# Firma de todos los archivos de POWER de un directorio; también cambia cuando
+# se añade un archivo
+def version_estaciones(directorio='.'):
+    return tuple(version_archivo(ruta) for ruta in sorted(glob.glob(os.path.join(directorio, PATRON_ARCHIVOS))))
+
+# Función para importar todas las estaciones de un directorio. Los archivos
+# sin caché válida se procesan en paralelo; devuelve el catálogo y un
+# diccionario {estación: DataFrame}. Con modo_compacto=True cada estación se
+# devuelve como un compacto.AlmacenCompacto, que ocupa varias veces menos
+# memoria; se consulta con consultas.ConsultaFechas (ver servidor.py --compacto)
+@instrumentacion.cronometrar()
+def importar_estaciones(directorio='.', procesos=None, estrategia='semanal', modo_compacto=False):
+    catalogo = catalogo_estaciones(directorio)
+    estaciones = {}
+    pendientes = {}
+
+    # Primero se mapean las cachés válidas, que no necesitan otro proceso
+    for estacion, ruta in catalogo['archivo'].items():
+        try:
+            cache = _leer_cache(ruta, ruta_cache(ruta), estrategia)
+        except Exception:
+            cache = None
+        if cache is not None:
+            estaciones[estacion] = cache[0]
+        else:
+            pendientes[estacion] = ruta
+
+    # Los archivos pendientes se limpian en paralelo; con uno solo no vale la pena crear procesos
+    if len(pendientes) == 1 or procesos == 1:
+        for estacion, ruta in pendientes.items():
+            estaciones[estacion] = importar_datos(ruta, estrategia=estrategia)
+    elif pendientes:
+        with crear_procesos(procesos) as ejecutor:
+            futuros = {estacion: ejecutor.submit(_cargar_en_proceso, ruta, estrategia)
+                       for estacion, ruta in pendientes.items()}
+            for estacion, futuro in futuros.items():
+                estaciones[estacion] = futuro.result()
+
+    # Las estaciones recién limpiadas también se mapean desde su caché; si no se
+    # pudo escribir, se usa una copia en memoria de solo lectura
+    for estacion, ruta in pendientes.items():
+        try:
+            cache = _leer_cache(ruta, ruta_cache(ruta), estrategia)
+        except Exception:
+            cache = None
+        if cache is not None:
+            estaciones[estacion] = cache[0]
+        elif estaciones[estacion] is not None:
+            estaciones[estacion] = _solo_lectura(estaciones[estacion])
+
+    # Se descartan las estaciones que no se pudieron importar
+    estaciones = {estacion: datos_i for estacion, datos_i in estaciones.items() if datos_i is not None}
+    catalogo = catalogo.loc[[estacion for estacion in catalogo.index if estacion in estaciones]]
+    if modo_compacto:
+        estaciones = {estacion: compacto.compactar(datos_i) for estacion, datos_i in estaciones.items()}
+    return catalogo, estaciones
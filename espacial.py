@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+import consultas
+
+# Radio medio de la Tierra en kilómetros
+RADIO_TIERRA_KM = 6371.0088
+
+# Distancia por debajo de la cual un punto coincide con una estación
+TOLERANCIA_KM = 1e-6
+
+# Función para convertir latitud y longitud (grados) en puntos de la esfera unitaria
+def cartesianas(latitudes, longitudes):
+    latitudes = np.radians(np.asarray(latitudes, dtype='float64'))
+    longitudes = np.radians(np.asarray(longitudes, dtype='float64'))
+    coseno = np.cos(latitudes)
+    return np.stack((coseno * np.cos(longitudes), coseno * np.sin(longitudes), np.sin(latitudes)), axis=-1)
+
+# Conversión entre la distancia sobre la superficie (haversine) y la cuerda
+# entre los puntos de la esfera unitaria. La cuerda crece con la distancia
+# haversine, así que el árbol en 3D encuentra los mismos vecinos
+def _km(cuerda):
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.clip(np.asarray(cuerda) / 2, 0, 1))
+
+def _cuerda(km):
+    return 2 * np.sin(np.minimum(np.asarray(km, dtype='float64') / RADIO_TIERRA_KM, np.pi) / 2)
+
+# Distancia haversine en kilómetros entre puntos (se admiten arreglos)
+def haversine(latitud_1, longitud_1, latitud_2, longitud_2):
+    latitud_1, longitud_1, latitud_2, longitud_2 = map(np.radians, (latitud_1, longitud_1, latitud_2, longitud_2))
+    a = (np.sin((latitud_2 - latitud_1) / 2) ** 2
+         + np.cos(latitud_1) * np.cos(latitud_2) * np.sin((longitud_2 - longitud_1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+# Función para construir los puntos de una malla regular; devuelve las
+# latitudes y longitudes aplanadas (n_latitudes * n_longitudes puntos)
+def malla(latitud_min, latitud_max, longitud_min, longitud_max, n_latitudes=50, n_longitudes=50):
+    latitudes, longitudes = np.meshgrid(np.linspace(latitud_min, latitud_max, n_latitudes),
+                                        np.linspace(longitud_min, longitud_max, n_longitudes), indexing='ij')
+    return latitudes.ravel(), longitudes.ravel()
+
+# Índice espacial de las estaciones del catálogo: un árbol KD sobre las
+# coordenadas de los encabezados llevadas a la esfera unitaria
+class IndiceEstaciones:
+
+    def __init__(self, catalogo):
+        catalogo = catalogo.dropna(subset=['latitud', 'longitud'])
+        self.estaciones = catalogo.index.to_numpy()
+        self.latitudes = catalogo['latitud'].to_numpy(dtype='float64')
+        self.longitudes = catalogo['longitud'].to_numpy(dtype='float64')
+        self._arbol = cKDTree(cartesianas(self.latitudes, self.longitudes))
+
+    def __len__(self):
+        return len(self.estaciones)
+
+    # Función para buscar las k estaciones más cercanas a uno o varios puntos.
+    # Devuelve (posiciones, distancias en km), de forma (puntos, k)
+    def vecinos(self, latitudes, longitudes, k=1):
+        k = min(k, len(self))
+        cuerdas, posiciones = self._arbol.query(cartesianas(np.atleast_1d(latitudes), np.atleast_1d(longitudes)),
+                                                k=k)
+        return posiciones.reshape(-1, k), _km(cuerdas).reshape(-1, k)
+
+    # Función para obtener las k estaciones más cercanas a un punto, ordenadas por distancia
+    def cercanas(self, latitud, longitud, k=1):
+        posiciones, distancias = self.vecinos(latitud, longitud, k)
+        return self._tabla(posiciones[0], distancias[0])
+
+    # Función para obtener las estaciones a menos de `radio_km` de un punto, ordenadas por distancia
+    def en_radio(self, latitud, longitud, radio_km):
+        posiciones = np.array(self._arbol.query_ball_point(cartesianas(latitud, longitud), _cuerda(radio_km)),
+                              dtype='int64')
+        distancias = haversine(latitud, longitud, self.latitudes[posiciones], self.longitudes[posiciones])
+        orden = np.argsort(distancias, kind='stable')
+        return self._tabla(posiciones[orden], distancias[orden])
+
+    def _tabla(self, posiciones, distancias):
+        return pd.DataFrame({'estacion': self.estaciones[posiciones], 'latitud': self.latitudes[posiciones],
+                             'longitud': self.longitudes[posiciones], 'distancia_km': distancias})
+
+    # Función para calcular la matriz de pesos de distancia inversa (puntos x
+    # estaciones). Con k solo pesan las k estaciones más cercanas de cada punto
+    # y con radio_km solo las que están dentro del radio. Un punto que coincide
+    # con una estación toma su valor
+    def pesos(self, latitudes, longitudes, potencia=2, k=None, radio_km=None):
+        latitudes, longitudes = np.atleast_1d(latitudes), np.atleast_1d(longitudes)
+        posiciones, distancias = self.vecinos(latitudes, longitudes, k or len(self))
+        if radio_km is not None:
+            distancias = np.where(distancias <= radio_km, distancias, np.inf)
+
+        exactos = distancias < TOLERANCIA_KM
+        con_exacto = exactos.any(axis=1, keepdims=True)
+        with np.errstate(divide='ignore'):
+            inversos = np.where(con_exacto, exactos.astype('float64'), 1.0 / distancias ** potencia)
+
+        matriz = np.zeros((len(latitudes), len(self)))
+        np.put_along_axis(matriz, posiciones, inversos, axis=1)
+        return matriz
+
+    # Estaciones con peso en la interpolación de alguno de los puntos
+    def usadas(self, latitudes, longitudes, k=None, radio_km=None):
+        return self.estaciones[self.pesos(latitudes, longitudes, 1, k, radio_km).any(axis=0)]
+
+    # Función para interpolar una variable en uno o varios puntos, para todas
+    # las fechas entre inicio y fin, con una sola multiplicación de matrices
+    # (fechas x estaciones) por (estaciones x puntos). En cada fecha solo pesan
+    # las estaciones con dato; si ninguna tiene dato el resultado es NaN
+    def interpolar(self, estaciones, variable, latitudes, longitudes, inicio=None, fin=None, potencia=2,
+                   k=None, radio_km=None, columna_fecha='Fecha del registro'):
+        valores = valores_estaciones(estaciones, variable, inicio, fin, self.estaciones, columna_fecha)
+        pesos = self.pesos(latitudes, longitudes, potencia, k, radio_km)
+
+        datos = valores.to_numpy(dtype='float64')
+        validos = ~np.isnan(datos)
+        numerador = np.where(validos, datos, 0.0) @ pesos.T
+        denominador = validos.astype('float64') @ pesos.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado = np.where(denominador > 0, numerador / denominador, np.nan)
+        return pd.DataFrame(resultado, index=valores.index, columns=pd.RangeIndex(pesos.shape[0], name='punto'))
+
+# Función para alinear por fecha una variable de varias estaciones; devuelve
+# un DataFrame (fechas x estaciones) con NaN donde una estación no tiene dato.
+# Las estaciones que no tienen la variable quedan con una columna vacía, así que
+# no pesan en la interpolación. Pueden ser DataFrames o consultas.ConsultaFechas
+def valores_estaciones(estaciones, variable, inicio=None, fin=None, orden=None, columna_fecha='Fecha del registro'):
+    orden = list(estaciones) if orden is None else list(orden)
+    series = {}
+    for estacion in orden:
+        consulta = estaciones[estacion]
+        if not isinstance(consulta, consultas.ConsultaFechas):
+            consulta = consultas.ConsultaFechas(consulta, columna_fecha)
+        if variable not in consulta.columnas:
+            series[estacion] = pd.Series(dtype='float64', index=pd.DatetimeIndex([]))
+            continue
+        seleccion = consulta.rango(consulta.fechas[0] if inicio is None else inicio,
+                                   consulta.fechas[-1] if fin is None else fin, variable)
+        series[estacion] = pd.Series(seleccion[variable].to_numpy(), index=seleccion[columna_fecha].to_numpy())
+    valores = pd.DataFrame(series, columns=orden)
+    valores.index.name = columna_fecha
+    return valores.sort_index()
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+import instrumentacion
+
+# Memoria máxima, en bytes, que ocupan las figuras guardadas
+PRESUPUESTO_BYTES = 64 * 1024 * 1024
+
+# Caché de figuras de Plotly ya construidas, guardadas como JSON. La clave
+# describe todo lo que determina la figura (página, estación, versión de los
+# datos, variable, rango y opciones). Cuando el total de bytes supera el
+# presupuesto se descartan las figuras usadas hace más tiempo
+class CacheFiguras:
+
+    def __init__(self, presupuesto=PRESUPUESTO_BYTES):
+        self.presupuesto = presupuesto
+        self._figuras = OrderedDict()
+        self._bloqueo = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    # Función para obtener una figura; `construir` solo se llama si no está guardada
+    def obtener(self, clave, construir):
+        with self._bloqueo:
+            texto = self._figuras.get(clave)
+            if texto is not None:
+                self._figuras.move_to_end(clave)
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+        if texto is None:
+            with instrumentacion.medir('figuras.construir', clave=clave):
+                figura = construir()
+                texto = figura.to_json()
+            self._guardar(clave, texto)
+            return figura
+        with instrumentacion.medir('figuras.leer', clave=clave):
+            return pio.from_json(texto)
+
+    # Función para guardar una figura y descartar las más antiguas si se supera el presupuesto
+    def _guardar(self, clave, texto):
+        tamano = len(texto.encode('utf-8'))
+        if tamano > self.presupuesto:
+            return
+        with self._bloqueo:
+            if clave in self._figuras:
+                self.bytes -= len(self._figuras.pop(clave).encode('utf-8'))
+            self._figuras[clave] = texto
+            self.bytes += tamano
+            while self.bytes > self.presupuesto:
+                _, descartado = self._figuras.popitem(last=False)
+                self.bytes -= len(descartado.encode('utf-8'))
+                self.descartes += 1
+
+    # Contadores de uso de la caché
+    def estadisticas(self):
+        with self._bloqueo:
+            consultas = self.aciertos + self.fallos
+            return {
+                'figuras': len(self._figuras),
+                'bytes': self.bytes,
+                'presupuesto': self.presupuesto,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'descartes': self.descartes,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            }
+
+    # Función para vaciar la caché sin reiniciar los contadores
+    def limpiar(self):
+        with self._bloqueo:
+            self._figuras.clear()
+            self.bytes = 0
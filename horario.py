@@ -0,0 +1,303 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import data
+import instrumentacion
+
+# Filas horarias que se leen en cada bloque (unos 6 meses). La memoria usada
+# durante la lectura depende de este tamaño y no del tamaño del archivo
+FILAS_BLOQUE = 24 * 183
+
+# Estadísticos diarios que se calculan en la misma pasada
+ESTADISTICOS = ['media', 'minimo', 'maximo', 'suma', 'conteo']
+
+# Nombres de las variables horarias cuyas unidades cambian respecto al producto diario
+NOMBRES_HORARIOS = {
+    **data.NOMBRES,
+    'PRECTOTCORR': 'Precipitación (mm/h)',
+    'ALLSKY_SFC_SW_DWN': 'Radiación solar (Wh/m²)',
+}
+
+# Estadístico con el que se reconstruye cada variable del producto diario a
+# partir de la horaria: la precipitación y la radiación se suman; el resto se promedia
+ESTADISTICO_DIARIO = {
+    'PRECTOTCORR': 'suma',
+    'ALLSKY_SFC_SW_DWN': 'suma',
+}
+
+# Nombres de las sumas diarias cuando no se conocen las unidades del producto
+# diario: se conservan las unidades horarias sumadas en el día
+NOMBRES_SUMAS = {
+    'PRECTOTCORR': 'Precipitación (mm/día)',
+    'ALLSKY_SFC_SW_DWN': 'Radiación solar (Wh/m²/día)',
+}
+
+# Unidades de las variables que se suman: magnitud y su valor en la unidad
+# base (J/m² para la energía, mm para la lámina de agua). Un valor horario en
+# W/m² es la media de una hora, así que equivale a Wh/m²
+UNIDADES_SUMA = {
+    'wh/m^2': ('energia', 3600.0),
+    'w/m^2': ('energia', 3600.0),
+    'kwh/m^2': ('energia', 3.6e6),
+    'mj/m^2': ('energia', 1e6),
+    'mm': ('lamina', 1.0),
+}
+
+# Función para obtener la magnitud y la escala de una unidad sin el periodo
+# (p. ej. 'MJ/m^2/day' -> ('energia', 1e6)); None si no se conoce
+def _unidad_suma(unidad):
+    if not unidad:
+        return None
+    unidad = unidad.lower().replace(' ', '').replace('²', '^2')
+    for periodo in ('/day', '/hour', '/hr', '/h'):
+        if unidad.endswith(periodo):
+            unidad = unidad[:-len(periodo)]
+            break
+    return UNIDADES_SUMA.get(unidad)
+
+# Factor para pasar la suma diaria de una variable horaria a la unidad del
+# producto diario, según las unidades de los encabezados (p. ej. de Wh/m² a
+# MJ/m²/día es 0.0036). None si las unidades no se conocen o no son compatibles
+def factor_diario(unidad_horaria, unidad_diaria):
+    horaria, diaria = _unidad_suma(unidad_horaria), _unidad_suma(unidad_diaria)
+    if horaria is None or diaria is None or horaria[0] != diaria[0]:
+        return None
+    return horaria[1] / diaria[1]
+
+# Catálogo de los archivos horarios de un directorio (los diarios se leen con data)
+def catalogo(directorio='.'):
+    return data.catalogo_estaciones(directorio, resolucion='hourly')
+
+# Carpeta de la caché horaria de un archivo, junto a la caché diaria
+def ruta_cache(ruta):
+    return os.path.join(data.ruta_cache(ruta), 'horario')
+
+# Función para estimar el número de horas y días del archivo a partir de las
+# fechas del encabezado; si no las tiene se cuentan las líneas sin cargarlas
+def _capacidad(ruta, encabezado):
+    if encabezado['fecha_inicio'] and encabezado['fecha_fin']:
+        dias = (pd.Timestamp(encabezado['fecha_fin']) - pd.Timestamp(encabezado['fecha_inicio'])).days + 1
+        return dias * 24, dias
+    with open(ruta, 'rb') as f:
+        horas = sum(1 for _ in f) - encabezado['filas'] - 1
+    return horas, horas // 24 + 2
+
+# Estadísticos diarios de un bloque ordenado por hora: devuelve los días y una
+# matriz (estadísticos x días x variables) con la suma, el mínimo, el máximo y
+# el conteo de horas válidas. La media se calcula al final como suma / conteo
+def _resumir_bloque(fechas, valores):
+    dias = fechas.astype('datetime64[D]')
+    inicios = np.concatenate(([0], np.flatnonzero(dias[1:] != dias[:-1]) + 1))
+    validos = ~np.isnan(valores)
+    with np.errstate(invalid='ignore'):
+        suma = np.add.reduceat(np.where(validos, valores, 0.0), inicios, axis=0)
+        minimo = np.fmin.reduceat(valores, inicios, axis=0)
+        maximo = np.fmax.reduceat(valores, inicios, axis=0)
+    conteo = np.add.reduceat(validos.astype('float64'), inicios, axis=0)
+    return dias[inicios], np.stack((suma, minimo, maximo, conteo))
+
+# Función para combinar los estadísticos de un mismo día repartido en dos bloques
+def _combinar_dia(a, b):
+    return np.stack((a[0] + b[0], np.fmin(a[1], b[1]), np.fmax(a[2], b[2]), a[3] + b[3]))
+
+# Función para leer un archivo horario de POWER por bloques de `filas_bloque`
+# filas. Cada bloque convierte el valor faltante en NaN al leerse, se escribe
+# en los arreglos horarios de la caché (mapeados en disco) y se resume por
+# día; el último día del bloque queda pendiente hasta saber si continúa en el
+# siguiente. Solo se guarda en memoria un bloque a la vez
+@instrumentacion.cronometrar()
+def _escribir_cache(ruta, carpeta, filas_bloque=FILAS_BLOQUE):
+    encabezado = data.leer_encabezado(ruta)
+    codigos = [p['codigo'] for p in encabezado['parametros']]
+    faltante = encabezado['valor_faltante']
+    horas, dias = _capacidad(ruta, encabezado)
+
+    os.makedirs(carpeta, exist_ok=True)
+    lector = pd.read_csv(
+        ruta,
+        header=encabezado['filas'],
+        na_values=[f'{faltante:g}', f'{faltante:.1f}', f'{faltante:.2f}'],
+        dtype={codigo: 'float64' for codigo in codigos},
+        chunksize=filas_bloque,
+    )
+
+    fechas_horas = valores_horas = fechas_dias = resumen = None
+    variables, fila, dia, pendiente, ultima = [], 0, 0, None, None
+    for bloque in lector:
+        if valores_horas is None:
+            variables = [col for col in bloque.columns if col not in data.COLUMNAS_FECHA]
+            variables.sort(key=lambda col: codigos.index(col) if col in codigos else len(codigos))
+            fechas_horas = np.lib.format.open_memmap(os.path.join(carpeta, 'fechas.tmp.npy'), 'w+',
+                                                     'int64', (horas,))
+            valores_horas = np.lib.format.open_memmap(os.path.join(carpeta, 'valores.tmp.npy'), 'w+',
+                                                      'float64', (len(variables), horas))
+            fechas_dias = np.lib.format.open_memmap(os.path.join(carpeta, 'dias.tmp.npy'), 'w+',
+                                                    'int64', (dias,))
+            resumen = np.lib.format.open_memmap(os.path.join(carpeta, 'diario.tmp.npy'), 'w+', 'float64',
+                                                (4, dias, len(variables)))
+
+        fechas = data.construir_fechas(bloque).to_numpy(dtype='datetime64[ns]')
+        valores = bloque[variables].to_numpy(dtype='float64')
+        if len(fechas) and ((ultima is not None and fechas[0] <= ultima) or (np.diff(fechas) <= 0).any()):
+            raise ValueError(f"Las horas de {ruta} no están ordenadas")
+        if fila + len(fechas) > horas:
+            raise ValueError(f"{ruta} tiene más horas de las que indica su encabezado")
+        ultima = fechas[-1] if len(fechas) else ultima
+
+        # Datos horarios
+        fechas_horas[fila:fila + len(fechas)] = fechas.view('int64')
+        valores_horas[:, fila:fila + len(fechas)] = valores.T
+        fila += len(fechas)
+
+        # Resumen diario; el primer día se combina con el pendiente si es el mismo
+        dias_bloque, estadisticos = _resumir_bloque(fechas, valores)
+        if pendiente is not None:
+            if dias_bloque[0] == pendiente[0]:
+                estadisticos[:, 0] = _combinar_dia(pendiente[1], estadisticos[:, 0])
+            else:
+                fechas_dias[dia], resumen[:, dia] = pendiente[0].astype('int64'), pendiente[1]
+                dia += 1
+        completos = len(dias_bloque) - 1
+        if dia + completos + 1 > dias:
+            raise ValueError(f"{ruta} tiene más días de los que indica su encabezado")
+        fechas_dias[dia:dia + completos] = dias_bloque[:completos].astype('int64')
+        resumen[:, dia:dia + completos] = estadisticos[:, :completos]
+        dia += completos
+        pendiente = (dias_bloque[-1], estadisticos[:, -1].copy())
+
+    if valores_horas is None:
+        raise ValueError(f"{ruta} no tiene datos")
+    fechas_dias[dia], resumen[:, dia] = pendiente[0].astype('int64'), pendiente[1]
+    dia += 1
+
+    # Los arreglos quedan con el tamaño exacto; los temporales se reemplazan al final
+    for arreglo in (fechas_horas, valores_horas, fechas_dias, resumen):
+        arreglo.flush()
+    del fechas_horas, valores_horas, fechas_dias, resumen
+    for nombre, filas, capacidad, eje in [('fechas', fila, horas, -1), ('valores', fila, horas, -1),
+                                          ('dias', dia, dias, -1), ('diario', dia, dias, 1)]:
+        _recortar(os.path.join(carpeta, f'{nombre}.tmp.npy'), os.path.join(carpeta, f'{nombre}.npy'),
+                  filas, capacidad, eje)
+
+    info = os.stat(ruta)
+    data.guardar_meta(carpeta, {
+        'version': data.VERSION_CACHE,
+        'origen': os.path.basename(ruta),
+        'tamano': info.st_size,
+        'mtime': info.st_mtime_ns,
+        'hash': data.hash_archivo(ruta),
+        'codigos': variables,
+        'columnas': [NOMBRES_HORARIOS.get(codigo, codigo) for codigo in variables],
+        'encabezado': encabezado,
+        'filas': fila,
+        'dias': dia,
+        'filas_bloque': filas_bloque,
+    })
+
+# Función para dejar un arreglo temporal con `filas` elementos en el eje
+# indicado. Si ya tiene ese tamaño solo se renombra; si no, se copia por
+# bloques a un arreglo nuevo para no cargarlo completo
+def _recortar(temporal, destino, filas, capacidad, eje=-1, bloque=FILAS_BLOQUE * 4):
+    if filas == capacidad:
+        os.replace(temporal, destino)
+        return
+    origen = np.load(temporal, mmap_mode='r')
+    forma = list(origen.shape)
+    forma[eje] = filas
+    nuevo = np.lib.format.open_memmap(destino + '.tmp', 'w+', origen.dtype, tuple(forma))
+    for i in range(0, filas, bloque):
+        seleccion = [slice(None)] * origen.ndim
+        seleccion[eje] = slice(i, min(i + bloque, filas))
+        nuevo[tuple(seleccion)] = origen[tuple(seleccion)]
+    nuevo.flush()
+    del nuevo, origen
+    os.replace(destino + '.tmp', destino)
+    os.remove(temporal)
+
+# Función para leer la caché horaria si sigue siendo válida para el archivo de origen
+def _leer_cache(ruta, carpeta):
+    ruta_meta = os.path.join(carpeta, 'meta.json')
+    if not os.path.exists(ruta_meta):
+        return None
+    with open(ruta_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != data.VERSION_CACHE or not data.origen_sin_cambios(ruta, meta, ruta_meta):
+        return None
+
+    # Datos horarios (variables x horas) mapeados en disco
+    fechas = np.load(os.path.join(carpeta, 'fechas.npy'), mmap_mode='r')
+    valores = np.load(os.path.join(carpeta, 'valores.npy'), mmap_mode='r')
+    horario = pd.DataFrame(valores.T, columns=meta['columnas'], copy=False)
+    horario.insert(0, 'Fecha del registro', pd.DatetimeIndex(fechas.view('datetime64[ns]')))
+    horario.attrs['encabezado'] = meta['encabezado']
+
+    # Resumen diario: columnas (variable, estadístico) indexadas por día
+    sumas, minimos, maximos, conteos = np.load(os.path.join(carpeta, 'diario.npy'), mmap_mode='r')
+    dias = pd.DatetimeIndex(np.load(os.path.join(carpeta, 'dias.npy')).astype('datetime64[D]')
+                            .astype('datetime64[ns]'), name='Fecha del registro')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        medias = np.where(conteos > 0, sumas / conteos, np.nan)
+    sumas = np.where(conteos > 0, sumas, np.nan)
+    partes = {'media': medias, 'minimo': minimos, 'maximo': maximos, 'suma': sumas, 'conteo': conteos}
+    columnas = pd.MultiIndex.from_tuples([(columna, estadistico) for columna in meta['columnas']
+                                          for estadistico in ESTADISTICOS], names=['variable', 'estadistico'])
+    resumen = pd.DataFrame(np.stack([partes[e] for e in ESTADISTICOS], axis=-1).reshape(len(dias), -1),
+                           index=dias, columns=columnas)
+    resumen.attrs['codigos'] = dict(zip(meta['columnas'], meta['codigos']))
+    resumen.attrs['encabezado'] = meta['encabezado']
+    return horario, resumen
+
+# Función para importar un archivo horario de POWER. La primera vez se lee
+# por bloques y se guardan en la caché los datos horarios y su resumen diario;
+# después ambos se mapean desde la caché. Devuelve (horario, resumen diario):
+# el horario con una fila por hora y el resumen con columnas
+# (variable, estadístico) para la media, el mínimo, el máximo, la suma y el
+# número de horas válidas de cada día
+@instrumentacion.cronometrar()
+def importar_horario(ruta, filas_bloque=FILAS_BLOQUE):
+    try:
+        carpeta = ruta_cache(ruta)
+        try:
+            cache = _leer_cache(ruta, carpeta)
+            if cache is not None:
+                return cache
+        except Exception as e:
+            print(f"Caché horaria inválida, se vuelve a leer el CSV: {e}")
+
+        _escribir_cache(ruta, carpeta, filas_bloque)
+        return _leer_cache(ruta, carpeta)
+    except Exception as e:
+        print(f"Error al importar datos horarios: {e}")
+        return None, None
+
+# Función para obtener, a partir del resumen diario, un DataFrame con una fila
+# por día. Con el encabezado de un archivo diario de POWER (data.leer_encabezado)
+# las sumas se pasan a sus unidades y las columnas toman los nombres del
+# producto diario; sin él, o si las unidades no son compatibles, las sumas
+# conservan las unidades horarias y se nombran con NOMBRES_SUMAS
+def diario(resumen, encabezado_diario=None, estadisticos=ESTADISTICO_DIARIO):
+    codigos = resumen.attrs.get('codigos', {})
+    unidades = {p['codigo']: p['unidad'] for p in resumen.attrs.get('encabezado', {}).get('parametros', [])}
+    unidades_diarias = {p['codigo']: p['unidad'] for p in (encabezado_diario or {}).get('parametros', [])}
+
+    datos_i = pd.DataFrame(index=resumen.index)
+    for columna in resumen.columns.get_level_values('variable').unique():
+        codigo = codigos.get(columna, columna)
+        estadistico = estadisticos.get(codigo, 'media')
+        if estadistico != 'suma':
+            datos_i[data.NOMBRES.get(codigo, columna)] = resumen[(columna, estadistico)]
+            continue
+        factor = factor_diario(unidades.get(codigo), unidades_diarias.get(codigo))
+        if factor is None:
+            datos_i[NOMBRES_SUMAS.get(codigo, f'{columna} (suma diaria)')] = resumen[(columna, 'suma')]
+        else:
+            datos_i[data.NOMBRES.get(codigo, columna)] = resumen[(columna, 'suma')] * factor
+    return datos_i.reset_index()
+
+# Función para obtener el ciclo diario promedio de cada variable (una fila por hora del día)
+def ciclo_diario(horario, columna_fecha='Fecha del registro'):
+    horas = horario[columna_fecha].dt.hour.rename('hora')
+    return horario.drop(columns=columna_fecha).groupby(horas.to_numpy()).mean().rename_axis('hora')
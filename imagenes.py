@@ -0,0 +1,83 @@
+import argparse
+import glob
+import os
+
+import data
+
+# Pillow es opcional: sin él las páginas muestran la imagen original
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Anchos, en píxeles, de las versiones reducidas que se guardan de cada imagen
+ANCHOS = (480, 960, 1440)
+
+# Calidad JPEG de las versiones reducidas
+CALIDAD = 82
+
+# Carpeta de las versiones reducidas, junto a la caché de los datos
+def _carpeta(directorio_cache=data.DIRECTORIO_CACHE):
+    return os.path.join(directorio_cache, 'imagenes')
+
+# Ruta de la versión de una imagen con el ancho indicado
+def _ruta_variante(ruta, ancho, directorio_cache=data.DIRECTORIO_CACHE):
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(_carpeta(directorio_cache), f'{nombre}_{ancho}.jpg')
+
+# Una versión sigue siendo válida si es más reciente que la imagen original
+def _vigente(ruta, variante):
+    return os.path.exists(variante) and os.stat(variante).st_mtime_ns >= os.stat(ruta).st_mtime_ns
+
+# Función para guardar las versiones reducidas de una imagen que falten o
+# estén desactualizadas. Los anchos mayores que el de la imagen no se generan.
+# Cada versión se escribe en un archivo temporal y se renombra, así que otros
+# procesos nunca leen una versión a medio escribir. Devuelve {ancho: ruta}
+def generar(ruta, anchos=ANCHOS, directorio_cache=data.DIRECTORIO_CACHE):
+    if Image is None:
+        raise ImportError('Se necesita Pillow para reducir las imágenes')
+    os.makedirs(_carpeta(directorio_cache), exist_ok=True)
+    variantes = {}
+    # Image.open solo lee el encabezado; los píxeles se cargan si falta alguna versión
+    with Image.open(ruta) as imagen:
+        pixeles = None
+        for ancho in sorted(anchos):
+            if ancho >= imagen.width:
+                continue
+            variante = _ruta_variante(ruta, ancho, directorio_cache)
+            if not _vigente(ruta, variante):
+                if pixeles is None:
+                    pixeles = imagen.convert('RGB')
+                alto = round(imagen.height * ancho / imagen.width)
+                temporal = f'{variante}.{os.getpid()}.tmp'
+                pixeles.resize((ancho, alto), Image.LANCZOS).save(temporal, 'JPEG', quality=CALIDAD,
+                                                                  optimize=True, progressive=True)
+                os.replace(temporal, variante)
+            variantes[ancho] = variante
+    return variantes
+
+# Función para obtener la ruta de la versión más pequeña que cubre el ancho
+# pedido. Si todavía no existe se genera en ese momento; si no se puede
+# generar se devuelve la imagen original
+def variante(ruta, ancho, directorio_cache=data.DIRECTORIO_CACHE):
+    candidatos = [a for a in ANCHOS if a >= ancho] or [max(ANCHOS)]
+    ruta_variante = _ruta_variante(ruta, candidatos[0], directorio_cache)
+    try:
+        if _vigente(ruta, ruta_variante):
+            return ruta_variante
+        return generar(ruta, directorio_cache=directorio_cache).get(candidatos[0], ruta)
+    except Exception as e:
+        print(f"No se pudo reducir la imagen {ruta}: {e}")
+        return ruta
+
+# Uso, por ejemplo al construir el contenedor para que el primer usuario no
+# espere la reducción:
+#   python imagenes.py --directorio .
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera las versiones reducidas de las imágenes de la página')
+    parser.add_argument('--directorio', default='.', help='directorio con las imágenes JPEG')
+    argumentos = parser.parse_args()
+
+    for ruta in sorted(glob.glob(os.path.join(argumentos.directorio, '*.jpg'))):
+        for ancho, ruta_variante in generar(ruta).items():
+            print(f"{ruta_variante} ({ancho} px, {os.path.getsize(ruta_variante) / 1024:.0f} KB)")
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Estrategias de imputación disponibles
+ESTRATEGIAS = ['semanal', 'climatologia', 'interpolacion']
+
+# Días entre la época (jueves 1970-01-01) y el primer lunes (1970-01-05);
+# las semanas de pandas ('W' = 'W-SUN') empiezan en lunes
+DESFASE_LUNES = 4
+
+# Función para obtener el código de semana (lunes a domingo) de cada fecha
+def codigos_semana(fechas):
+    dias = np.asarray(fechas, dtype='datetime64[D]').astype('int64')
+    return (dias - DESFASE_LUNES) // 7
+
+# Función para obtener el día del año (0-365) de cada fecha
+def codigos_dia_anio(fechas):
+    return pd.DatetimeIndex(fechas).dayofyear.to_numpy() - 1
+
+# Función para calcular el promedio de cada grupo en todas las columnas a la vez.
+# Devuelve una matriz (grupos x columnas) con NaN donde el grupo no tiene datos
+def promedios_por_grupo(valores, codigos):
+    codigos = np.asarray(codigos, dtype='int64')
+    codigos = codigos - codigos.min()
+    n_grupos = int(codigos.max()) + 1
+    n_columnas = valores.shape[1]
+
+    # Un único bincount sobre el código combinado (grupo, columna)
+    validos = ~np.isnan(valores)
+    combinado = (codigos[:, None] * n_columnas + np.arange(n_columnas)).ravel()
+    sumas = np.bincount(combinado, weights=np.where(validos, valores, 0.0).ravel(),
+                        minlength=n_grupos * n_columnas)
+    conteos = np.bincount(combinado, weights=validos.ravel(), minlength=n_grupos * n_columnas)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedios = sumas / conteos
+    return promedios.reshape(n_grupos, n_columnas), codigos
+
+# Función para rellenar los faltantes con el promedio del grupo correspondiente
+def _rellenar_por_grupo(valores, codigos):
+    promedios, codigos = promedios_por_grupo(valores, codigos)
+    return np.where(np.isnan(valores), promedios[codigos], valores)
+
+# Función para interpolar linealmente en el tiempo cada columna
+def _interpolar(valores, fechas):
+    x = np.asarray(fechas, dtype='datetime64[ns]').astype('int64').astype('float64')
+    resultado = valores.copy()
+    for j in range(valores.shape[1]):
+        faltantes = np.isnan(valores[:, j])
+        if faltantes.any() and not faltantes.all():
+            resultado[faltantes, j] = np.interp(x[faltantes], x[~faltantes], valores[~faltantes, j])
+    return resultado
+
+# Función para imputar los valores faltantes de un DataFrame de POWER.
+# Devuelve el DataFrame imputado y una matriz booleana (filas x variables)
+# que indica qué celdas fueron imputadas
+def imputar(datos_i, estrategia='semanal', columna_fecha='Fecha del registro'):
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia de imputación desconocida: {estrategia}")
+
+    variables = [col for col in datos_i.columns if col != columna_fecha]
+    fechas = datos_i[columna_fecha].to_numpy()
+    valores = datos_i[variables].to_numpy(dtype='float64', copy=True)
+
+    if len(valores) == 0:
+        return datos_i.copy(), np.zeros(valores.shape, dtype=bool)
+
+    faltantes = np.isnan(valores)
+
+    if estrategia == 'semanal':
+        imputados = _rellenar_por_grupo(valores, codigos_semana(fechas))
+    elif estrategia == 'climatologia':
+        imputados = _rellenar_por_grupo(valores, codigos_dia_anio(fechas))
+    else:
+        imputados = _interpolar(valores, fechas)
+
+    resultado = pd.DataFrame(imputados, columns=variables, index=datos_i.index)
+    resultado.insert(0, columna_fecha, datos_i[columna_fecha])
+    resultado.attrs = dict(datos_i.attrs)
+
+    # Solo se marcan como imputadas las celdas que realmente recibieron un valor
+    banderas = faltantes & ~np.isnan(imputados)
+    return resultado, banderas
@@ -0,0 +1,91 @@
+import argparse
+import threading
+
+import climatologia
+import correlacion
+import cubo
+import data
+import imputacion
+
+# Filas finales que se copian para poder quitar su aporte de la climatología y
+# de los co-momentos si se vuelven a imputar al anexar días nuevos. Los
+# arreglos de la caché se actualizan en el mismo archivo, así que los datos
+# anteriores ya no se pueden leer de ahí
+FILAS_RESPALDO = 64
+
+# Agregados de una estación que dependen de sus datos diarios: cubo mensual y
+# anual, climatología y co-momentos. Cuando la caché recibe días nuevos solo
+# se recalcula la parte que cambió
+class Agregados:
+
+    def __init__(self, datos, estacion=None, columna_fecha='Fecha del registro'):
+        self.estacion = estacion
+        self.columna_fecha = columna_fecha
+        self._bloqueo = threading.Lock()
+        self._construir(datos)
+
+    # Función para construir todos los agregados desde cero
+    def _construir(self, datos):
+        self.cubo_mensual = cubo.construir_cubo(datos, self.estacion, self.columna_fecha)
+        self.cubo_anual = cubo.anual(self.cubo_mensual)
+        self.climatologia = climatologia.construir(datos, columna_fecha=self.columna_fecha)
+        self.comomentos = correlacion.construir(datos, self.columna_fecha)
+        self._guardar_respaldo(datos)
+
+    # Función para copiar las últimas filas y recordar la versión de los datos
+    def _guardar_respaldo(self, datos):
+        self.filas = len(datos)
+        self._respaldo = datos.iloc[-FILAS_RESPALDO:].copy()
+
+    # Función para sincronizar los agregados con una versión más reciente de
+    # los datos. Si la caché indica desde qué fila cambiaron y esas filas están
+    # en el respaldo, solo se actualiza esa parte; si no, se reconstruye todo
+    def actualizar(self, datos):
+        with self._bloqueo:
+            inicio = data.primera_fila_modificada(datos, self.filas)
+            if inicio == self.filas == len(datos):
+                return self
+            if inicio is None or inicio < self.filas - len(self._respaldo):
+                self._construir(datos)
+                return self
+
+            anteriores = self._respaldo.iloc[len(self._respaldo) - (self.filas - inicio):]
+            nuevas = datos.iloc[inicio:]
+
+            # Se quita el aporte de las filas anteriores y se suma el de las nuevas
+            variables = self.climatologia.variables
+            self.climatologia.retirar(anteriores[self.columna_fecha], anteriores[variables].to_numpy())
+            self.climatologia.actualizar(nuevas[self.columna_fecha], nuevas[variables].to_numpy())
+
+            variables = self.comomentos.variables
+            self.comomentos.retirar(anteriores[variables].to_numpy())
+            self.comomentos.actualizar(nuevas[variables].to_numpy())
+
+            # En el cubo solo se recalculan los meses desde la primera fila que cambió
+            self.cubo_mensual = cubo.actualizar_cubo(self.cubo_mensual, datos, self.estacion, inicio,
+                                                     self.columna_fecha)
+            self.cubo_anual = cubo.anual(self.cubo_mensual)
+            self._guardar_respaldo(datos)
+        return self
+
+# Uso desde la línea de comandos:
+#   python ingesta.py POWER_Point_Daily_..._LST.csv exportacion_nueva.csv
+# anexa a la caché del primer archivo los días nuevos del segundo
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Anexar días nuevos de POWER a la caché de una estación')
+    parser.add_argument('archivo', help='archivo de POWER de la estación')
+    parser.add_argument('nuevos', nargs='+', help='exportaciones de POWER con los días nuevos')
+    parser.add_argument('--estrategia', default='semanal', choices=imputacion.ESTRATEGIAS)
+    argumentos = parser.parse_args()
+
+    for ruta_nueva in argumentos.nuevos:
+        anteriores = data.importar_datos(argumentos.archivo, estrategia=argumentos.estrategia)
+        filas = len(anteriores) if anteriores is not None else 0
+        datos, inicio = data.anexar_datos(argumentos.archivo, ruta_nueva, argumentos.estrategia)
+        if datos is None:
+            continue
+        if inicio is None:
+            print(f"{ruta_nueva}: sin días nuevos")
+        else:
+            print(f"{ruta_nueva}: {len(datos) - filas} días nuevos, "
+                  f"reimputado desde la fila {inicio}, hasta {datos['Fecha del registro'].iloc[-1]:%d/%m/%Y}")
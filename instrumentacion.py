@@ -0,0 +1,192 @@
+import contextvars
+import cProfile
+import functools
+import importlib
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Registro activo de la ejecución actual. Cada sesión de Streamlit ejecuta la
+# página en su propio hilo, así que cada una ve solo su registro; si no hay un
+# registro activo las mediciones no hacen nada
+_registro = contextvars.ContextVar('registro', default=None)
+
+# Registro de las mediciones de una ejecución de la página
+class Registro:
+
+    def __init__(self):
+        self.inicio = time.time()
+        self.mediciones = []
+        self._profundidad = 0
+        self.perfil = None
+
+    # Función para guardar una medición
+    def agregar(self, nombre, inicio, duracion, profundidad, etiquetas):
+        self.mediciones.append({
+            'nombre': nombre,
+            'inicio': inicio,
+            'duracion_ms': duracion * 1000,
+            'profundidad': profundidad,
+            **etiquetas,
+        })
+
+    # Resumen por nombre: número de llamadas y tiempo total, promedio y máximo
+    def resumen(self):
+        filas = {}
+        for medicion in self.mediciones:
+            fila = filas.setdefault(medicion['nombre'], {'nombre': medicion['nombre'], 'llamadas': 0,
+                                                          'total_ms': 0.0, 'maximo_ms': 0.0})
+            fila['llamadas'] += 1
+            fila['total_ms'] += medicion['duracion_ms']
+            fila['maximo_ms'] = max(fila['maximo_ms'], medicion['duracion_ms'])
+        for fila in filas.values():
+            fila['promedio_ms'] = fila['total_ms'] / fila['llamadas']
+        return sorted(filas.values(), key=lambda fila: -fila['total_ms'])
+
+    # Tiempo transcurrido desde que empezó el registro, en milisegundos
+    def duracion_ms(self):
+        return (time.time() - self.inicio) * 1000
+
+    # Mediciones en formato JSON lines, una por línea
+    def exportar_jsonl(self):
+        return ''.join(json.dumps(medicion, ensure_ascii=False, default=str) + '\n'
+                       for medicion in self.mediciones)
+
+    # Función para añadir las mediciones al final de un archivo JSON lines
+    def guardar(self, ruta):
+        with open(ruta, 'a', encoding='utf-8') as f:
+            f.write(self.exportar_jsonl())
+
+    # Texto con las funciones de mayor tiempo acumulado del perfil de cProfile
+    def informe_perfil(self, lineas=25):
+        if self.perfil is None:
+            return ''
+        salida = io.StringIO()
+        pstats.Stats(self.perfil, stream=salida).sort_stats('cumulative').print_stats(lineas)
+        return salida.getvalue()
+
+# Función para activar un registro en la ejecución actual. Con perfilar=True
+# también se captura un perfil de cProfile hasta que se llame a terminar()
+def iniciar(perfilar=False):
+    registro = Registro()
+    if perfilar:
+        registro.perfil = cProfile.Profile()
+        registro.perfil.enable()
+    _registro.set(registro)
+    return registro
+
+# Función para desactivar el registro de la ejecución actual
+def terminar():
+    registro = _registro.get()
+    if registro is not None and registro.perfil is not None:
+        registro.perfil.disable()
+    _registro.set(None)
+    return registro
+
+# Registro activo o None
+def activo():
+    return _registro.get()
+
+# Medición de un bloque de código con `with medir('nombre'):`
+@contextmanager
+def medir(nombre, **etiquetas):
+    registro = _registro.get()
+    if registro is None:
+        yield
+        return
+
+    profundidad = registro._profundidad
+    registro._profundidad += 1
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        registro._profundidad = profundidad
+        registro.agregar(nombre, time.time() - duracion, duracion, profundidad, etiquetas)
+
+# Decorador para medir cada llamada a una función
+def cronometrar(nombre=None):
+    def decorador(funcion):
+        etiqueta = nombre or f'{funcion.__module__}.{funcion.__qualname__}'
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if _registro.get() is None:
+                return funcion(*args, **kwargs)
+            with medir(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+# Medición que empieza y termina en puntos distintos del código, para bloques
+# que no se pueden envolver con `with` (por ejemplo, las ramas del menú)
+def empezar(nombre, **etiquetas):
+    if _registro.get() is None:
+        return None
+    medicion = medir(nombre, **etiquetas)
+    medicion.__enter__()
+    return medicion
+
+# Función para terminar una medición iniciada con empezar()
+def detener(medicion):
+    if medicion is not None:
+        medicion.__exit__(None, None, None)
+
+# Momento en que empezó el proceso. En Linux se toma de /proc, que incluye el
+# arranque del intérprete y del servidor; si no está disponible, el momento en
+# que se importó este módulo
+def _inicio_proceso():
+    try:
+        return os.stat(f'/proc/{os.getpid()}').st_ctime
+    except OSError:
+        return time.time()
+
+INICIO_PROCESO = _inicio_proceso()
+
+# Tiempo de la primera importación de cada módulo cargado con importar(), en
+# milisegundos, y el informe de arranque. Son del proceso, no de una ejecución
+_importaciones = {}
+_arranque = None
+_bloqueo_arranque = threading.Lock()
+
+# Función para importar un módulo cuando se necesita. La primera importación
+# en el proceso se mide y se guarda; las siguientes solo devuelven el módulo
+def importar(nombre):
+    if nombre in sys.modules:
+        return importlib.import_module(nombre)
+    inicio = time.perf_counter()
+    with medir(f'importar {nombre}'):
+        modulo = importlib.import_module(nombre)
+    _importaciones.setdefault(nombre, (time.perf_counter() - inicio) * 1000)
+    return modulo
+
+# Tiempos de las importaciones hechas con importar(), en milisegundos
+def importaciones():
+    return dict(_importaciones)
+
+# Función para registrar la primera página que muestra el proceso: el tiempo
+# desde que empezó el proceso hasta ese momento y las importaciones hechas
+# hasta entonces. Devuelve el informe solo la primera vez; después, None
+def primera_pagina(pagina, **etiquetas):
+    global _arranque
+    with _bloqueo_arranque:
+        if _arranque is not None:
+            return None
+        _arranque = {
+            'pagina': pagina,
+            'pid': os.getpid(),
+            'hasta_primera_pagina_ms': (time.time() - INICIO_PROCESO) * 1000,
+            'importaciones_ms': importaciones(),
+            **etiquetas,
+        }
+        return _arranque
+
+# Informe de arranque del proceso, o None si todavía no se mostró ninguna página
+def arranque():
+    return _arranque
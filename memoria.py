@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+
+# Memoria de resultados con un número máximo de entradas. Cuando se supera se
+# descarta la entrada usada hace más tiempo. La comparten los hilos de las
+# sesiones de Streamlit, así que los accesos se hacen con un bloqueo; el
+# cálculo se hace fuera del bloqueo para no detener a las demás sesiones
+class Memoria:
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._valores = OrderedDict()
+        self._bloqueo = threading.Lock()
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __contains__(self, clave):
+        return clave in self._valores
+
+    # Función para obtener el resultado de una clave; `calcular` solo se llama
+    # si no está guardado. Con clave None se calcula sin guardar
+    def obtener(self, clave, calcular):
+        if clave is None:
+            return calcular()
+        with self._bloqueo:
+            if clave in self._valores:
+                self._valores.move_to_end(clave)
+                return self._valores[clave]
+
+        valor = calcular()
+        with self._bloqueo:
+            self._valores[clave] = valor
+            self._valores.move_to_end(clave)
+            while len(self._valores) > self.maximo:
+                self._valores.popitem(last=False)
+        return valor
+
+    # Función para vaciar la memoria
+    def limpiar(self):
+        with self._bloqueo:
+            self._valores.clear()
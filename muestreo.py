@@ -0,0 +1,82 @@
+import numpy as np
+
+# Puntos que se dibujan por cada píxel de ancho del gráfico
+PUNTOS_POR_PIXEL = 2
+
+# Función para calcular cuántos puntos enviar al navegador según el ancho del gráfico
+def presupuesto_puntos(ancho_px=1000, puntos_por_pixel=PUNTOS_POR_PIXEL):
+    return max(int(ancho_px * puntos_por_pixel), 3)
+
+# Largest-Triangle-Three-Buckets: conserva la forma visual de la serie eligiendo
+# en cada cubeta el punto que forma el triángulo de mayor área con el punto
+# elegido antes y con el promedio de la cubeta siguiente. Devuelve los índices elegidos
+def lttb(x, y, puntos):
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # El primer y el último punto siempre se conservan; el resto se reparte en cubetas
+    limites = np.linspace(1, n - 1, puntos - 1).astype('int64')
+    elegidos = np.empty(puntos, dtype='int64')
+    elegidos[0] = 0
+    elegidos[-1] = n - 1
+
+    # Promedios de todas las cubetas calculados de una vez
+    sumas_x = np.add.reduceat(x[1:n - 1], limites[:-1] - 1)
+    sumas_y = np.add.reduceat(y[1:n - 1], limites[:-1] - 1)
+    tamanos = np.diff(limites)
+    promedios_x = np.append(sumas_x / tamanos, x[-1])
+    promedios_y = np.append(sumas_y / tamanos, y[-1])
+
+    a = 0
+    for k in range(puntos - 2):
+        inicio, fin = limites[k], limites[k + 1]
+        cx, cy = promedios_x[k + 1], promedios_y[k + 1]
+        areas = np.abs((x[a] - cx) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (cy - y[a]))
+        a = inicio + int(np.argmax(areas))
+        elegidos[k + 1] = a
+
+    return elegidos
+
+# Mínimo y máximo por cubeta: conserva los extremos de cada intervalo. Devuelve
+# los índices elegidos en orden
+def min_max(y, puntos):
+    n = len(y)
+    if puntos >= n or puntos < 2:
+        return np.arange(n)
+
+    # Se rellena la serie hasta un múltiplo del tamaño de cubeta para operar con una matriz
+    cubetas = puntos // 2
+    tamano = -(-n // cubetas)
+    relleno = np.full(cubetas * tamano, np.nan)
+    relleno[:n] = np.asarray(y, dtype='float64')
+    matriz = relleno.reshape(cubetas, tamano)
+
+    minimos = np.argmin(np.where(np.isnan(matriz), np.inf, matriz), axis=1)
+    maximos = np.argmax(np.where(np.isnan(matriz), -np.inf, matriz), axis=1)
+    desplazamiento = np.arange(cubetas) * tamano
+    elegidos = np.concatenate((desplazamiento + minimos, desplazamiento + maximos))
+    return np.unique(elegidos[elegidos < n])
+
+# Función para reducir un DataFrame antes de graficarlo. Si el rango ya tiene
+# menos puntos que el presupuesto se devuelve completo, con toda su resolución
+def reducir(datos, columna_x, columna_y, puntos, metodo='lttb'):
+    validos = datos[datos[columna_y].notna()]
+    if len(validos) <= puntos:
+        return validos
+
+    x = validos[columna_x].to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype('int64')
+    y = validos[columna_y].to_numpy(dtype='float64')
+
+    if metodo == 'lttb':
+        elegidos = lttb(x, y, puntos)
+    elif metodo == 'min_max':
+        elegidos = min_max(y, puntos)
+    else:
+        raise ValueError(f"Método de reducción desconocido: {metodo}")
+    return validos.iloc[elegidos]
@@ -0,0 +1,13 @@
+# Páginas de la aplicación. Cada módulo tiene una función mostrar(seleccion)
+# y solo se importa la primera vez que se abre su página, junto con las
+# librerías que necesita (plotly.express, scipy.stats, ...)
+
+# Opciones del menú: nombre de la página, módulo e ícono
+PAGINAS = {
+    'Inicio': ('inicio', 'brightness-alt-high'),
+    'Tendencias climáticas': ('tendencias_climaticas', 'thermometer-sun'),
+    'Comparación de rangos temporales': ('comparacion_rangos', 'calendar-range'),
+    'Anomalías climáticas': ('anomalias_climaticas', 'tropical-storm'),
+    'Gráficos': ('graficos', 'graph-up'),
+    'Preguntas de investigación': ('preguntas', 'stars'),
+}
@@ -0,0 +1,39 @@
+import plotly.express as px
+import streamlit as st
+
+import analisis
+from paginas.comun import mostrar_figura, variables_clima
+
+# Página de detección de anomalías de una variable con el método elegido
+def mostrar(seleccion):
+    datos = seleccion.datos
+    st.header('Identificación de anomalías climáticas ')
+    anomalia = variables_clima()
+
+    if anomalia != None:
+        columna = analisis.VARIABLES.get(anomalia)
+        metodo = st.selectbox('Seleccione el método de detección:', list(analisis.METODOS_ANOMALIA))
+        st.subheader(f"Análisis de anomalías en {columna}")
+
+        # La máscara de anomalías se calcula para todas las variables a la vez y se memoriza
+        # por estación y versión de los datos; cambiar de variable o de método es una consulta
+        datos_filtrados, datos_anomalías = analisis.anomalias_variable(
+            datos, columna, analisis.METODOS_ANOMALIA[metodo], clave=seleccion.version())
+
+        # Mostrar advertencia si no se detectan anomalías
+        if datos_anomalías.empty:
+            st.warning('No se detectaron anomalías en los datos seleccionados.')
+        else:
+            # Mostrar las anomalías detectadas
+            st.markdown('<div style="text-align: center;">Anomalías detectadas</div>', unsafe_allow_html=True)
+            st.dataframe(datos_anomalías[['Fecha del registro', columna]].reset_index(drop=True), use_container_width=True)
+
+            # Gráfico de dispersión con anomalías resaltadas
+            def construir():
+                fig = px.scatter(datos_anomalías, x="Fecha del registro", y=columna, title=f'Anomalías de {columna}',
+                                color_discrete_sequence=['red'])
+                fig.add_scatter(x=datos_filtrados["Fecha del registro"], y=datos_filtrados[columna],
+                                mode='markers', marker=dict(color='blue', size=3), name='Datos normales')
+                return fig
+
+            mostrar_figura(seleccion, ('anomalias', columna, analisis.METODOS_ANOMALIA[metodo]), construir)
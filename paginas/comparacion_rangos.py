@@ -0,0 +1,152 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import analisis
+import cubo
+from paginas.comun import mostrar_figura, variables_clima
+
+# Función para mostrar las pruebas por remuestreo (permutación y bootstrap) de
+# varios grupos. El resultado se memoriza por estación, versión de los datos,
+# variable y grupos, así que no se repite en cada interacción con la página
+def pruebas_remuestreo(valores, nombres, clave, clave_resultado):
+    booleano = st.toggle('Pruebas por remuestreo', key=clave)
+
+    if booleano and len(valores) > 1:
+        resultado = analisis.comparacion_remuestreo(valores, nombres, clave=clave_resultado)
+        for estadistico, texto in [('media', 'medias'), ('mediana', 'medianas')]:
+            permutacion = resultado['permutacion'][estadistico]
+            st.write(f"Prueba de permutación para diferencias de {texto}, p: {permutacion['p']:.4f} "
+                     f"({permutacion['remuestreos']} permutaciones)")
+        st.write('Intervalos de confianza bootstrap (95 %) de la media:')
+        st.dataframe(resultado['bootstrap'], use_container_width=True)
+
+# Función para mostrar el resultado de una comparación de promedios mensuales o anuales
+def mostrar_comparacion(resultado, escala):
+    if resultado['normal']:
+        st.write('Los datos siguen una distribución normal.')
+    else:
+        st.write('Los datos no siguen una distribución normal.')
+    st.write(f"Resultados de la {resultado['nombre']}:")
+    st.write(f"Estadístico {resultado['simbolo']}: {resultado['estadistico']:.4f}, p: {resultado['p']:.4f}")
+    if resultado['significativo']:
+        st.write(f"Hay diferencias significativas entre los promedios {escala}.")
+    else:
+        st.write(f"No hay diferencias significativas entre los promedios {escala}.")
+
+# Página de comparación de promedios mensuales o anuales
+def mostrar(seleccion):
+    estacion, consulta = seleccion.estacion, seleccion.consulta
+    st.header('Comparación de promedios mensuales o anuales entre diferentes rangos temporales.')
+
+    # Menú para seleccionar el rango de tiempo
+    rangos = st.pills('Seleccione el rango de tiempo para comparar promedios:', ['Mensual', 'Anual'])
+
+    # Selección de la variable climática
+    opcion = variables_clima()
+
+    # Validación de la selección de la variable
+    if rangos == 'Mensual':
+
+        # Selección del año y meses
+        Año = st.segmented_control('Seleccione el año:', consulta.anios().tolist(), key='año')
+        # Solo se muestran los meses con datos en el año seleccionado
+        arr_m = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+        if Año != None:
+            ultimo_mes = consulta.meses(Año).max()
+            arr_m = arr_m[:ultimo_mes]
+        meses = st.segmented_control('Seleccione el/los mes/es:', arr_m, selection_mode='multi', key='meses')
+
+        # Validación de la selección del año, meses y variable
+        if Año != None and meses != [] and opcion != None:
+            meses_seleccionados = [arr_m.index(mes) + 1 for mes in meses]
+            columna = analisis.VARIABLES.get(opcion)
+
+            # Los promedios mensuales se leen del cubo precalculado
+            celdas = cubo.celdas_mensuales(seleccion.agregados().cubo_mensual, estacion, columna, Año,
+                                           meses_seleccionados)
+            promedios = celdas['promedio'].tolist()
+
+            # Crear un gráfico de barras con los promedios mensuales
+            def construir():
+                fig = px.bar(
+                    x=meses,
+                    y=promedios,
+                    title=f'Promedio Mensual de {opcion} en {Año}',
+                    labels={'x': 'Mes', 'y': f'Promedio de {opcion}'},
+                    color=meses
+                )
+                fig.update_traces(showlegend=False)
+                return fig
+
+            mostrar_figura(seleccion, ('mensual', columna, Año, tuple(meses)), construir)
+
+            # Mostrar la prueba de normalidad. La prueba de normalidad de cada mes
+            # y la prueba de comparación se consultan en la tabla del motor de
+            # pruebas, que solo se crea cuando se piden las pruebas
+            mostrar = st.toggle('Pruebas estadísticas', key='pruebas_estadisticas')
+            if mostrar and len(meses_seleccionados) > 1:
+                resultado = analisis.comparacion(seleccion.motor(), estacion, columna, 'mensual',
+                                                 meses_seleccionados, Año)
+                mostrar_comparacion(resultado, 'mensuales')
+
+            # Pruebas por remuestreo, útiles con datos de colas pesadas como la precipitación
+            pruebas_remuestreo([consulta.mes(Año, mes, columna)[columna] for mes in meses_seleccionados],
+                               meses, 'remuestreo_mensual',
+                               seleccion.version() + (columna, 'mensual', Año, tuple(meses_seleccionados)))
+
+        else:
+            st.warning('Por favor, seleccione todos los campos necesarios para generar el gráfico.')
+
+    elif rangos == 'Anual':
+
+        # Selección de los años
+        arr_a = [str(año) for año in consulta.anios()]
+        Años = st.segmented_control('Seleccione los años:', arr_a,
+                                    selection_mode='multi', key='años')
+
+        # Validación de la selección de los años y variable
+        if Años != [] and opcion != None:
+            años_seleccionados = [int(año) for año in Años]
+            grupos = años_seleccionados
+            columna = analisis.VARIABLES.get(opcion)
+
+            # Los promedios anuales se obtienen del cubo, combinando las celdas mensuales
+            celdas = cubo.celdas_anuales(seleccion.agregados().cubo_anual, estacion, columna, años_seleccionados)
+            promedios_anuales = celdas['promedio'].tolist()
+
+            # Crear un gráfico de barras con los promedios anuales
+            def construir():
+                df_promedios = pd.DataFrame({
+                    'Año': [str(año) for año in años_seleccionados],
+                    'Promedio': promedios_anuales
+                })
+
+                fig = px.bar(
+                    df_promedios,
+                    x='Año',
+                    y='Promedio',
+                    title=f'Promedio Anual de {opcion}',
+                    labels={'Año': 'Año', 'Promedio': 'Promedio anual'},
+                    color='Año'
+                )
+                fig.update_layout(xaxis_type='category')
+                fig.update_traces(showlegend=False)
+                return fig
+
+            mostrar_figura(seleccion, ('anual', columna, tuple(Años)), construir)
+
+            # Pruebas estadísticas: normalidad de cada año y prueba de comparación
+            # desde el motor de pruebas
+            mostrar = st.toggle('Pruebas estadísticas', key='pruebas_estadisticas_anual')
+            if mostrar and len(grupos) > 1:
+                resultado = analisis.comparacion(seleccion.motor(), estacion, columna, 'anual', años_seleccionados)
+                mostrar_comparacion(resultado, 'anuales')
+
+            # Pruebas por remuestreo, útiles con datos de colas pesadas como la precipitación
+            pruebas_remuestreo([consulta.anio(año, columna)[columna] for año in años_seleccionados],
+                               Años, 'remuestreo_anual',
+                               seleccion.version() + (columna, 'anual', tuple(años_seleccionados)))
+
+        else:
+            st.warning('Por favor, seleccione todos los campos necesarios para generar el gráfico.')
@@ -0,0 +1,116 @@
+import pandas as pd
+import streamlit as st
+
+import correlacion
+import figuras
+import instrumentacion
+import muestreo
+
+# Número máximo de puntos que se envían al navegador en los gráficos de líneas.
+# Si el rango seleccionado tiene menos puntos se muestran todos
+PUNTOS_GRAFICO = muestreo.presupuesto_puntos(ancho_px=1000)
+
+# Estación elegida en la barra lateral y datos que comparten las páginas. Los
+# agregados y el motor de pruebas se construyen solo cuando una página los pide
+class Seleccion:
+
+    def __init__(self, catalogo, estaciones, consultas_fechas, estacion):
+        self.catalogo = catalogo
+        self.estaciones = estaciones
+        self.estacion = estacion
+        self.consulta = consultas_fechas[estacion]
+        self.datos = self.consulta.datos
+        self._agregados = None
+
+    # Versión de los datos de la estación; cambia cuando se anexan días
+    def version(self):
+        return (self.estacion, len(self.datos), self.datos['Fecha del registro'].iloc[-1])
+
+    # Versión de los datos de todas las estaciones
+    def version_estaciones(self):
+        return tuple((e, len(d), d['Fecha del registro'].iloc[-1]) for e, d in self.estaciones.items())
+
+    # Agregados de la estación: cubo año x mes x variable, normales
+    # climatológicas diarias y co-momentos para la matriz de correlación
+    def agregados(self):
+        if self._agregados is None:
+            with instrumentacion.medir('agregados de la estación'):
+                self._agregados = _agregados_estacion(self.estacion, self.datos).actualizar(self.datos)
+        return self._agregados
+
+    # Motor de pruebas estadísticas de todas las estaciones
+    def motor(self):
+        with instrumentacion.medir('motor de pruebas'):
+            return _motor_pruebas(self.version_estaciones(), self.estaciones)
+
+    # Co-momentos combinados de todas las estaciones
+    def comomentos_estaciones(self):
+        return _comomentos_estaciones(self.version_estaciones(), self.estaciones)
+
+# Agregados de una estación. Se construyen una sola vez por estación; si la
+# caché recibió días nuevos solo se actualiza la parte que cambió. ingesta
+# importa scipy, así que se carga aquí y no al iniciar la página
+@st.cache_resource(max_entries=64)
+def _agregados_estacion(estacion, _datos):
+    ingesta = instrumentacion.importar('ingesta')
+    return ingesta.Agregados(_datos, estacion)
+
+# Motor de pruebas estadísticas: precalcula en segundo plano las pruebas de
+# normalidad y de comparación de todas las estaciones; la página solo consulta
+# su tabla. Cuando cambia la versión de los datos el motor anterior sale de la
+# caché y se detienen sus procesos
+@st.cache_resource(max_entries=1, on_release=lambda motor: motor.cerrar())
+def _motor_pruebas(version, _estaciones):
+    pruebas = instrumentacion.importar('pruebas')
+    return pruebas.MotorPruebas(_estaciones)
+
+# Co-momentos combinados de todas las estaciones
+@st.cache_resource(max_entries=1)
+def _comomentos_estaciones(version, _estaciones):
+    return correlacion.combinar(correlacion.construir(d) for d in _estaciones.values())
+
+# Caché de figuras compartida por todas las sesiones, con un presupuesto de memoria
+@st.cache_resource
+def cache_figuras():
+    return figuras.CacheFiguras(figuras.PRESUPUESTO_BYTES)
+
+# Función para mostrar una figura desde la caché. La clave se completa con la
+# estación y la versión de sus datos; `construir` solo se llama si la figura
+# no está guardada, así que tampoco se repite el trabajo con los datos
+def mostrar_figura(seleccion, clave, construir):
+    st.plotly_chart(cache_figuras().obtener(seleccion.version() + tuple(clave), construir))
+
+# Función para seleccionar las fechas límite de los gráficos
+def fechas(seleccion, etiqueta=""):
+    datos = seleccion.datos
+    fecha_min = st.date_input(
+        'Seleccione una fecha de inicio',
+        value=datos['Fecha del registro'].min(),
+        min_value=datos['Fecha del registro'].min(),
+        max_value=datos['Fecha del registro'].max(),
+        key=f"{etiqueta}_fecha_inicio")
+
+    fecha_max = st.date_input(
+        'Seleccione una fecha de fin',
+        value=datos['Fecha del registro'].max(),
+        min_value=fecha_min,
+        max_value=datos['Fecha del registro'].max(),
+        key=f"{etiqueta}_fecha_fin")
+
+    if fecha_min > fecha_max:
+        return [pd.to_datetime(fecha_max), pd.to_datetime(fecha_min)]
+
+    return [pd.to_datetime(fecha_min), pd.to_datetime(fecha_max)]
+
+# Función para seleccionar la variable climática a visualizar
+def variables_clima():
+    seleccion = st.selectbox('Seleccione la variable a visualizar:', ['Seleccione una opción',
+                                                                      'Temperatura promedio del aire a 2 metros (°C)',
+                                                                      'Humedad relativa promedio a 2 metros (%)',
+                                                                      'Velocidad del viento a 2 metros (m/s)',
+                                                                      'Precipitación total corregida (mm/día)',
+                                                                      'Radiación solar total en la superficie (kWh/m²/día)'])
+    if seleccion == 'Seleccione una opción':
+        return None
+    else:
+        return seleccion
@@ -0,0 +1,45 @@
+import plotly.express as px
+import streamlit as st
+
+import analisis
+from paginas.comun import mostrar_figura
+
+# Página de correlaciones entre variables numéricas y categóricas
+def mostrar(seleccion):
+    datos = seleccion.datos
+
+    st.subheader('Correlación entre las variables numéricas')
+    # La matriz sale de los co-momentos acumulados, sin recorrer de nuevo los datos
+    matriz = seleccion.agregados().comomentos
+    clave_matriz = ('correlacion',)
+    if len(seleccion.estaciones) > 1 and st.toggle('Combinar todas las estaciones', key='correlacion_estaciones'):
+        matriz = seleccion.comomentos_estaciones()
+        clave_matriz = ('correlacion', seleccion.version_estaciones())
+
+    # Mapa de calor de correlación
+    def construir():
+        fig = px.imshow(
+        matriz.correlacion(),
+        text_auto=True,
+        color_continuous_scale='Blues',
+        zmin=-1,
+        zmax=1,
+        title="Mapa de calor de correlacion"
+        )
+        return fig
+
+    mostrar_figura(seleccion, clave_matriz, construir)
+
+    st.subheader('Correlación entre las variables categóricas')
+    # Tablas de contingencia y chi-cuadrado de todas las parejas de variables
+    # categóricas, calculadas una sola vez por estación sin modificar los datos
+    contingencias = analisis.contingencias(datos, clave=seleccion.version())
+
+    for resultado in contingencias:
+        st.subheader(f"{resultado['a']} vs {resultado['b']}")
+        st.dataframe(resultado['tabla'])
+        st.write(f"Valor p: {resultado['p']:.4f}")
+        if resultado['significativo']:
+            st.write(f"Existe una relación significativa entre {resultado['texto_a']} y {resultado['texto_b']}.")
+        else:
+            st.write(f"No se encontró relación significativa entre {resultado['texto_a']} y {resultado['texto_b']}.")
@@ -0,0 +1,32 @@
+import streamlit as st
+
+import imagenes
+
+# Imagen de la página de inicio y ancho de la versión reducida que se envía.
+# El área central de Streamlit mide unos 700 px, así que no hace falta la
+# imagen original de 1920 px
+IMAGEN = 'cathedral-of-cuenca-4021077_1920.jpg'
+ANCHO_IMAGEN = 960
+
+# Página de inicio: solo texto y la imagen, sin gráficos ni pruebas estadísticas
+def mostrar(seleccion):
+    datos = seleccion.datos
+
+    # Título de la página web
+    st.title('Datos Meteorológicos en Cuenca - Ecuador')
+
+    st.subheader('Mateo Calderón - Lisseth Guazhambo')
+
+    # Descripción de la página
+    st.markdown('<div style="text-align: justify;">En esta página web se presentan los datos meteorológicos ' \
+    'de la ciudad de Cuenca, obtenidos a partir de la base de datos del proyecto POWER (Prediction Of ' \
+    'Worldwide Energy Resources) de la NASA. Este conjunto de datos incluye información meteorológica ' \
+    'histórica y actualizada, recopilada mediante sensores satelitales.</div>', unsafe_allow_html=True)
+    st.markdown('<div style="text-align: justify;">Además se realizó un análisis de los datos en' \
+    ' base a gráficas y pruebas estadísticas para responder a las preguntas de investigación</div>', unsafe_allow_html=True)
+    st.markdown('<div style="text-align: justify;">Se usaron los datos disponibles desde el ' \
+    f'{datos["Fecha del registro"].min():%d/%m/%Y} hasta el {datos["Fecha del registro"].max():%d/%m/%Y}.</div>',
+    unsafe_allow_html=True)
+
+    st.image(imagenes.variante(IMAGEN, ANCHO_IMAGEN), width=None, caption='Catedral de Cuenca, Ecuador',
+             use_container_width=True)
@@ -0,0 +1,96 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import correlacion
+import muestreo
+from paginas.comun import PUNTOS_GRAFICO, mostrar_figura
+
+# Variable de referencia de las correlaciones y variable que se compara por defecto
+REFERENCIA = 'Temperatura (°C)'
+COMPARADA = 'Radiación solar (kWh/m²/día)'
+
+# Página de preguntas de investigación, con las correlaciones de la temperatura
+# con otras variables (desfasadas y en ventanas móviles)
+def mostrar(seleccion):
+    datos = seleccion.datos
+    st.header('Preguntas de investigación y conclusiones')
+    st.markdown('''
+<div style="text-align: justify;">
+
+
+1. <b>¿Existe alguna tendencia climática marcada en la ciudad de Cuenca?</b>  
+   En los últimos cinco años se ha observado una tendencia ligeramente creciente en la temperatura, confirmada mediante la prueba de Kendall Tau. Esto sugiere posibles efectos del cambio climático local.  
+   De forma complementaria, se evidencia una tendencia decreciente en la humedad relativa, lo cual puede indicar una relación inversamente proporcional entre ambas variables en ciertos periodos.
+
+2. <b>¿Los datos meteorológicos varían al compararlos con meses o años anteriores?</b>  
+   Sí. Por ejemplo, al comparar la precipitación de enero y agosto de 2024, la prueba de Mann-Whitney muestra diferencias estadísticamente significativas, reflejando que los patrones de lluvia no se mantienen constantes.  
+   Del mismo modo, al analizar la radiación solar entre los años 2020, 2021 y 2023, la prueba de Kruskal-Wallis confirmó variaciones significativas entre años.
+
+3. <b>¿Qué variables tienen alguna correlación con la temperatura?</b>  
+   La temperatura fue clasificada en categorías y relacionada con otras variables usando la prueba de chi-cuadrado. Se identificó una relación significativa con:  
+   - Radiación solar: mayor radiación tiende a aumentar la temperatura ambiente.  
+   - Velocidad del viento: vientos más fuertes pueden favorecer una sensación térmica más baja, aunque la relación es más débil.
+
+4. <b>¿Hay otras variables que estén relacionadas entre sí?</b>  
+   Sí, se encontraron relaciones significativas entre variables categorizadas, tales como:  
+   - Humedad y precipitación: niveles altos de humedad se asocian con eventos de lluvia.  
+   - Viento y precipitación: vientos intensos se relacionan con lluvias más fuertes, posiblemente por tormentas.  
+   - Humedad y radiación: días con alta radiación suelen presentar niveles de humedad más bajos, por mayor evaporación.
+
+5. <b>¿Se ha dado alguna anomalía climática en los últimos 5 años?</b>  
+   Sí. Se identificaron anomalías en todas las variables analizadas, como por ejemplo:  
+   - Durante 2023 hubo varios días con temperaturas inusualmente bajas, mientras que en 2024 se detectó un evento aislado de temperatura máxima extrema.  
+   - La radiación solar presentó valores inusualmente bajos hacia finales de 2024, coincidiendo con un aumento de las precipitaciones tras un periodo seco.  
+   - La velocidad del viento ha mostrado una disminución en los valores máximos registrados desde 2023, lo cual podría estar vinculado a cambios térmicos o estacionales.
+
+</div>
+''', unsafe_allow_html=True)
+
+    # Complemento de la pregunta 3: correlación de la temperatura con otra variable,
+    # con desfases de varios días y en ventanas móviles. Las estaciones pueden
+    # tener otros parámetros, así que la sección se omite si falta la temperatura
+    st.subheader('Correlación de la temperatura con otras variables')
+    matriz = seleccion.agregados().comomentos.correlacion()
+    if REFERENCIA not in matriz.columns or len(matriz.columns) < 2:
+        st.info('La estación no tiene la temperatura y otra variable numérica para calcular correlaciones.')
+        return
+    correlaciones = matriz[REFERENCIA].drop(REFERENCIA)
+    st.dataframe(correlaciones.rename('Correlación'))
+
+    opciones = list(correlaciones.index)
+    otra = st.selectbox('Seleccione la variable a comparar con la temperatura:', opciones,
+                        index=opciones.index(COMPARADA) if COMPARADA in opciones else 0,
+                        key='correlacion_variable')
+
+    def construir():
+        desfases = correlacion.correlacion_desfasada(datos[otra], datos[REFERENCIA], 30)
+        fig = px.bar(
+            desfases.reset_index(),
+            x='desfase',
+            y='correlacion',
+            title=f'Correlación de {otra} con la temperatura de días posteriores',
+            labels={'desfase': 'Días de adelanto', 'correlacion': 'Correlación'}
+        )
+        return fig
+
+    mostrar_figura(seleccion, ('desfases', otra), construir)
+
+    ventana = st.slider('Días de la ventana móvil', 30, 365, 90, key='correlacion_ventana')
+
+    def construir():
+        movil = pd.DataFrame({
+            'Fecha del registro': datos['Fecha del registro'],
+            'Correlación': correlacion.correlacion_movil(datos[otra], datos[REFERENCIA], ventana)
+        }).dropna()
+        fig = px.line(
+            muestreo.reducir(movil, 'Fecha del registro', 'Correlación', PUNTOS_GRAFICO),
+            x='Fecha del registro',
+            y='Correlación',
+            title=f'Correlación móvil de {ventana} días entre {otra} y la temperatura',
+            labels={'Fecha del registro': 'Fecha'}
+        )
+        fig.add_hline(y=0, line_dash='dash', line_color='gray')
+        return fig
+
+    mostrar_figura(seleccion, ('correlacion_movil', otra, ventana), construir)
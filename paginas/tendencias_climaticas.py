@@ -0,0 +1,96 @@
+import plotly.express as px
+import streamlit as st
+
+import analisis
+import climatologia
+import instrumentacion
+import muestreo
+from paginas.comun import PUNTOS_GRAFICO, fechas, mostrar_figura, variables_clima
+
+# Clave de los selectores de fechas y título del gráfico de cada variable
+GRAFICOS = {
+    'Temperatura promedio del aire a 2 metros (°C)': ('temperatura', 'Temperatura Diaria Promedio'),
+    'Humedad relativa promedio a 2 metros (%)': ('humedad', 'Humedad Diaria Promedio'),
+    'Velocidad del viento a 2 metros (m/s)': ('viento', 'Viento Diario Promedio'),
+    'Precipitación total corregida (mm/día)': ('precipitacion', 'Precipitación Diaria Promedio'),
+    'Radiación solar total en la superficie (kWh/m²/día)': ('radiacion', 'Radiación Solar Diaria Promedio'),
+}
+
+# Función para calcular la prueba de Kendall Tau
+@instrumentacion.cronometrar('kend_tau')
+def kend_tau(seleccion, data, columna):
+    booleano = st.toggle('Prueba estadística', key='estadistica_temperatura')
+
+    if booleano:
+        # El resultado se memoriza por estación, versión de los datos, variable y
+        # rango de fechas; al anexar días la versión cambia y no se reutilizan
+        # resultados de la semana reimputada
+        fechas_serie = data['Fecha del registro']
+        clave = seleccion.version() + (columna, fechas_serie.min(), fechas_serie.max(), len(data))
+        resultado = analisis.tendencia(data, columna, clave=clave)
+        st.write('Prueba de Kendall')
+        st.write(f"τ: {resultado['tau']}, p: {resultado['p']}")
+        st.write(f"Pendiente de Sen: {resultado['pendiente_sen']:.4f} por año")
+        st.write(f"Mann-Kendall estacional, p: {resultado['estacional']['p']:.4f}; "
+                 f"corregido por autocorrelación, p: {resultado['modificado']['p']:.4f}")
+        if resultado['direccion'] is not None:
+            st.success(f"Hay una tendencia {resultado['direccion']} en los datos.")
+        else:
+            st.warning("La correlación no es estadísticamente significativa")
+
+# Función para graficar la anomalía estandarizada respecto a la climatología diaria
+def anomalia_climatologica(seleccion, data, columna):
+    booleano = st.toggle('Anomalía respecto a la climatología', key='anomalia_climatologica')
+
+    if booleano:
+        climatologia_diaria = seleccion.agregados().climatologia
+
+        def construir():
+            serie = climatologia.anomalias_estandarizadas(data, climatologia_diaria)[['Fecha del registro', columna]]
+            fig = px.line(
+                muestreo.reducir(serie, 'Fecha del registro', columna, PUNTOS_GRAFICO),
+                x='Fecha del registro',
+                y=columna,
+                title=f'Anomalía estandarizada de {columna}',
+                labels={'Fecha del registro': 'Fecha', columna: 'Desviaciones estándar'}
+            )
+            fig.add_hline(y=0, line_dash='dash', line_color='gray')
+            return fig
+
+        fechas_serie = data['Fecha del registro']
+        mostrar_figura(seleccion, ('anomalia_climatologica', columna, fechas_serie.min(), fechas_serie.max()),
+                       construir)
+
+# Página de tendencias: serie de la variable, prueba de Kendall y anomalía climatológica
+def mostrar(seleccion):
+    # Visualización de los datos
+    st.header('Visualización de tendencias climáticas a lo largo del tiempo.')
+    variable = variables_clima()
+    if variable is None:
+        return
+
+    # Se filtran los datos según la variable seleccionada
+    columna = analisis.VARIABLES[variable]
+    etiqueta, titulo = GRAFICOS[variable]
+    arreglo = fechas(seleccion, etiqueta)
+    grafico = seleccion.consulta.rango(arreglo[0], arreglo[1])
+
+    # Se reduce la serie a un número acotado de puntos conservando sus extremos;
+    # la figura se construye solo si no está en la caché de figuras
+    def construir():
+        fig = px.line(
+            muestreo.reducir(grafico, 'Fecha del registro', columna, PUNTOS_GRAFICO),
+            x='Fecha del registro',
+            y=columna,
+            title=titulo,
+            labels={'Fecha del registro': 'Fecha', columna: columna}
+        )
+        fig.update_layout(xaxis_title='Fecha', yaxis_title=columna)
+        return fig
+
+    mostrar_figura(seleccion, ('tendencias', columna, arreglo[0], arreglo[1]), construir)
+
+    # Se calcula la prueba de Kendall Tau para la tendencia de la variable seleccionada
+    kend_tau(seleccion, grafico, columna)
+
+    anomalia_climatologica(seleccion, grafico, columna)
@@ -0,0 +1,201 @@
+import threading
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import consultas
+import cubo
+import data
+import instrumentacion
+
+# Nivel de significancia usado en todas las pruebas
+ALFA = 0.05
+
+# Número máximo de grupos (meses de un año o años) para precalcular las
+# pruebas de todos sus subconjuntos; con más grupos solo se precalculan las
+# parejas y el conjunto completo, y el resto se calcula la primera vez que se consulta
+LIMITE_SUBCONJUNTOS = 6
+
+# Nombre de la prueba que se usa según la normalidad y el número de grupos
+def nombre_prueba(normal, n_grupos):
+    if normal:
+        return 't' if n_grupos < 3 else 'anova'
+    return 'mann_whitney' if n_grupos < 3 else 'kruskal'
+
+# Función para obtener los valores de un grupo (un mes de un año o un año completo)
+def _valores_grupo(consulta, variable, escala, anio, grupo):
+    if escala == 'mensual':
+        seleccion = consulta.mes(anio, grupo, variable)
+    else:
+        seleccion = consulta.anio(grupo, variable)
+    return seleccion[variable].dropna().to_numpy(dtype='float64')
+
+# Estadísticos de cada grupo en el formato de las celdas del cubo
+def _celdas(valores):
+    n = np.array([len(v) for v in valores], dtype='float64')
+    suma = np.array([v.sum() for v in valores])
+    suma_cuadrados = np.array([(v ** 2).sum() for v in valores])
+    celdas = pd.DataFrame({'conteo': n, 'suma': suma, 'suma_cuadrados': suma_cuadrados})
+    return cubo.resumir(celdas)
+
+# Función para calcular una prueba sobre varios grupos
+def calcular_prueba(prueba, valores):
+    with instrumentacion.medir(f'pruebas.{prueba}'):
+        return _calcular_prueba(prueba, valores)
+
+# Cálculo de cada prueba
+def _calcular_prueba(prueba, valores):
+    if prueba == 'shapiro':
+        if len(valores[0]) < 3:
+            return np.nan, np.nan
+        return tuple(stats.shapiro(valores[0]))
+    if prueba == 't':
+        return tuple(cubo.prueba_t(_celdas(valores)))
+    if prueba == 'anova':
+        return tuple(cubo.anova(_celdas(valores)))
+    if prueba == 'mann_whitney':
+        return tuple(stats.mannwhitneyu(*valores))
+    if prueba == 'kruskal':
+        return tuple(stats.kruskal(*valores))
+    raise ValueError(f"Prueba desconocida: {prueba}")
+
+# Función para comparar varios grupos sin la tabla del motor: normalidad de
+# cada grupo y la prueba que corresponde, con el mismo resultado que
+# MotorPruebas.resultado
+def comparar(consulta, variable, escala, grupos, anio=None):
+    valores = [_valores_grupo(consulta, variable, escala, anio, int(g)) for g in grupos]
+    normal = all(calcular_prueba('shapiro', [v])[1] > ALFA for v in valores)
+    if len(grupos) < 2:
+        return {'normal': normal, 'prueba': None, 'estadistico': np.nan, 'p': np.nan}
+    prueba = nombre_prueba(normal, len(grupos))
+    estadistico, p = calcular_prueba(prueba, valores)
+    return {'normal': normal, 'prueba': prueba, 'estadistico': estadistico, 'p': p}
+
+# Función que se ejecuta en cada proceso: todas las pruebas de normalidad,
+# de parejas y de varios grupos de una variable de una estación
+def pruebas_variable(estacion, variable, datos, limite=LIMITE_SUBCONJUNTOS):
+    consulta = consultas.ConsultaFechas(datos)
+    filas = []
+
+    # Conjuntos de grupos: los meses de cada año y los años completos
+    escalas = [('mensual', int(anio), list(consulta.meses(anio))) for anio in consulta.anios()]
+    escalas.append(('anual', None, list(consulta.anios())))
+
+    for escala, anio, grupos in escalas:
+        grupos = [int(g) for g in grupos]
+        valores = {g: _valores_grupo(consulta, variable, escala, anio, g) for g in grupos}
+
+        for g in grupos:
+            estadistico, p = calcular_prueba('shapiro', [valores[g]])
+            filas.append((estacion, variable, escala, anio, (g,), 'shapiro', estadistico, p))
+
+        # Parejas y conjuntos de tres o más grupos
+        seleccionados = [c for c in combinations(grupos, 2)]
+        if len(grupos) <= limite:
+            for k in range(3, len(grupos) + 1):
+                seleccionados.extend(combinations(grupos, k))
+        elif len(grupos) >= 3:
+            seleccionados.append(tuple(grupos))
+
+        for conjunto in seleccionados:
+            muestras = [valores[g] for g in conjunto]
+            for prueba in (['t', 'mann_whitney'] if len(conjunto) == 2 else ['anova', 'kruskal']):
+                estadistico, p = calcular_prueba(prueba, muestras)
+                filas.append((estacion, variable, escala, anio, conjunto, prueba, estadistico, p))
+
+    return filas
+
+# Motor de pruebas estadísticas: precalcula en segundo plano, en un grupo de
+# procesos, las pruebas de todas las estaciones y variables, y responde a las
+# consultas de la página con una búsqueda en la tabla de resultados. Los
+# procesos se crean con data.crear_procesos, así que no vuelven a ejecutar la
+# página aunque el motor se cree dentro del servidor de Streamlit
+class MotorPruebas:
+
+    def __init__(self, estaciones, variables=None, procesos=None, limite=LIMITE_SUBCONJUNTOS,
+                 columna_fecha='Fecha del registro'):
+        self._consultas = {estacion: consultas.ConsultaFechas(datos) for estacion, datos in estaciones.items()}
+        self._tabla = {}
+        self._bloqueo = threading.Lock()
+        self._pendientes = 0
+
+        tareas = []
+        for estacion, datos in estaciones.items():
+            columnas = variables or datos.drop(columns=columna_fecha).select_dtypes('number').columns
+            for variable in columnas:
+                tareas.append((estacion, variable, datos[[columna_fecha, variable]].copy(), limite))
+
+        self._ejecutor = data.crear_procesos(procesos)
+        self._pendientes = len(tareas)
+        for tarea in tareas:
+            self._ejecutor.submit(pruebas_variable, *tarea).add_done_callback(self._guardar)
+        if not tareas:
+            self._ejecutor.shutdown(wait=False)
+
+    # Función que guarda en la tabla los resultados de una tarea terminada
+    def _guardar(self, futuro):
+        filas = futuro.result() if not futuro.cancelled() and futuro.exception() is None else []
+        with self._bloqueo:
+            for estacion, variable, escala, anio, grupos, prueba, estadistico, p in filas:
+                self._tabla[(estacion, variable, escala, anio, grupos, prueba)] = (estadistico, p)
+            self._pendientes -= 1
+            terminado = self._pendientes == 0
+        if terminado:
+            self._ejecutor.shutdown(wait=False)
+
+    # Función para detener los procesos; las tareas pendientes se cancelan y las
+    # pruebas que falten se calculan al consultarlas
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    # Indica si ya terminaron todas las tareas en segundo plano
+    def listo(self):
+        return self._pendientes == 0
+
+    # Función para buscar una prueba en la tabla; si todavía no está se calcula y se guarda
+    def _buscar(self, estacion, variable, escala, anio, grupos, prueba):
+        clave = (estacion, variable, escala, anio, grupos, prueba)
+        resultado = self._tabla.get(clave)
+        if resultado is None:
+            consulta = self._consultas[estacion]
+            valores = [_valores_grupo(consulta, variable, escala, anio, g) for g in grupos]
+            resultado = calcular_prueba(prueba, valores)
+            with self._bloqueo:
+                self._tabla[clave] = resultado
+        return resultado
+
+    # Función para consultar la comparación de varios meses de un año (escala
+    # 'mensual') o de varios años (escala 'anual'). Devuelve la normalidad de los
+    # grupos y la prueba elegida como en la página: t o ANOVA si todos son
+    # normales, Mann-Whitney o Kruskal-Wallis si no
+    def resultado(self, estacion, variable, escala, grupos, anio=None):
+        grupos = tuple(int(g) for g in grupos)
+        anio = int(anio) if anio is not None else None
+
+        normal = all(self._buscar(estacion, variable, escala, anio, (g,), 'shapiro')[1] > ALFA
+                     for g in grupos)
+        prueba = nombre_prueba(normal, len(grupos))
+        if len(grupos) < 2:
+            return {'normal': normal, 'prueba': None, 'estadistico': np.nan, 'p': np.nan}
+
+        # Las pruebas se guardan con los grupos ordenados; con dos grupos en otro
+        # orden se ajusta el signo de t o el estadístico U
+        ordenados = tuple(sorted(grupos))
+        estadistico, p = self._buscar(estacion, variable, escala, anio, ordenados, prueba)
+        if grupos != ordenados:
+            if prueba == 't':
+                estadistico = -estadistico
+            elif prueba == 'mann_whitney':
+                consulta = self._consultas[estacion]
+                n1, n2 = [len(_valores_grupo(consulta, variable, escala, anio, g)) for g in grupos]
+                estadistico = n1 * n2 - estadistico
+        return {'normal': normal, 'prueba': prueba, 'estadistico': estadistico, 'p': p}
+
+    # Tabla completa de resultados como DataFrame
+    def tabla(self):
+        with self._bloqueo:
+            filas = [clave + valor for clave, valor in self._tabla.items()]
+        return pd.DataFrame(filas, columns=['estacion', 'variable', 'escala', 'anio', 'grupos',
+                                            'prueba', 'estadistico', 'p'])
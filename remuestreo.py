@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+import data
+import instrumentacion
+import memoria
+
+# Número de remuestreos por defecto y tamaño de los bloques en que se generan,
+# para que la matriz de remuestreo no crezca con el número total de remuestreos
+REMUESTREOS = 10000
+TAMANO_BLOQUE = 1000
+
+# Estadísticos de las pruebas de permutación
+ESTADISTICOS = ('media', 'mediana')
+
+# Presupuesto de valores remuestreados (remuestreos x valores) y número mínimo
+# de remuestreos de una comparación de la página (ver remuestreos_para)
+PRESUPUESTO_VALORES = 4_000_000
+MINIMO_REMUESTREOS = 1000
+
+# Comparaciones memorizadas por (clave, remuestreos, semilla, nombres)
+MAXIMO_MEMORIA = 128
+_memoria = memoria.Memoria(MAXIMO_MEMORIA)
+
+# Estadístico de cada grupo para una matriz de remuestreos (remuestreos x valores)
+def _por_grupo(matriz, limites, estadistico):
+    funcion = np.mean if estadistico == 'media' else np.median
+    return np.column_stack([funcion(matriz[:, i:j], axis=1) for i, j in zip(limites[:-1], limites[1:])])
+
+# Estadístico de comparación entre grupos. Con medias es la suma de cuadrados
+# entre grupos (equivalente a F en una prueba de permutación); con medianas es
+# la suma ponderada de los cuadrados de las distancias a la mediana global. Con
+# dos grupos ambos dependen solo de la diferencia absoluta entre los grupos. El
+# centro es el mismo en todas las permutaciones, así que se calcula una vez
+def _comparacion(valores_grupo, tamanos, centro):
+    distancias = valores_grupo - centro
+    if np.isnan(distancias).any():
+        return np.full(len(valores_grupo), np.nan)
+    return (tamanos * distancias ** 2).sum(axis=1)
+
+# Centro de todos los valores según el estadístico
+def _centro(valores, estadistico):
+    return valores.mean() if estadistico == 'media' else np.median(valores)
+
+# Estadísticos de las permutaciones de un bloque, una columna por estadístico;
+# se ejecuta en cada proceso. Todos los estadísticos usan las mismas permutaciones
+def _bloque_permutaciones(valores, limites, estadisticos, n, semilla):
+    rng = np.random.default_rng(semilla)
+    indices = rng.permuted(np.tile(np.arange(len(valores)), (n, 1)), axis=1)
+    matriz = valores[indices]
+    tamanos = np.diff(limites)
+    return np.column_stack([_comparacion(_por_grupo(matriz, limites, e), tamanos, _centro(valores, e))
+                            for e in estadisticos])
+
+# Tamaños de los bloques en que se reparten n remuestreos
+def _tamanos(n, bloque):
+    return [bloque] * (n // bloque) + ([n % bloque] if n % bloque else [])
+
+# Función para repartir los remuestreos en bloques con semillas independientes
+def _bloques(n, bloque, semilla):
+    tamanos = _tamanos(n, bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    return list(zip(tamanos, semillas))
+
+# Función para elegir el número de remuestreos de una comparación según el
+# número de valores de los grupos: el trabajo (remuestreos x valores) se
+# mantiene dentro de PRESUPUESTO_VALORES, sin pasar de `maximo` ni bajar de
+# MINIMO_REMUESTREOS, con el que el error de Monte Carlo de un valor p
+# cercano a 0.05 es menor que 0.01
+def remuestreos_para(grupos, presupuesto=PRESUPUESTO_VALORES, maximo=REMUESTREOS):
+    total = sum(int(np.count_nonzero(~np.isnan(np.asarray(g, dtype='float64')))) for g in grupos)
+    return int(np.clip(presupuesto // max(total, 1), MINIMO_REMUESTREOS, maximo))
+
+# Pruebas de permutación para diferencias de medias y/o medianas entre dos o
+# más grupos, con las mismas permutaciones para todos los estadísticos.
+# Las permutaciones se generan como matrices por bloques y, si se indican
+# procesos, los bloques se reparten entre ellos. Devuelve {estadístico:
+# resultado}; si algún grupo no tiene datos el estadístico y el valor p son NaN
+@instrumentacion.cronometrar()
+def pruebas_permutacion(grupos, estadisticos=ESTADISTICOS, n=REMUESTREOS, semilla=None,
+                        bloque=TAMANO_BLOQUE, procesos=None):
+    estadisticos = tuple(estadisticos)
+    for estadistico in estadisticos:
+        if estadistico not in ESTADISTICOS:
+            raise ValueError(f"Estadístico desconocido: {estadistico}")
+
+    grupos = [np.asarray(g, dtype='float64') for g in grupos]
+    grupos = [g[~np.isnan(g)] for g in grupos]
+    valores = np.concatenate(grupos)
+    limites = np.concatenate(([0], np.cumsum([len(g) for g in grupos])))
+    tamanos = np.diff(limites)
+    vacio = {'estadistico': np.nan, 'p': np.nan, 'remuestreos': n}
+
+    if (tamanos == 0).any():
+        return {estadistico: dict(vacio) for estadistico in estadisticos}
+
+    # Estadísticos observados; los que son NaN no se permutan
+    observados = {e: _comparacion(_por_grupo(valores[None, :], limites, e), tamanos, _centro(valores, e))[0]
+                  for e in estadisticos}
+    resultado = {e: dict(vacio) for e in estadisticos if np.isnan(observados[e])}
+    calculados = tuple(e for e in estadisticos if e not in resultado)
+    if not calculados:
+        return resultado
+
+    bloques = _bloques(n, bloque, semilla)
+    if procesos and procesos > 1:
+        with data.crear_procesos(procesos) as ejecutor:
+            partes = list(ejecutor.map(_bloque_permutaciones, *zip(*[
+                (valores, limites, calculados, m, s) for m, s in bloques])))
+    else:
+        partes = [_bloque_permutaciones(valores, limites, calculados, m, s) for m, s in bloques]
+    permutados = np.concatenate(partes)
+
+    # Se compara con una pequeña tolerancia para no perder empates por redondeo
+    for k, estadistico in enumerate(calculados):
+        observado = observados[estadistico]
+        extremos = (permutados[:, k] >= observado * (1 - 1e-12)).sum()
+        resultado[estadistico] = {'estadistico': observado, 'p': (extremos + 1) / (n + 1), 'remuestreos': n}
+    return {estadistico: resultado[estadistico] for estadistico in estadisticos}
+
+# Prueba de permutación para diferencias de medias o medianas entre dos o más
+# grupos (ver pruebas_permutacion)
+def prueba_permutacion(grupos, estadistico='media', n=REMUESTREOS, semilla=None,
+                       bloque=TAMANO_BLOQUE, procesos=None):
+    return pruebas_permutacion(grupos, (estadistico,), n, semilla, bloque, procesos)[estadistico]
+
+# Intervalos de confianza bootstrap (percentiles) de la media o la mediana de cada grupo
+@instrumentacion.cronometrar()
+def intervalos_bootstrap(grupos, estadistico='media', n=REMUESTREOS, nivel=0.95, semilla=None,
+                         bloque=TAMANO_BLOQUE, nombres=None):
+    funcion = np.mean if estadistico == 'media' else np.median
+    rng = np.random.default_rng(semilla)
+    alfa = (1 - nivel) / 2
+
+    filas = []
+    for grupo in grupos:
+        grupo = np.asarray(grupo, dtype='float64')
+        grupo = grupo[~np.isnan(grupo)]
+        if len(grupo) == 0:
+            filas.append((np.nan, np.nan, np.nan))
+            continue
+
+        # Matriz de remuestreos con reemplazo (remuestreos x tamaño del grupo), por bloques
+        estimados = np.concatenate([
+            funcion(grupo[rng.integers(0, len(grupo), (m, len(grupo)))], axis=1)
+            for m in _tamanos(n, bloque)])
+        inferior, superior = np.quantile(estimados, [alfa, 1 - alfa])
+        filas.append((funcion(grupo), inferior, superior))
+
+    return pd.DataFrame(filas, columns=['estimado', 'inferior', 'superior'],
+                        index=nombres if nombres is not None else range(len(grupos)))
+
+# Función para comparar varios grupos por remuestreo: pruebas de permutación
+# de medias y medianas e intervalos bootstrap de la media. Sin n el número de
+# remuestreos se elige con remuestreos_para. Si se da una clave (estación,
+# versión de los datos, variable y grupos) el resultado se memoriza
+def comparar(grupos, nombres=None, n=None, semilla=0, clave=None):
+    n = remuestreos_para(grupos) if n is None else n
+    clave_memoria = None if clave is None else (clave, n, semilla, None if nombres is None else tuple(nombres))
+    return _memoria.obtener(clave_memoria, lambda: {
+        'permutacion': pruebas_permutacion(grupos, n=n, semilla=semilla),
+        'bootstrap': intervalos_bootstrap(grupos, n=n, semilla=semilla, nombres=nombres),
+    })
@@ -0,0 +1,473 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import analisis
+import anomalias
+import consultas
+import cubo
+import data
+import espacial
+
+# Servicio HTTP local con la API JSON del análisis, hecho solo con asyncio.
+# Los datos se cargan una vez al iniciar; las consultas rápidas (rangos y
+# agregados del cubo) se responden en el bucle de eventos y las pruebas de
+# scipy se calculan en un grupo de procesos. Las respuestas se guardan en una
+# caché compartida, y las consultas iguales que llegan a la vez esperan el
+# mismo cálculo en lugar de repetirlo.
+#
+# Uso:
+#   python servidor.py --directorio . --puerto 8000
+#   python servidor.py --compacto    (estaciones en compacto.AlmacenCompacto)
+#
+# Rutas (todas GET, parámetros en la URL):
+#   /salud
+#   /estaciones
+#   /rango?estacion=&inicio=&fin=&variables=a,b    (datos como {columns, data})
+#   /agregados?estacion=&variable=&escala=mensual|anual&anio=
+#   /tendencia?estacion=&variable=&inicio=&fin=
+#   /comparacion?estacion=&variable=&escala=mensual|anual&grupos=1,8&anio=
+#   /anomalias?estacion=&variable=&metodo=
+#   /cercanas?latitud=&longitud=&k=&radio_km=
+#   /interpolar?variable=&latitud=a,b&longitud=a,b&inicio=&fin=&potencia=&k=&radio_km=
+
+# Memoria máxima, en bytes, de las respuestas guardadas
+PRESUPUESTO_RESPUESTAS = 64 * 1024 * 1024
+
+# Número máximo de cálculos en cola en el grupo de procesos; si se supera se
+# responde 503 de inmediato para que la latencia de los demás no crezca sin límite
+MAXIMO_PENDIENTES = 256
+
+# Tamaño máximo de la línea de petición y de los encabezados
+MAXIMO_ENCABEZADOS = 16 * 1024
+
+# Datos de las estaciones {estación: ConsultaFechas}. Cada proceso del grupo
+# los llena al iniciar mapeando la misma caché, así que no se copian
+_consultas = {}
+
+# Índice espacial de las estaciones, construido junto con los datos
+_indice = None
+
+# Error de una petición con su código HTTP
+class ErrorPeticion(Exception):
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+# Función para cargar las estaciones en este proceso si todavía no están. Con
+# compacto=True cada estación se guarda en un compacto.AlmacenCompacto y las
+# consultas solo decodifican las filas que piden
+def _cargar(directorio='.', estrategia='semanal', compacto=False):
+    global _indice
+    if not _consultas:
+        catalogo, estaciones = data.importar_estaciones(directorio, estrategia=estrategia, modo_compacto=compacto)
+        _consultas.update({estacion: consultas.ConsultaFechas(d) for estacion, d in estaciones.items()})
+        _indice = espacial.IndiceEstaciones(catalogo)
+
+# Función para convertir un resultado a tipos de JSON (NaN como null)
+def _a_json(valor):
+    if isinstance(valor, dict):
+        return {str(k): _a_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_a_json(v) for v in valor]
+    if isinstance(valor, pd.DataFrame):
+        return [_a_json(fila) for fila in valor.to_dict(orient='records')]
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(valor).isoformat()
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+# Funciones de consulta de los parámetros
+def _estacion(parametros):
+    estacion = parametros.get('estacion') or next(iter(_consultas), None)
+    if estacion not in _consultas:
+        raise ErrorPeticion(404, f"Estación desconocida: {estacion}")
+    return estacion
+
+def _variable(parametros, consulta):
+    variable = parametros.get('variable')
+    if variable not in consulta.columnas or variable == consulta.columna_fecha:
+        raise ErrorPeticion(400, f"Variable desconocida: {variable}")
+    return variable
+
+def _fecha(parametros, nombre, defecto):
+    try:
+        return pd.Timestamp(parametros[nombre]) if parametros.get(nombre) else defecto
+    except ValueError:
+        raise ErrorPeticion(400, f"Fecha no válida en {nombre}: {parametros[nombre]}")
+
+def _numeros(parametros, nombre, defecto=None, tipo=float):
+    if not parametros.get(nombre):
+        if defecto is None:
+            raise ErrorPeticion(400, f"Falta el parámetro {nombre}")
+        return defecto
+    try:
+        return [tipo(valor) for valor in parametros[nombre].split(',') if valor]
+    except ValueError:
+        raise ErrorPeticion(400, f"Se esperaban números en {nombre}")
+
+def _enteros(texto, nombre):
+    try:
+        return [int(valor) for valor in texto.split(',') if valor]
+    except (AttributeError, ValueError):
+        raise ErrorPeticion(400, f"Se esperaba una lista de enteros en {nombre}")
+
+# Cálculos que se ejecutan en los procesos; devuelven resultados ya convertidos a JSON.
+# Los rangos pueden tener miles de filas, así que se serializan con to_json de
+# pandas en lugar de convertir celda por celda y se devuelven como bytes
+def _rango(estacion, inicio, fin, variables):
+    seleccion = _consultas[estacion].rango(inicio, fin, variables)
+    datos = seleccion.to_json(orient='split', index=False, date_format='iso', force_ascii=False)
+    return (f'{{"estacion": {json.dumps(estacion, ensure_ascii=False)}, "filas": {len(seleccion)}, '
+            f'"datos": {datos}}}').encode('utf-8')
+
+def _tendencia(estacion, variable, inicio, fin):
+    seleccion = _consultas[estacion].rango(inicio, fin, variable)
+    resultado = analisis.tendencia(seleccion, variable)
+    resultado.update({'estacion': estacion, 'variable': variable, 'inicio': inicio, 'fin': fin})
+    return _a_json(resultado)
+
+def _comparacion(estacion, variable, escala, grupos, anio):
+    resultado = analisis.comparacion_consulta(_consultas[estacion], variable, escala, grupos, anio)
+    resultado.update({'estacion': estacion, 'variable': variable, 'escala': escala,
+                      'grupos': grupos, 'anio': anio})
+    return _a_json(resultado)
+
+def _anomalias(estacion, variable, metodo):
+    consulta = _consultas[estacion]
+    _, encontradas = analisis.anomalias_variable(consulta.datos, variable, metodo)
+    return _a_json({'estacion': estacion, 'variable': variable, 'metodo': metodo,
+                    'anomalias': encontradas.rename(columns={consulta.columna_fecha: 'fecha',
+                                                             variable: 'valor'})})
+
+def _interpolar(variable, latitudes, longitudes, inicio, fin, potencia, k, radio_km):
+    valores = _indice.interpolar(_consultas, variable, latitudes, longitudes, inicio, fin, potencia, k, radio_km)
+    return _a_json({'variable': variable, 'fechas': valores.index.to_numpy(),
+                    'puntos': [{'latitud': latitud, 'longitud': longitud, 'valores': valores[i].to_numpy().tolist()}
+                               for i, (latitud, longitud) in enumerate(zip(latitudes, longitudes))]})
+
+# Caché de respuestas ya serializadas, con presupuesto de bytes y descarte de
+# las menos usadas. Solo la usa el bucle de eventos, así que no necesita bloqueo
+class CacheRespuestas:
+
+    def __init__(self, presupuesto=PRESUPUESTO_RESPUESTAS):
+        self.presupuesto = presupuesto
+        self._respuestas = OrderedDict()
+        self._en_curso = {}
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    # Función para obtener una respuesta; `calcular` es una corrutina que solo
+    # se espera si la respuesta no está guardada ni se está calculando. Devuelve
+    # un resultado JSON o el cuerpo ya serializado en bytes
+    async def obtener(self, clave, calcular):
+        cuerpo = self._respuestas.get(clave)
+        if cuerpo is not None:
+            self._respuestas.move_to_end(clave)
+            self.aciertos += 1
+            return cuerpo
+
+        # Otra petición igual ya está calculando la respuesta
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.aciertos += 1
+            return await asyncio.shield(futuro)
+
+        self.fallos += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[clave] = futuro
+        try:
+            resultado = await calcular()
+            if not isinstance(resultado, bytes):
+                resultado = json.dumps(resultado, ensure_ascii=False).encode('utf-8')
+            cuerpo = resultado
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except Exception as e:
+            futuro.set_exception(e)
+            # Se marca la excepción como leída si nadie más la esperaba
+            futuro.exception()
+            raise
+        finally:
+            del self._en_curso[clave]
+        futuro.set_result(cuerpo)
+        self._guardar(clave, cuerpo)
+        return cuerpo
+
+    # Función para guardar una respuesta y descartar las más antiguas si se supera el presupuesto
+    def _guardar(self, clave, cuerpo):
+        if len(cuerpo) > self.presupuesto:
+            return
+        self._respuestas[clave] = cuerpo
+        self.bytes += len(cuerpo)
+        while self.bytes > self.presupuesto:
+            _, descartado = self._respuestas.popitem(last=False)
+            self.bytes -= len(descartado)
+
+    # Contadores de uso de la caché
+    def estadisticas(self):
+        return {'respuestas': len(self._respuestas), 'bytes': self.bytes, 'presupuesto': self.presupuesto,
+                'aciertos': self.aciertos, 'fallos': self.fallos, 'en_curso': len(self._en_curso)}
+
+# Servicio con los datos cargados, los agregados de cada estación, el grupo de
+# procesos y la caché de respuestas
+class Servicio:
+
+    def __init__(self, directorio='.', procesos=None, estrategia='semanal', compacto=False):
+        self.inicio = time.time()
+        _cargar(directorio, estrategia, compacto)
+        self.catalogo = data.catalogo_estaciones(directorio).loc[list(_consultas)]
+        self.cubo_mensual = {e: cubo.construir_cubo(c.datos, e) for e, c in _consultas.items()}
+        self.cubo_anual = {e: cubo.anual(c) for e, c in self.cubo_mensual.items()}
+
+        # Los procesos se crean después de cargar los datos: la caché ya quedó
+        # escrita y cada proceso solo la mapea al iniciar
+        self.ejecutor = data.crear_procesos(procesos, initializer=_cargar, initargs=(directorio, estrategia, compacto))
+        self.cache = CacheRespuestas()
+        self.pendientes = 0
+        self.peticiones = 0
+        self.rutas = {
+            '/salud': self.salud,
+            '/estaciones': self.estaciones,
+            '/rango': self.rango,
+            '/agregados': self.agregados,
+            '/tendencia': self.tendencia,
+            '/comparacion': self.comparacion,
+            '/anomalias': self.anomalias,
+            '/cercanas': self.cercanas,
+            '/interpolar': self.interpolar,
+        }
+
+    # Función para ejecutar un cálculo en el grupo de procesos
+    async def _en_proceso(self, funcion, *args):
+        if self.pendientes >= MAXIMO_PENDIENTES:
+            raise ErrorPeticion(503, 'Servicio ocupado, intente de nuevo')
+        self.pendientes += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.ejecutor, funcion, *args)
+        finally:
+            self.pendientes -= 1
+
+    # Función para responder una petición; devuelve (estado, cuerpo en bytes)
+    async def responder(self, objetivo):
+        partes = urlsplit(objetivo)
+        ruta = self.rutas.get(partes.path.rstrip('/') or '/')
+        if ruta is None:
+            raise ErrorPeticion(404, f"Ruta desconocida: {partes.path}")
+        parametros = {k: v[-1] for k, v in parse_qs(partes.query).items()}
+
+        # Las rutas sin caché devuelven el resultado; las demás, una clave y una corrutina
+        resultado = ruta(parametros)
+        if isinstance(resultado, tuple):
+            clave, calcular = resultado
+            return await self.cache.obtener((partes.path,) + clave, calcular)
+        return json.dumps(_a_json(resultado), ensure_ascii=False).encode('utf-8')
+
+    def salud(self, parametros):
+        return {'estado': 'ok', 'estaciones': len(_consultas), 'segundos': time.time() - self.inicio,
+                'peticiones': self.peticiones, 'pendientes': self.pendientes,
+                'cache': self.cache.estadisticas()}
+
+    def estaciones(self, parametros):
+        catalogo = self.catalogo.reset_index()
+        catalogo['filas'] = [len(_consultas[e].fechas) for e in catalogo['estacion']]
+        return catalogo
+
+    def rango(self, parametros):
+        estacion = _estacion(parametros)
+        consulta = _consultas[estacion]
+        inicio = _fecha(parametros, 'inicio', pd.Timestamp(consulta.fechas[0]))
+        fin = _fecha(parametros, 'fin', pd.Timestamp(consulta.fechas[-1]))
+        variables = parametros['variables'].split(',') if parametros.get('variables') else None
+        if variables is not None:
+            for variable in variables:
+                _variable({'variable': variable}, consulta)
+
+        return ((estacion, inicio, fin, tuple(variables or ())),
+                lambda: self._en_proceso(_rango, estacion, inicio, fin, variables))
+
+    def agregados(self, parametros):
+        estacion = _estacion(parametros)
+        variable = _variable(parametros, _consultas[estacion])
+        escala = parametros.get('escala', 'mensual')
+        if escala not in ('mensual', 'anual'):
+            raise ErrorPeticion(400, f"Escala desconocida: {escala}")
+        anio = _enteros(parametros['anio'], 'anio') if parametros.get('anio') else None
+
+        async def calcular():
+            celdas = (self.cubo_mensual if escala == 'mensual' else self.cubo_anual)[estacion]
+            celdas = celdas.xs(variable, level='variable', drop_level=False)
+            if anio is not None:
+                celdas = celdas[celdas.index.get_level_values('anio').isin(anio)]
+            return _a_json({'estacion': estacion, 'variable': variable, 'escala': escala,
+                            'celdas': celdas.reset_index()})
+        return (estacion, variable, escala, tuple(anio or ())), calcular
+
+    def tendencia(self, parametros):
+        estacion = _estacion(parametros)
+        consulta = _consultas[estacion]
+        variable = _variable(parametros, consulta)
+        inicio = _fecha(parametros, 'inicio', pd.Timestamp(consulta.fechas[0]))
+        fin = _fecha(parametros, 'fin', pd.Timestamp(consulta.fechas[-1]))
+        return ((estacion, variable, inicio, fin),
+                lambda: self._en_proceso(_tendencia, estacion, variable, inicio, fin))
+
+    def comparacion(self, parametros):
+        estacion = _estacion(parametros)
+        variable = _variable(parametros, _consultas[estacion])
+        escala = parametros.get('escala', 'mensual')
+        grupos = _enteros(parametros.get('grupos'), 'grupos')
+        anio = _enteros(parametros['anio'], 'anio')[0] if parametros.get('anio') else None
+        if escala not in ('mensual', 'anual') or (escala == 'mensual' and anio is None):
+            raise ErrorPeticion(400, "La escala debe ser 'anual' o 'mensual' con un año")
+        return ((estacion, variable, escala, tuple(grupos), anio),
+                lambda: self._en_proceso(_comparacion, estacion, variable, escala, grupos, anio))
+
+    def anomalias(self, parametros):
+        estacion = _estacion(parametros)
+        variable = _variable(parametros, _consultas[estacion])
+        metodo = parametros.get('metodo', 'iqr')
+        if metodo not in anomalias.METODOS:
+            raise ErrorPeticion(400, f"Método de detección desconocido: {metodo}")
+        return ((estacion, variable, metodo),
+                lambda: self._en_proceso(_anomalias, estacion, variable, metodo))
+
+    def cercanas(self, parametros):
+        latitud = _numeros(parametros, 'latitud')[0]
+        longitud = _numeros(parametros, 'longitud')[0]
+        if parametros.get('radio_km'):
+            return _indice.en_radio(latitud, longitud, _numeros(parametros, 'radio_km')[0])
+        k = _numeros(parametros, 'k', [1], int)[0]
+        if k < 1:
+            raise ErrorPeticion(400, f"k debe ser un entero positivo: {k}")
+        return _indice.cercanas(latitud, longitud, k)
+
+    def interpolar(self, parametros):
+        latitudes = _numeros(parametros, 'latitud')
+        longitudes = _numeros(parametros, 'longitud')
+        if len(latitudes) != len(longitudes):
+            raise ErrorPeticion(400, 'Se necesita el mismo número de latitudes y longitudes')
+        inicio = _fecha(parametros, 'inicio', None)
+        fin = _fecha(parametros, 'fin', None)
+        potencia = _numeros(parametros, 'potencia', [2.0])[0]
+        k = _numeros(parametros, 'k', [0], int)[0]
+        if k < 0:
+            raise ErrorPeticion(400, f"k no puede ser negativo: {k}")
+        k = k or None
+        radio_km = _numeros(parametros, 'radio_km', [0.0])[0] or None
+
+        # La variable se busca en las estaciones que pesan en la interpolación;
+        # las que no la tienen no aportan valores
+        usadas = _indice.usadas(latitudes, longitudes, k, radio_km)
+        variable = parametros.get('variable')
+        if not any(variable in _consultas[e].columnas and variable != _consultas[e].columna_fecha for e in usadas):
+            raise ErrorPeticion(400, f"Ninguna de las estaciones usadas tiene la variable: {variable}")
+        return ((variable, tuple(latitudes), tuple(longitudes), inicio, fin, potencia, k, radio_km),
+                lambda: self._en_proceso(_interpolar, variable, latitudes, longitudes, inicio, fin,
+                                         potencia, k, radio_km))
+
+    # Función para atender una conexión HTTP/1.1; mantiene la conexión abierta
+    # entre peticiones salvo que el cliente pida cerrarla
+    async def atender(self, lector, escritor):
+        try:
+            while True:
+                try:
+                    encabezado = await lector.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._escribir(escritor, 431, b'{"error": "Encabezados demasiado grandes"}', False)
+                    break
+
+                lineas = encabezado.decode('latin-1').split('\r\n')
+                try:
+                    metodo, objetivo, version = lineas[0].split(' ', 2)
+                except ValueError:
+                    await self._escribir(escritor, 400, b'{"error": "Peticion no valida"}', False)
+                    break
+                encabezados = {}
+                for linea in lineas[1:]:
+                    nombre, _, valor = linea.partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip().lower()
+                abierta = (encabezados.get('connection') != 'close'
+                           and (version == 'HTTP/1.1' or encabezados.get('connection') == 'keep-alive'))
+
+                self.peticiones += 1
+                if metodo != 'GET':
+                    estado, cuerpo = 405, json.dumps({'error': 'Solo se admite GET'}).encode('utf-8')
+                else:
+                    try:
+                        estado, cuerpo = 200, await self.responder(objetivo)
+                    except ErrorPeticion as e:
+                        estado, cuerpo = e.estado, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                    except Exception as e:
+                        print(f"Error al responder {objetivo[:200]}: {e}")
+                        estado, cuerpo = 500, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                await self._escribir(escritor, estado, cuerpo, abierta)
+                if not abierta:
+                    break
+        finally:
+            escritor.close()
+
+    # Función para escribir una respuesta JSON
+    async def _escribir(self, escritor, estado, cuerpo, abierta):
+        textos = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+                  503: 'Service Unavailable'}
+        encabezado = (f"HTTP/1.1 {estado} {textos.get(estado, '')}\r\n"
+                      f"Content-Type: application/json; charset=utf-8\r\n"
+                      f"Content-Length: {len(cuerpo)}\r\n"
+                      f"Connection: {'keep-alive' if abierta else 'close'}\r\n\r\n")
+        escritor.write(encabezado.encode('latin-1') + cuerpo)
+        try:
+            await escritor.drain()
+        except ConnectionError:
+            pass
+
+    # Función para cerrar el grupo de procesos
+    def cerrar(self):
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)
+
+# Función para iniciar el servicio y atender peticiones hasta que se interrumpa
+async def servir(directorio='.', host='127.0.0.1', puerto=8000, procesos=None, estrategia='semanal',
+                 compacto=False):
+    servicio = Servicio(directorio, procesos, estrategia, compacto)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto, limit=MAXIMO_ENCABEZADOS, backlog=1024)
+    print(f"Sirviendo {len(_consultas)} estaciones en http://{host}:{puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='API JSON local con el análisis de las estaciones de POWER')
+    parser.add_argument('--directorio', default='.', help='directorio con los archivos POWER_Point_*.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--procesos', type=int, help='número de procesos para las pruebas (por defecto uno por núcleo)')
+    parser.add_argument('--estrategia', default='semanal', help='estrategia de imputación')
+    parser.add_argument('--compacto', action='store_true', help='guardar las estaciones en tipos compactos')
+    argumentos = parser.parse_args()
+
+    # Los procesos del grupo no ejecutan este archivo (ver data.crear_procesos),
+    # así que el servicio se toma del módulo importado y no de __main__
+    import servidor
+    try:
+        asyncio.run(servidor.servir(argumentos.directorio, argumentos.host, argumentos.puerto,
+                                    argumentos.procesos, argumentos.estrategia, argumentos.compacto))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import instrumentacion
+import memoria
+
+# Resultados memorizados por (estación, variable, inicio, fin, ...); se
+# descartan los más antiguos al superar el máximo de entradas
+MAXIMO_MEMORIA = 512
+_memoria = memoria.Memoria(MAXIMO_MEMORIA)
+
+# Tamaño máximo de la serie para calcular la pendiente de Sen con todas las parejas
+_MAXIMO_PAREJAS = 3000
+
+# Función para convertir fechas en días enteros desde la época, sin pasar por Python
+def dias_desde_epoca(fechas):
+    return np.asarray(fechas, dtype='datetime64[D]').astype('int64')
+
+# Función para quitar los NaN y promediar los valores que comparten la misma x
+def _preparar(x, y):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    if len(x) and np.any(np.diff(x) <= 0):
+        orden = np.argsort(x, kind='stable')
+        x, y = x[orden], y[orden]
+        if np.any(np.diff(x) == 0):
+            x, inversa = np.unique(x, return_inverse=True)
+            y = np.bincount(inversa, weights=y) / np.bincount(inversa)
+    return x, y
+
+# Estadístico S de Mann-Kendall y su varianza con corrección por empates
+def _s_y_varianza(x, y):
+    n = len(y)
+    tau, p = stats.kendalltau(x, y)
+    _, empates = np.unique(y, return_counts=True)
+    n0 = n * (n - 1) / 2
+    ty = (empates * (empates - 1) / 2).sum()
+
+    # Con x sin empates, tau-b = S / sqrt(n0 * (n0 - ty))
+    s = tau * np.sqrt(n0 * (n0 - ty))
+    varianza = (n * (n - 1) * (2 * n + 5) - (empates * (empates - 1) * (2 * empates + 5)).sum()) / 18
+    return s, varianza, tau, p
+
+# Estadístico Z con corrección por continuidad y su valor p bilateral
+def _z_y_p(s, varianza):
+    if varianza <= 0:
+        return np.nan, np.nan
+    z = (s - np.sign(s)) / np.sqrt(varianza)
+    return z, 2 * stats.norm.sf(abs(z))
+
+# Prueba de Mann-Kendall. tau y p son los de Kendall (igual que stats.kendalltau);
+# z y p_mk usan la aproximación normal clásica de Mann-Kendall
+def mann_kendall(x, y):
+    x, y = _preparar(x, y)
+    if len(y) < 3:
+        return {'n': len(y), 'tau': np.nan, 'p': np.nan, 's': np.nan, 'z': np.nan, 'p_mk': np.nan}
+    s, varianza, tau, p = _s_y_varianza(x, y)
+    z, p_mk = _z_y_p(s, varianza)
+    return {'n': len(y), 'tau': tau, 'p': p, 's': s, 'z': z, 'p_mk': p_mk}
+
+# Número de parejas (i < j) con pendiente menor que m. Con x creciente, la
+# pendiente es menor que m cuando y - m*x disminuye, así que es el número de
+# parejas discordantes entre x y y - m*x, que kendalltau cuenta en O(n log n)
+def _parejas_menores(x, y, m):
+    n0 = len(x) * (len(x) - 1) / 2
+    tau, _ = stats.kendalltau(x, y - m * x, method='asymptotic')
+    return n0 * (1 - tau) / 2
+
+# Pendiente de Sen: mediana de las pendientes entre todas las parejas de puntos.
+# Para series cortas se calcula con todas las parejas; para series largas se
+# busca por bisección la pendiente que deja la mitad de las parejas por debajo
+def pendiente_sen(x, y):
+    x, y = _preparar(x, y)
+    n = len(y)
+    if n < 2:
+        return np.nan
+
+    if n <= _MAXIMO_PAREJAS:
+        i, j = np.triu_indices(n, k=1)
+        return float(np.median((y[j] - y[i]) / (x[j] - x[i])))
+
+    mitad = n * (n - 1) / 4
+    rango = (y.max() - y.min()) / np.diff(x).min()
+    bajo, alto = -rango, rango
+    for _ in range(100):
+        medio = (bajo + alto) / 2
+        if _parejas_menores(x, y, medio) < mitad:
+            bajo = medio
+        else:
+            alto = medio
+        if alto - bajo <= 1e-12 * max(abs(medio), 1e-12):
+            break
+    return (bajo + alto) / 2
+
+# Prueba de Mann-Kendall estacional: suma de S y de sus varianzas calculadas
+# dentro de cada estación (por defecto, cada mes del año)
+def mann_kendall_estacional(fechas, y, estaciones=None):
+    fechas = pd.DatetimeIndex(fechas)
+    if estaciones is None:
+        estaciones = fechas.month.to_numpy()
+    x = dias_desde_epoca(fechas).astype('float64')
+    y = np.asarray(y, dtype='float64')
+
+    s_total, varianza_total = 0.0, 0.0
+    for estacion in np.unique(estaciones):
+        seleccion = estaciones == estacion
+        xe, ye = _preparar(x[seleccion], y[seleccion])
+        if len(ye) < 3:
+            continue
+        s, varianza, _, _ = _s_y_varianza(xe, ye)
+        s_total += s
+        varianza_total += varianza
+
+    z, p = _z_y_p(s_total, varianza_total)
+    return {'s': s_total, 'z': z, 'p': p}
+
+# Autocorrelación de todos los rezagos calculada con la FFT en O(n log n)
+def autocorrelacion(y):
+    y = np.asarray(y, dtype='float64') - np.mean(y)
+    n = len(y)
+    tamano = 1 << int(np.ceil(np.log2(2 * n)))
+    espectro = np.fft.rfft(y, tamano)
+    acf = np.fft.irfft(espectro * np.conj(espectro), tamano)[:n]
+    return acf / acf[0] if acf[0] > 0 else np.zeros(n)
+
+# Prueba de Mann-Kendall modificada (Hamed y Rao, 1998): la varianza de S se
+# corrige con las autocorrelaciones significativas de los rangos de la serie sin tendencia
+def mann_kendall_modificado(x, y, pendiente=None):
+    x, y = _preparar(x, y)
+    n = len(y)
+    if n < 3:
+        return {'z': np.nan, 'p': np.nan, 'factor': np.nan}
+
+    s, varianza, _, _ = _s_y_varianza(x, y)
+    if pendiente is None:
+        pendiente = pendiente_sen(x, y)
+    residuos = y - pendiente * x
+    rho = autocorrelacion(stats.rankdata(residuos))[1:]
+    k = np.arange(1, n)
+    rho = np.where(np.abs(rho) > 1.96 / np.sqrt(n), rho, 0.0)
+    factor = 1 + 2 / (n * (n - 1) * (n - 2)) * ((n - k) * (n - k - 1) * (n - k - 2) * rho).sum()
+
+    z, p = _z_y_p(s, varianza * max(factor, 1e-12))
+    return {'z': z, 'p': p, 'factor': factor}
+
+# Función para analizar la tendencia de una serie: Mann-Kendall, pendiente de
+# Sen (por año), Mann-Kendall estacional y modificado. Si se da una clave
+# (p. ej. estación, variable, inicio, fin) el resultado se memoriza
+@instrumentacion.cronometrar()
+def analizar(fechas, valores, clave=None):
+    return _memoria.obtener(clave, lambda: _analizar(fechas, valores))
+
+# Cálculo de analizar() sin pasar por la memoria
+def _analizar(fechas, valores):
+    x = dias_desde_epoca(fechas)
+    resultado = mann_kendall(x, valores)
+    pendiente = pendiente_sen(x, valores)
+    resultado['pendiente_sen'] = pendiente * 365.25
+    resultado['estacional'] = mann_kendall_estacional(fechas, valores)
+    resultado['modificado'] = mann_kendall_modificado(x, valores, pendiente)
+    return resultado
+
+# Función para calcular las tendencias de todas las variables de una estación
+# en varias ventanas de tiempo; devuelve una fila por variable y ventana. La
+# versión de los datos (p. ej. data.version_archivo) forma parte de la clave de
+# la memoria, así que al reemplazar el archivo o anexar días no se reutilizan
+# resultados anteriores
+def tendencias_lote(datos, estacion=None, ventanas=None, version=None, columna_fecha='Fecha del registro'):
+    fechas = datos[columna_fecha]
+    if ventanas is None:
+        ventanas = [(fechas.min(), fechas.max())]
+    variables = datos.drop(columns=columna_fecha).select_dtypes('number').columns
+
+    filas = []
+    for inicio, fin in ventanas:
+        seleccion = datos[(fechas >= inicio) & (fechas <= fin)]
+        for variable in variables:
+            r = analizar(seleccion[columna_fecha], seleccion[variable],
+                         clave=(estacion, version, variable, inicio, fin, len(seleccion)))
+            filas.append({
+                'estacion': estacion, 'variable': variable, 'inicio': inicio, 'fin': fin,
+                'n': r['n'], 'tau': r['tau'], 'p': r['p'], 'z': r['z'], 'p_mk': r['p_mk'],
+                'pendiente_sen': r['pendiente_sen'],
+                'p_estacional': r['estacional']['p'], 'p_modificado': r['modificado']['p'],
+            })
+    return pd.DataFrame(filas)
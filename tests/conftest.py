@@ -0,0 +1,30 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Los módulos del proyecto están en el directorio superior
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Estación sintética con las columnas de POWER ya renombradas, dos decimales
+# como en los archivos publicados y algunos faltantes en cada variable
+@pytest.fixture
+def estacion():
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range('2018-01-01', '2022-12-31', freq='D')
+    dia = 2 * np.pi * fechas.dayofyear.to_numpy() / 365.25
+    n = len(fechas)
+    datos = pd.DataFrame({
+        'Fecha del registro': fechas,
+        'Temperatura (°C)': 20 + 3 * np.sin(dia) + rng.normal(0, 1, n) + 0.0005 * np.arange(n),
+        'Humedad relativa (%)': np.clip(75 + 10 * np.cos(dia) + rng.normal(0, 5, n), 0, 100),
+        'Precipitación (mm)': rng.gamma(0.6, 6, n) * (rng.random(n) < 0.5),
+        'Viento (m/s)': rng.gamma(4, 0.5, n),
+        'Radiación solar (kWh/m²/día)': 4.5 + np.sin(dia) + rng.normal(0, 0.5, n),
+    })
+    for columna in datos.columns[1:]:
+        datos[columna] = datos[columna].round(2)
+        datos.loc[rng.random(n) < 0.03, columna] = np.nan
+    return datos
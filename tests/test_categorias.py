@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import categorias
+
+# Tabla de referencia de la versión original: pd.cut y pd.crosstab
+def _crosstab(datos, a, b):
+    cortes = {}
+    for columna, (nombre, limites, etiquetas) in categorias.CATEGORIAS.items():
+        if nombre in (a, b):
+            cortes[nombre] = pd.cut(datos[columna], bins=[-np.inf, *limites, np.inf], labels=etiquetas)
+    return pd.crosstab(cortes[a].rename(f'Categoría {a}'), cortes[b].rename(f'Categoría {b}'))
+
+# Se desplazan las variables para que caigan en todas las categorías
+def _datos(estacion):
+    return estacion.assign(**{'Temperatura (°C)': estacion['Temperatura (°C)'] - 7,
+                              'Radiación solar (kWh/m²/día)': estacion['Radiación solar (kWh/m²/día)'] * 4})
+
+# Los códigos de np.digitize son los de pd.cut, también en los límites exactos
+def test_codificar_igual_a_cut(estacion):
+    datos = _datos(estacion)
+    datos.loc[:4, 'Temperatura (°C)'] = [10, 12, 14, 16, 16.01]
+    codigos = categorias.codificar(datos)
+    for columna, (nombre, limites, etiquetas) in categorias.CATEGORIAS.items():
+        cortes = pd.cut(datos[columna], bins=[-np.inf, *limites, np.inf], labels=etiquetas)
+        np.testing.assert_array_equal(codigos[nombre], cortes.cat.codes.to_numpy())
+
+# Las tablas de contingencia y el chi-cuadrado son los de crosstab y chi2_contingency
+def test_contingencia_y_chi2_igual_a_crosstab(estacion):
+    datos = _datos(estacion)
+    resultado = categorias.analizar(datos)
+    assert len(resultado) == 10
+    for (a, b), pareja in resultado.items():
+        referencia = _crosstab(datos, a, b)
+        pd.testing.assert_frame_equal(pareja['tabla'], referencia, check_dtype=False,
+                                      check_categorical=False, check_index_type=False,
+                                      check_column_type=False)
+        chi2, p, _, _ = stats.chi2_contingency(referencia)
+        assert np.isclose(pareja['chi2'], chi2) and np.isclose(pareja['p'], p)
+
+# pareja() devuelve la tabla traspuesta si se pide en el otro orden
+def test_pareja_invertida(estacion):
+    resultado = categorias.analizar(_datos(estacion))
+    directa = categorias.pareja(resultado, 'Temperatura', 'Humedad')
+    invertida = categorias.pareja(resultado, 'Humedad', 'Temperatura')
+    pd.testing.assert_frame_equal(invertida['tabla'], directa['tabla'].T)
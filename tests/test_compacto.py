@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import compacto
+import consultas
+
+# Los valores publicados (dos decimales) se recuperan sin pérdida
+def test_compactar_sin_perdida(estacion):
+    almacen = compacto.compactar(estacion)
+    pd.testing.assert_frame_equal(almacen.a_dataframe(), estacion, check_exact=False, atol=1e-9, rtol=0)
+    assert almacen.nbytes() < compacto.memoria(estacion) / 2
+
+# Las celdas imputadas se redondean a la escala de cada variable
+def test_imputados_dentro_de_media_escala(estacion):
+    promedios = estacion.fillna(estacion.mean(numeric_only=True))
+    almacen = compacto.compactar(promedios)
+    for variable, (_, escala) in compacto.ESCALAS.items():
+        error = np.abs(almacen.valores(variable) - promedios[variable].to_numpy())
+        assert error.max() <= escala / 2 + 1e-9
+
+# Las consultas sobre el almacén devuelven lo mismo que sobre el DataFrame
+def test_consulta_fechas_con_almacen(estacion):
+    esperado = consultas.ConsultaFechas(estacion)
+    compacta = consultas.ConsultaFechas(compacto.compactar(estacion))
+    variable = 'Temperatura (°C)'
+
+    assert compacta.columnas == esperado.columnas
+    np.testing.assert_array_equal(compacta.fechas, esperado.fechas)
+    np.testing.assert_array_equal(compacta.anios(), esperado.anios())
+    for obtenido, referencia in [
+        (compacta.rango('2019-03-10', '2020-07-01'), esperado.rango('2019-03-10', '2020-07-01')),
+        (compacta.rango('2019-03-10', '2020-07-01', variable), esperado.rango('2019-03-10', '2020-07-01', variable)),
+        (compacta.anio(2021, variable), esperado.anio(2021, variable)),
+        (compacta.mes(2020, 2, [variable]), esperado.mes(2020, 2, [variable])),
+        (compacta.anio(1990, variable), esperado.anio(1990, variable)),
+    ]:
+        pd.testing.assert_frame_equal(obtenido, referencia, check_exact=False, atol=1e-9, rtol=0,
+                                      check_index_type=False)
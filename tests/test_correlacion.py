@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import correlacion
+
+FECHA = 'Fecha del registro'
+
+# Los co-momentos dan la misma matriz que DataFrame.corr (faltantes por parejas)
+def test_correlacion_igual_a_corr(estacion):
+    matriz = correlacion.construir(estacion).correlacion()
+    pd.testing.assert_frame_equal(matriz, estacion.drop(columns=FECHA).corr(), atol=1e-10)
+
+# Añadir por bloques, combinar y retirar filas equivale a calcular de nuevo
+def test_bloques_combinar_y_retirar(estacion):
+    variables = estacion.drop(columns=FECHA)
+    partes = [correlacion.construir(estacion.iloc[:700]), correlacion.construir(estacion.iloc[700:])]
+    combinada = correlacion.combinar(partes).correlacion()
+    pd.testing.assert_frame_equal(combinada, variables.corr(), atol=1e-10)
+
+    bloques = correlacion.Comomentos(variables.columns)
+    for inicio in range(0, len(variables), 365):
+        bloques.actualizar(variables.iloc[inicio:inicio + 365].to_numpy())
+    bloques.retirar(variables.iloc[:365].to_numpy())
+    pd.testing.assert_frame_equal(bloques.correlacion(), variables.iloc[365:].corr(), atol=1e-10)
+
+# Cada desfase es la correlación de x con y desplazada k días
+def test_correlacion_desfasada_igual_a_shift(estacion):
+    x, y = estacion['Radiación solar (kWh/m²/día)'], estacion['Temperatura (°C)']
+    desfases = correlacion.correlacion_desfasada(x, y, 30)
+    referencia = [x.corr(y.shift(-k)) for k in range(31)]
+    np.testing.assert_allclose(desfases.to_numpy(), referencia, atol=1e-10)
+
+# La correlación móvil es la de DataFrame.rolling con el mismo mínimo de pares
+def test_correlacion_movil_igual_a_rolling(estacion):
+    x, y = estacion['Humedad relativa (%)'], estacion['Temperatura (°C)']
+    movil = correlacion.correlacion_movil(x, y, 90, minimo=60)
+    referencia = x.rolling(90, min_periods=60).corr(y).to_numpy()
+    np.testing.assert_array_equal(np.isnan(movil), np.isnan(referencia))
+    np.testing.assert_allclose(movil, referencia, atol=1e-8)
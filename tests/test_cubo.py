@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import cubo
+
+TEMPERATURA = 'Temperatura (°C)'
+
+# Estadísticos de referencia por año y mes calculados con groupby
+def _referencia(estacion, claves):
+    fechas = estacion['Fecha del registro'].dt
+    return estacion.drop(columns='Fecha del registro').groupby([getattr(fechas, c) for c in claves])
+
+# Las celdas mensuales coinciden con groupby sobre los datos diarios
+def test_cubo_mensual_igual_a_groupby(estacion):
+    celdas = cubo.construir_cubo(estacion, 'e').xs('e', level='estacion')
+    grupos = _referencia(estacion, ['year', 'month'])
+    for estadistico, referencia in [('promedio', grupos.mean()), ('desviacion', grupos.std()),
+                                    ('conteo', grupos.count()), ('minimo', grupos.min()),
+                                    ('maximo', grupos.max()), ('mediana', grupos.median())]:
+        esperado = referencia.stack(future_stack=True)
+        np.testing.assert_allclose(celdas[estadistico].to_numpy(dtype='float64'),
+                                   esperado.to_numpy(dtype='float64'), rtol=1e-9, atol=1e-9)
+
+# Combinar las celdas mensuales da los estadísticos anuales exactos
+def test_cubo_anual_igual_a_groupby(estacion):
+    anual = cubo.anual(cubo.construir_cubo(estacion, 'e')).xs('e', level='estacion')
+    grupos = _referencia(estacion, ['year'])
+    for estadistico, referencia in [('promedio', grupos.mean()), ('desviacion', grupos.std())]:
+        esperado = referencia.stack(future_stack=True)
+        esperado.index.names = anual.index.names
+        pd.testing.assert_series_equal(anual[estadistico].sort_index(), esperado.sort_index(),
+                                       check_names=False, check_index_type=False)
+
+# Actualizar desde una fila recalcula lo mismo que construir el cubo completo
+def test_actualizar_cubo(estacion):
+    inicio = len(estacion) - 45
+    parcial = cubo.construir_cubo(estacion.iloc[:inicio], 'e')
+    actualizado = cubo.actualizar_cubo(parcial, estacion, 'e', inicio)
+    pd.testing.assert_frame_equal(actualizado, cubo.construir_cubo(estacion, 'e'))
+
+# Las pruebas calculadas con los estadísticos de las celdas son las de scipy
+def test_pruebas_desde_celdas(estacion):
+    celdas = cubo.construir_cubo(estacion, 'e')
+    grupos = [estacion[(estacion['Fecha del registro'].dt.year == 2020)
+                       & (estacion['Fecha del registro'].dt.month == mes)][TEMPERATURA].dropna() for mes in (1, 4, 8)]
+
+    t, p = cubo.prueba_t(cubo.celdas_mensuales(celdas, 'e', TEMPERATURA, 2020, [1, 4]))
+    referencia = stats.ttest_ind(grupos[0], grupos[1])
+    assert np.isclose(t, referencia.statistic) and np.isclose(p, referencia.pvalue)
+
+    f, p = cubo.anova(cubo.celdas_mensuales(celdas, 'e', TEMPERATURA, 2020, [1, 4, 8]))
+    referencia = stats.f_oneway(*grupos)
+    assert np.isclose(f, referencia.statistic) and np.isclose(p, referencia.pvalue)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import imputacion
+
+FECHA = 'Fecha del registro'
+
+# Imputación de referencia de pandas: promedio del grupo con transform
+def _por_grupo(estacion, grupos):
+    return estacion.drop(columns=FECHA).groupby(grupos).transform(lambda x: x.fillna(x.mean()))
+
+# La imputación semanal es la de la versión original (groupby por semana)
+def test_semanal_igual_a_groupby(estacion):
+    imputados, _ = imputacion.imputar(estacion, 'semanal')
+    referencia = _por_grupo(estacion, estacion[FECHA].dt.to_period('W'))
+    pd.testing.assert_frame_equal(imputados.drop(columns=FECHA), referencia)
+
+# La climatológica rellena con el promedio del mismo día del año
+def test_climatologia_igual_a_groupby(estacion):
+    imputados, _ = imputacion.imputar(estacion, 'climatologia')
+    referencia = _por_grupo(estacion, estacion[FECHA].dt.dayofyear)
+    pd.testing.assert_frame_equal(imputados.drop(columns=FECHA), referencia)
+
+# La interpolación es la lineal en el tiempo de pandas, con los extremos constantes
+def test_interpolacion_igual_a_pandas(estacion):
+    estacion = estacion.copy()
+    estacion.loc[:2, 'Temperatura (°C)'] = np.nan
+    imputados, _ = imputacion.imputar(estacion, 'interpolacion')
+    referencia = (estacion.set_index(FECHA).interpolate(method='time', limit_direction='both')
+                  .reset_index(drop=True))
+    pd.testing.assert_frame_equal(imputados.drop(columns=FECHA), referencia)
+
+# Solo se marcan las celdas faltantes que recibieron un valor
+@pytest.mark.parametrize('estrategia', imputacion.ESTRATEGIAS)
+def test_banderas(estacion, estrategia):
+    estacion = estacion.copy()
+    estacion['Viento (m/s)'] = np.nan
+    imputados, banderas = imputacion.imputar(estacion, estrategia)
+    originales = estacion.drop(columns=FECHA).isna().to_numpy()
+    np.testing.assert_array_equal(banderas, originales & imputados.drop(columns=FECHA).notna().to_numpy())
+    assert not banderas[:, list(imputados.columns[1:]).index('Viento (m/s)')].any()
@@ -0,0 +1,33 @@
+import numpy as np
+
+import remuestreo
+
+# Varias pruebas con las mismas permutaciones dan lo mismo que cada prueba por separado
+def test_pruebas_comparten_permutaciones():
+    rng = np.random.default_rng(2)
+    grupos = [rng.gamma(0.6, 6, 200) + 0.5 * i for i in range(3)]
+    juntas = remuestreo.pruebas_permutacion(grupos, n=1500, semilla=4)
+    for estadistico in remuestreo.ESTADISTICOS:
+        separada = remuestreo.prueba_permutacion(grupos, estadistico, n=1500, semilla=4)
+        assert juntas[estadistico]['p'] == separada['p']
+        assert np.isclose(juntas[estadistico]['estadistico'], separada['estadistico'])
+
+# Con dos grupos el estadístico de medias es n1*n2/(n1+n2) veces el cuadrado
+# de la diferencia de medias
+def test_estadistico_de_medias_con_dos_grupos():
+    a, b = np.array([1.0, 2.0, 3.0]), np.array([5.0, 7.0])
+    resultado = remuestreo.prueba_permutacion([a, b], n=200, semilla=0)
+    assert np.isclose(resultado['estadistico'], 3 * 2 / 5 * (a.mean() - b.mean()) ** 2)
+    assert 0 < resultado['p'] <= 1
+
+# Un grupo vacío da NaN en lugar de un valor p
+def test_grupo_vacio():
+    resultado = remuestreo.pruebas_permutacion([[1.0, 2.0], [np.nan]], n=100)
+    assert all(np.isnan(r['p']) for r in resultado.values())
+
+# El número de remuestreos respeta el presupuesto y sus límites
+def test_remuestreos_para():
+    assert remuestreo.remuestreos_para([np.ones(10)]) == remuestreo.REMUESTREOS
+    assert remuestreo.remuestreos_para([np.ones(10 ** 6)]) == remuestreo.MINIMO_REMUESTREOS
+    n = remuestreo.remuestreos_para([np.ones(1000), np.ones(1000)])
+    assert n == remuestreo.PRESUPUESTO_VALORES // 2000
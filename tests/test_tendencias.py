@@ -0,0 +1,67 @@
+import numpy as np
+from scipy import stats
+
+import tendencias
+
+TEMPERATURA = 'Temperatura (°C)'
+
+# Serie de la temperatura sin faltantes, con x en días desde la época
+def _serie(estacion, n=None):
+    datos = estacion.dropna(subset=[TEMPERATURA]).iloc[:n]
+    return tendencias.dias_desde_epoca(datos['Fecha del registro']).astype('float64'), datos[TEMPERATURA].to_numpy()
+
+# tau y p son los de scipy.stats.kendalltau
+def test_mann_kendall_igual_a_kendalltau(estacion):
+    x, y = _serie(estacion)
+    resultado = tendencias.mann_kendall(x, y)
+    tau, p = stats.kendalltau(x, y)
+    assert np.isclose(resultado['tau'], tau)
+    assert np.isclose(resultado['p'], p)
+    assert resultado['n'] == len(y)
+
+# S obtenido de tau-b es la suma de los signos de todas las parejas
+def test_s_igual_a_suma_de_signos(estacion):
+    x, y = _serie(estacion, 300)
+    i, j = np.triu_indices(len(y), k=1)
+    assert np.isclose(tendencias.mann_kendall(x, y)['s'], np.sign(y[j] - y[i]).sum())
+
+# La pendiente de Sen con todas las parejas es la de scipy.stats.theilslopes
+def test_pendiente_sen_igual_a_theilslopes(estacion):
+    x, y = _serie(estacion, 1500)
+    assert np.isclose(tendencias.pendiente_sen(x, y), stats.theilslopes(y, x).slope)
+
+# La bisección de las series largas cae entre las dos pendientes centrales
+def test_pendiente_sen_por_biseccion(estacion, monkeypatch):
+    x, y = _serie(estacion, 600)
+    monkeypatch.setattr(tendencias, '_MAXIMO_PAREJAS', 10)
+    i, j = np.triu_indices(len(y), k=1)
+    pendientes = np.sort((y[j] - y[i]) / (x[j] - x[i]))
+    mitad = len(pendientes) // 2
+    pendiente = tendencias.pendiente_sen(x, y)
+    assert pendientes[mitad - 1] - 1e-9 <= pendiente <= pendientes[mitad] + 1e-9
+
+# El Mann-Kendall estacional suma los S de cada mes
+def test_mann_kendall_estacional(estacion):
+    datos = estacion.dropna(subset=[TEMPERATURA])
+    resultado = tendencias.mann_kendall_estacional(datos['Fecha del registro'], datos[TEMPERATURA])
+    s = 0.0
+    for _, mes in datos.groupby(datos['Fecha del registro'].dt.month):
+        y = mes[TEMPERATURA].to_numpy()
+        i, j = np.triu_indices(len(y), k=1)
+        s += np.sign(y[j] - y[i]).sum()
+    assert np.isclose(resultado['s'], s)
+
+# La autocorrelación con la FFT es la directa
+def test_autocorrelacion_igual_a_la_directa(estacion):
+    _, y = _serie(estacion, 500)
+    centrada = y - y.mean()
+    directa = np.correlate(centrada, centrada, 'full')[len(y) - 1:] / (centrada @ centrada)
+    np.testing.assert_allclose(tendencias.autocorrelacion(y), directa, atol=1e-10)
+
+# La versión de los datos forma parte de la clave de la memoria
+def test_tendencias_lote_por_version(estacion):
+    datos = estacion[['Fecha del registro', TEMPERATURA]]
+    antes = tendencias.tendencias_lote(datos, 'prueba', version=1)
+    cambiados = datos.assign(**{TEMPERATURA: datos[TEMPERATURA][::-1].to_numpy()})
+    despues = tendencias.tendencias_lote(cambiados, 'prueba', version=2)
+    assert antes['tau'].iloc[0] != despues['tau'].iloc[0]